@@ -4,12 +4,14 @@
 import sys
 import os
 import json
+import logging
 import threading
+import time
 import uuid
 import psutil
 from pathlib import Path
 from datetime import datetime
-from flask import Flask, render_template, request, jsonify, session
+from flask import Flask, Response, render_template, request, jsonify, session, stream_with_context
 from flask_cors import CORS
 from dotenv import load_dotenv
 
@@ -20,19 +22,96 @@ load_dotenv()
 sys.path.insert(0, str(Path(__file__).parent / "src"))
 
 # Import research components
-from ollama_deep_researcher.graph import graph
+from ollama_deep_researcher.graph import build_graph
+from ollama_deep_researcher.checkpoints import create_sqlite_checkpointer, delete_orphaned_checkpoints
 from ollama_deep_researcher.configuration import Configuration
+from ollama_deep_researcher.scheduler import ResearchScheduler
+from ollama_deep_researcher.task_store import DEFAULT_TASK_TTL, create_task_store
+from ollama_deep_researcher.telemetry import METRICS, TelemetryCallbackHandler, Tracer, use_tracer
 from langchain_core.runnables import RunnableConfig
 
+logger = logging.getLogger(__name__)
+
 app = Flask(__name__)
 app.secret_key = os.urandom(24)
 CORS(app)
 
-# Store research tasks (in production, use Redis or database)
-research_tasks = {}
+# Durable task store: SQLite by default, Redis when TASK_STORE_URL is redis://...
+task_store = create_task_store(
+    os.getenv('TASK_STORE_URL') or os.path.join(Configuration().cache_dir, 'tasks.sqlite'),
+    ttl=float(os.getenv('TASK_TTL_SECONDS', DEFAULT_TASK_TTL)),
+)
+
+# Seconds between sweeps that delete expired tasks
+TASK_REAP_INTERVAL = 600
+
+# Checkpoint graph state after every node so failed tasks can be resumed
+try:
+    checkpointer = create_sqlite_checkpointer(
+        os.getenv('CHECKPOINT_DB') or os.path.join(Configuration().cache_dir, 'checkpoints.sqlite')
+    )
+except ImportError as e:
+    logger.warning("Resuming failed research is disabled. %s", e)
+    checkpointer = None
+graph = build_graph(checkpointer)
+
+# Bounded worker pool; tasks beyond its capacity wait in the admission queue
+scheduler = ResearchScheduler.from_env()
+
+# Wakes up event streams whenever a task changes
+task_events = threading.Condition()
+
+# Span recorders of tasks running in this process; finished tasks keep their timeline in the store
+task_tracers = {}
+task_tracers_lock = threading.Lock()
+
+# Seconds between keep-alive comments on idle event streams
+EVENT_STREAM_HEARTBEAT = 15
+
+# Seconds between version checks on event streams, to pick up changes made by
+# other worker processes sharing the task store
+EVENT_STREAM_POLL = 1
+
+def notify_task_update(task_id):
+    """Wake any event streams in this process watching a task."""
+    with task_events:
+        task_events.notify_all()
 
-def run_research_task(task_id, topic, custom_config=None, env_vars=None):
-    """Run research in background thread."""
+def update_task(task_id, **fields):
+    """Set task fields in the store and wake event streams."""
+    task_store.update(task_id, **fields)
+    notify_task_update(task_id)
+
+def sweep_expired_tasks():
+    """Delete finished tasks that outlived the task TTL, and the checkpoints of deleted tasks."""
+    task_store.reap()
+    # Failed tasks keep their checkpoints for resuming until they are reaped
+    if checkpointer is not None:
+        delete_orphaned_checkpoints(checkpointer, lambda task_id: task_store.get(task_id) is not None)
+
+def reap_expired_tasks():
+    """Periodically sweep expired tasks."""
+    while True:
+        time.sleep(TASK_REAP_INTERVAL)
+        try:
+            sweep_expired_tasks()
+        except Exception as e:
+            logger.warning("Failed to reap expired tasks: %s", e)
+
+threading.Thread(target=reap_expired_tasks, name='task-reaper', daemon=True).start()
+
+def run_research_task(task_id, topic, custom_config=None, env_vars=None, resume=False):
+    """Run research in background thread.
+    
+    With resume=True the graph continues from the task's last checkpoint instead of
+    starting over, so only the node that failed is run again.
+    
+    Every node, search, page fetch and LLM call is recorded as a span; the timeline
+    is saved with the task when it finishes.
+    """
+    tracer = Tracer()
+    with task_tracers_lock:
+        task_tracers[task_id] = tracer
     try:
         # Set environment variables in background thread
         if env_vars:
@@ -46,14 +125,14 @@ def run_research_task(task_id, topic, custom_config=None, env_vars=None):
         # Explicitly ensure Tavily API key is available
         tavily_key = os.getenv('TAVILY_API_KEY')
         if not tavily_key:
-            research_tasks[task_id]['status'] = 'failed'
-            research_tasks[task_id]['error'] = f'TAVILY_API_KEY not available in background thread. Env vars passed: {list(env_vars.keys()) if env_vars else None}'
+            update_task(
+                task_id,
+                status='failed',
+                error=f'TAVILY_API_KEY not available in background thread. Env vars passed: {list(env_vars.keys()) if env_vars else None}',
+            )
             return
         # Update status
-        research_tasks[task_id]['status'] = 'running'
-        research_tasks[task_id]['started_at'] = datetime.now().isoformat()
-        research_tasks[task_id]['activity_log'] = []
-        research_tasks[task_id]['memory_stats'] = []
+        update_task(task_id, status='running', started_at=datetime.now().isoformat())
         
         def log_activity(message, detail=None):
             """Log activity with timestamp"""
@@ -66,10 +145,6 @@ def run_research_task(task_id, topic, custom_config=None, env_vars=None):
                     'memory_mb': round(memory_mb, 1),
                     'memory_percent': round(process.memory_percent(), 1)
                 }
-                research_tasks[task_id]['memory_stats'].append({
-                    'time': datetime.now().isoformat(),
-                    'memory_mb': memory_mb
-                })
             except:
                 pass
             
@@ -81,8 +156,8 @@ def run_research_task(task_id, topic, custom_config=None, env_vars=None):
                 entry['detail'] = detail
             if memory_info:
                 entry['memory'] = memory_info
-            research_tasks[task_id]['activity_log'].append(entry)
-            research_tasks[task_id]['progress'] = message
+            task_store.append_activity(task_id, entry, progress=message)
+            notify_task_update(task_id)
         
         # Create configuration - use custom config if provided
         config = Configuration()
@@ -92,6 +167,8 @@ def run_research_task(task_id, topic, custom_config=None, env_vars=None):
         summarization_model = None
         query_model = None
         if custom_config:
+            if 'llm_provider' in custom_config:
+                config.llm_provider = custom_config['llm_provider']
             if 'local_llm' in custom_config:
                 config.local_llm = custom_config['local_llm']
             if 'summarization_model' in custom_config:
@@ -121,8 +198,19 @@ def run_research_task(task_id, topic, custom_config=None, env_vars=None):
         log_activity('🤔 Generating optimized search query...', f'Topic: {topic}')
         
         # Inject progress callback into config
+        partial_summary = ''
+        
         def progress_callback(step, detail=None, verbose_data=None):
             """Callback for graph progress updates"""
+            nonlocal partial_summary
+            # Streamed summary text updates the live preview instead of the log
+            if verbose_data and verbose_data.get('stage') == 'summary_stream':
+                if verbose_data.get('reset'):
+                    partial_summary = verbose_data.get('text', '')
+                else:
+                    partial_summary += verbose_data.get('delta', '')
+                update_task(task_id, partial_summary=partial_summary, progress=step)
+                return
             # Store verbose data separately for expandable view
             entry = {
                 'time': datetime.now().isoformat(),
@@ -132,8 +220,8 @@ def run_research_task(task_id, topic, custom_config=None, env_vars=None):
                 entry['detail'] = detail
             if verbose_data:
                 entry['verbose'] = verbose_data
-            research_tasks[task_id]['activity_log'].append(entry)
-            research_tasks[task_id]['progress'] = step
+            task_store.append_activity(task_id, entry, progress=step)
+            notify_task_update(task_id)
         
         # Store callback and search_apis in configurable for graph nodes to use
         config_dict = {**config.__dict__, 'progress_callback': progress_callback}
@@ -143,7 +231,12 @@ def run_research_task(task_id, topic, custom_config=None, env_vars=None):
             config_dict['summarization_model'] = summarization_model
         if query_model:
             config_dict['query_model'] = query_model
-        runnable_config = RunnableConfig(configurable=config_dict)
+        # Checkpoints are keyed by task so a failed run can be resumed
+        config_dict['thread_id'] = task_id
+        runnable_config = RunnableConfig(
+            configurable=config_dict,
+            callbacks=[TelemetryCallbackHandler(tracer)],
+        )
         
         # Run the graph with streaming updates
         log_activity('🚀 Starting research pipeline...', 'Initializing LangGraph workflow')
@@ -154,7 +247,12 @@ def run_research_task(task_id, topic, custom_config=None, env_vars=None):
             log_activity('📝 Analyzing research topic...', f'Full topic: {topic}')
             log_activity('🧠 Preparing LLM context', f'Loading model {config.local_llm} with JSON output mode')
             
-            result = graph.invoke(input_data, runnable_config)
+            with use_tracer(tracer):
+                if resume:
+                    log_activity('🔁 Resuming from last checkpoint', 'Completed steps are not repeated')
+                    result = graph.invoke(None, runnable_config)
+                else:
+                    result = graph.invoke(input_data, runnable_config)
             
             log_activity('✅ Research pipeline complete', 'Processing and formatting final results...')
         except Exception as e:
@@ -165,9 +263,7 @@ def run_research_task(task_id, topic, custom_config=None, env_vars=None):
         if result and "running_summary" in result:
             log_activity('💾 Saving research results...', 'Formatting and storing output')
             
-            research_tasks[task_id]['status'] = 'completed'
-            research_tasks[task_id]['result'] = result["running_summary"]
-            research_tasks[task_id]['completed_at'] = datetime.now().isoformat()
+            completed_at = datetime.now().isoformat()
             
             # Save to file
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -176,16 +272,52 @@ def run_research_task(task_id, topic, custom_config=None, env_vars=None):
                 f.write(f"# Research Report: {topic}\n\n")
                 f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
                 f.write(result["running_summary"])
-            research_tasks[task_id]['output_file'] = output_file
+            update_task(
+                task_id,
+                status='completed',
+                result=result["running_summary"],
+                completed_at=completed_at,
+                output_file=output_file,
+            )
             
             log_activity('🎉 Research complete!', f'Results saved to {output_file}')
         else:
-            research_tasks[task_id]['status'] = 'failed'
-            research_tasks[task_id]['error'] = 'No summary generated'
+            update_task(task_id, status='failed', error='No summary generated')
+        
+        # The graph ran to its end, so there is nothing to resume; drop its checkpoints
+        if checkpointer is not None:
+            checkpointer.delete_thread(task_id)
             
     except Exception as e:
-        research_tasks[task_id]['status'] = 'failed'
-        research_tasks[task_id]['error'] = str(e)
+        update_task(task_id, status='failed', error=str(e))
+    finally:
+        try:
+            update_task(task_id, timeline=tracer.timeline())
+        except KeyError:
+            pass  # Task was deleted while running
+        with task_tracers_lock:
+            task_tracers.pop(task_id, None)
+
+def run_queued_research_task(task_id, topic, custom_config=None, env_vars=None, resume=False):
+    """Run a research task picked up by a scheduler worker."""
+    # Everyone still waiting just moved up the queue
+    for queued_id in scheduler.queued_task_ids():
+        notify_task_update(queued_id)
+    run_research_task(task_id, topic, custom_config, env_vars, resume=resume)
+
+def has_checkpoint(task_id):
+    """Check whether a task has saved graph state to resume from."""
+    if checkpointer is None:
+        return False
+    return bool(graph.get_state({'configurable': {'thread_id': task_id}}).next)
+
+def research_env_vars():
+    """Collect environment variables the background research thread needs."""
+    return {
+        'TAVILY_API_KEY': os.getenv('TAVILY_API_KEY'),
+        'LOCAL_LLM': os.getenv('LOCAL_LLM'),
+        'SEARCH_API': os.getenv('SEARCH_API'),
+    }
 
 @app.route('/')
 def index():
@@ -236,36 +368,70 @@ def start_research():
     # Create task ID
     task_id = str(uuid.uuid4())
     
-    # Initialize task
-    research_tasks[task_id] = {
+    # Queue research for the worker pool with custom config and environment
+    # The backend the run will actually use, as run_research_task resolves it
+    backend = custom_config.get('llm_provider') or Configuration().llm_provider
+    try:
+        priority = int(data.get('priority', 0))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'Priority must be an integer'}), 400
+    
+    # Initialize task; config and backend are kept so the task can be resumed
+    task_store.create({
         'id': task_id,
         'topic': topic,
         'status': 'pending',
         'created_at': datetime.now().isoformat(),
-        'progress': 'Initializing...'
-    }
+        'progress': 'Initializing...',
+        'config': custom_config,
+        'backend': backend,
+        'priority': priority,
+    })
     
     # Pass environment variables to background thread
-    env_vars = {
-        'TAVILY_API_KEY': os.getenv('TAVILY_API_KEY'),
-        'LOCAL_LLM': os.getenv('LOCAL_LLM'),
-        'SEARCH_API': os.getenv('SEARCH_API'),
-    }
-    
-    # Start research in background thread with custom config and environment
-    thread = threading.Thread(target=run_research_task, args=(task_id, topic, custom_config, env_vars))
-    thread.daemon = True
-    thread.start()
+    env_vars = research_env_vars()
+    queue_position = scheduler.submit(
+        task_id,
+        run_queued_research_task,
+        task_id,
+        topic,
+        custom_config,
+        env_vars,
+        backend=backend,
+        priority=priority,
+    )
     
-    return jsonify({'task_id': task_id})
+    return jsonify({'task_id': task_id, 'queue_position': queue_position})
 
 @app.route('/api/research/<task_id>', methods=['GET'])
 def get_research_status(task_id):
-    """Get status of a research task."""
-    if task_id not in research_tasks:
+    """Get status of a research task.
+    
+    Query parameters:
+        since: Only return activity entries from this index on; pass back the
+            returned activity_cursor to fetch just the entries added since the last poll.
+        verbose: Set to "false" to omit the verbose payload of activity entries.
+    
+    Responses carry an ETag that changes whenever the task does, so pollers sending
+    If-None-Match get an empty 304 while nothing has happened.
+    """
+    task = task_store.get(task_id)
+    if task is None:
         return jsonify({'error': 'Task not found'}), 404
     
-    task = research_tasks[task_id]
+    since = request.args.get('since', type=int)
+    include_verbose = request.args.get('verbose', 'true').lower() != 'false'
+    
+    # The queue can move while the task itself is unchanged
+    queue_position = scheduler.position(task_id) if task['status'] == 'pending' else None
+    etag = f"{task.get('version', 0)}-{since if since is not None else 'all'}-{int(include_verbose)}"
+    if queue_position is not None:
+        etag += f"-q{queue_position}"
+    if request.if_none_match.contains(etag):
+        not_modified = Response(status=304)
+        not_modified.set_etag(etag)
+        return not_modified
+    
     response = {
         'id': task['id'],
         'topic': task['topic'],
@@ -276,8 +442,22 @@ def get_research_status(task_id):
     if 'progress' in task:
         response['progress'] = task['progress']
     
-    if 'activity_log' in task:
-        response['activity_log'] = task['activity_log']
+    if task['status'] == 'pending':
+        response['queue_position'] = queue_position
+    
+    activity_log = task_store.activity(task_id, since=since or 0)
+    if since is not None:
+        response['activity_since'] = since
+    response['activity_cursor'] = max(since or 0, 0) + len(activity_log)
+    if not include_verbose:
+        activity_log = [
+            {key: value for key, value in entry.items() if key != 'verbose'}
+            for entry in activity_log
+        ]
+    response['activity_log'] = activity_log
+    
+    if task['status'] == 'running' and task.get('partial_summary'):
+        response['partial_summary'] = task['partial_summary']
     
     if task['status'] == 'completed':
         response['result'] = task['result']
@@ -285,8 +465,140 @@ def get_research_status(task_id):
             response['output_file'] = task['output_file']
     elif task['status'] == 'failed':
         response['error'] = task.get('error', 'Unknown error')
+        response['resumable'] = has_checkpoint(task_id)
     
-    return jsonify(response)
+    response = jsonify(response)
+    response.set_etag(etag)
+    return response
+
+@app.route('/api/research/<task_id>/timeline', methods=['GET'])
+def get_research_timeline(task_id):
+    """Get the span timeline of a research task.
+    
+    Running tasks report the spans finished so far; span start and end times are
+    seconds since the task started.
+    """
+    task = task_store.get(task_id)
+    if task is None:
+        return jsonify({'error': 'Task not found'}), 404
+    
+    with task_tracers_lock:
+        tracer = task_tracers.get(task_id)
+    timeline = tracer.timeline() if tracer is not None else task.get('timeline')
+    if timeline is None:
+        timeline = {'started_at': None, 'elapsed': 0.0, 'spans': [], 'dropped_spans': 0, 'totals': {}}
+    return jsonify({'id': task_id, 'status': task['status'], **timeline})
+
+def format_sse(event, data, event_id=None):
+    """Format one Server-Sent Events message."""
+    message = f'event: {event}\n'
+    if event_id is not None:
+        message += f'id: {event_id}\n'
+    return message + f'data: {json.dumps(data)}\n\n'
+
+@app.route('/api/research/<task_id>/events', methods=['GET'])
+def stream_research_events(task_id):
+    """Stream task updates as Server-Sent Events.
+
+    Pushes each new activity entry once (event "activity", id = entry index), status
+    and progress changes (event "status"), live summary text (event "summary") and a
+    final "done" event, so clients no longer re-download the whole activity log.
+    Reconnecting clients resume after the Last-Event-ID header or ?since= index.
+    """
+    if task_store.get(task_id) is None:
+        return jsonify({'error': 'Task not found'}), 404
+    
+    try:
+        cursor = int(request.headers.get('Last-Event-ID') or request.args.get('since') or 0)
+    except ValueError:
+        return jsonify({'error': 'Invalid event cursor'}), 400
+    
+    def generate():
+        nonlocal cursor
+        sent_status = None
+        sent_summary = ''
+        idle = 0
+        while True:
+            task = task_store.get(task_id)
+            if task is None:
+                return
+            seen_version = task['version']
+            
+            for entry in task_store.activity(task_id, since=cursor):
+                cursor += 1
+                yield format_sse('activity', entry, event_id=cursor)
+            
+            status = {'status': task['status'], 'progress': task.get('progress')}
+            if task['status'] == 'pending':
+                status['queue_position'] = scheduler.position(task_id)
+            if status != sent_status:
+                yield format_sse('status', status)
+                sent_status = status
+            
+            summary = task.get('partial_summary', '') if task['status'] == 'running' else ''
+            if summary != sent_summary:
+                if sent_summary and summary.startswith(sent_summary):
+                    yield format_sse('summary', {'delta': summary[len(sent_summary):]})
+                else:
+                    yield format_sse('summary', {'reset': True, 'text': summary})
+                sent_summary = summary
+            
+            if task['status'] in ('completed', 'failed'):
+                yield format_sse('done', {'status': task['status']})
+                return
+            
+            with task_events:
+                changed = task_events.wait_for(
+                    lambda: task_store.version(task_id) != seen_version,
+                    timeout=EVENT_STREAM_POLL,
+                )
+            idle = 0 if changed else idle + EVENT_STREAM_POLL
+            if idle >= EVENT_STREAM_HEARTBEAT:
+                yield ': keep-alive\n\n'
+                idle = 0
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
+
+@app.route('/api/research/<task_id>/resume', methods=['POST'])
+def resume_research(task_id):
+    """Resume a failed research task from its last checkpoint.
+    
+    Nodes that completed before the failure are not run again, so a retry only
+    repeats the search or LLM call that failed.
+    """
+    task = task_store.get(task_id)
+    if task is None:
+        return jsonify({'error': 'Task not found'}), 404
+    if checkpointer is None:
+        return jsonify({'error': 'Checkpointing is unavailable; install langgraph-checkpoint-sqlite'}), 501
+    if task['status'] != 'failed':
+        return jsonify({'error': f"Only failed tasks can be resumed (status: {task['status']})"}), 409
+    if not has_checkpoint(task_id):
+        return jsonify({'error': 'No checkpoint to resume from'}), 409
+    
+    update_task(task_id, status='pending', error=None, progress='Waiting to resume...')
+    queue_position = scheduler.submit(
+        task_id,
+        run_queued_research_task,
+        task_id,
+        task['topic'],
+        task.get('config') or {},
+        research_env_vars(),
+        resume=True,
+        backend=task.get('backend', 'ollama'),
+        priority=task.get('priority', 0),
+    )
+    
+    return jsonify({'task_id': task_id, 'queue_position': queue_position})
+
+@app.route('/api/queue', methods=['GET'])
+def get_queue_status():
+    """Get worker pool and admission queue statistics."""
+    return jsonify(scheduler.stats())
 
 @app.route('/api/models', methods=['GET'])
 def get_available_models():
@@ -339,6 +651,11 @@ def update_config():
     
     return jsonify({'status': 'success'})
 
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus metrics aggregated over every span recorded by this process."""
+    return Response(METRICS.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint."""
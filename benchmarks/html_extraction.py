@@ -0,0 +1,69 @@
+"""Benchmark the HTML-to-markdown pipeline on a corpus of saved pages.
+
+Compares plain markdownify over the whole page (the previous pipeline) with
+main-content extraction followed by markdownify, reporting throughput in pages per
+second and the size of the markdown handed to the LLM.
+
+Usage:
+    python benchmarks/html_extraction.py [--corpus DIR] [--repeat N]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+from markdownify import markdownify
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from ollama_deep_researcher.context import approximate_token_count  # noqa: E402
+from ollama_deep_researcher.extraction import html_to_markdown  # noqa: E402
+
+DEFAULT_CORPUS = Path(__file__).resolve().parent / "fixtures" / "html"
+
+
+def measure(convert, pages, repeat):
+    """Convert every page `repeat` times and return (pages/sec, outputs)."""
+    outputs = [convert(html) for html in pages]
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for html in pages:
+            convert(html)
+    elapsed = time.perf_counter() - start
+    return len(pages) * repeat / elapsed, outputs
+
+
+def main(argv=None) -> int:
+    """Benchmark html_to_markdown on a corpus of pages and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpus", type=Path, default=DEFAULT_CORPUS, help="Directory of .html files")
+    parser.add_argument("--repeat", type=int, default=20, help="Conversions per page (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    files = sorted(args.corpus.glob("*.html"))
+    if not files:
+        print(f"No .html files in {args.corpus}", file=sys.stderr)
+        return 1
+    pages = [path.read_text(encoding="utf-8", errors="replace") for path in files]
+
+    baseline_rate, baseline = measure(markdownify, pages, args.repeat)
+    extracted_rate, extracted = measure(html_to_markdown, pages, args.repeat)
+
+    print(f"{'page':<24}{'html':>9}{'markdownify':>13}{'extracted':>11}{'tokens saved':>14}")
+    for path, html, before, after in zip(files, pages, baseline, extracted):
+        saved = approximate_token_count(before) - approximate_token_count(after)
+        print(f"{path.name:<24}{len(html):>9}{len(before):>13}{len(after):>11}{saved:>14}")
+
+    before_chars = sum(map(len, baseline))
+    after_chars = sum(map(len, extracted))
+    print()
+    print(f"markdownify:     {baseline_rate:8.1f} pages/s, {before_chars} chars")
+    print(f"main content:    {extracted_rate:8.1f} pages/s, {after_chars} chars")
+    print(f"output reduced by {100 * (1 - after_chars / before_chars):.1f}%, "
+          f"throughput x{extracted_rate / baseline_rate:.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
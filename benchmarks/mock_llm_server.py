@@ -0,0 +1,281 @@
+"""A local stand-in for Ollama and OpenAI-compatible (LM Studio) model servers.
+
+Serves /api/chat and /api/tags (Ollama) and /v1/chat/completions and /v1/models
+(OpenAI-compatible), streaming or not. Responses are generated at a fixed token
+rate after a configurable time to first token, so graph latency can be measured
+without a GPU. The reply depends on which node is asking, recognized from the
+prompt: a JSON search query, a JSON follow-up query, JSON source scores, or
+summary prose. Only JSON mode is supported, not tool calling.
+
+Usage:
+    python benchmarks/mock_llm_server.py --port 11435 --token-rate 50 --ttft 0.3
+"""
+
+import argparse
+import json
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, List, Optional
+
+WORDS = (
+    "research shows that the approach improves efficiency across several settings while "
+    "costs continue to fall and adoption grows in most regions according to recent studies "
+    "although challenges remain around supply chains regulation and long term reliability"
+).split()
+
+_URL_RE = re.compile(r"https?://[^\s)>\]]+")
+
+
+def completion_for(messages: List[Dict[str, str]], summary_tokens: int) -> str:
+    """Return the reply a research-graph node expects for these messages."""
+    system = " ".join(m.get("content", "") for m in messages if m.get("role") == "system")
+    prompt = " ".join(m.get("content", "") for m in messages if m.get("role") != "system")
+    if "research quality assessor" in system:
+        urls = list(dict.fromkeys(url.rstrip(".,") for url in _URL_RE.findall(prompt)))
+        return json.dumps({
+            "sources": [
+                {"url": url, "title": "", "relevance_score": 0.8, "reason": "On topic", "source_type": "web"}
+                for url in urls
+            ],
+            "overall_quality": "high",
+            "recommendation": "proceed",
+        })
+    if "follow_up_query" in system:
+        return json.dumps({
+            "knowledge_gap": "The summary lacks recent quantitative data",
+            "follow_up_query": f"recent data and benchmarks {len(prompt) % 97}",
+        })
+    if '"query"' in system:
+        topic = re.search(r"<TOPIC>\s*(.*?)\s*</TOPIC>", system, re.S)
+        query = topic.group(1) if topic else "research topic"
+        return json.dumps({"query": f"{query} overview", "rationale": "Broad first search"})
+    return " ".join(WORDS[i % len(WORDS)] for i in range(summary_tokens)) + "."
+
+
+def split_tokens(text: str) -> List[str]:
+    """Split text into pseudo-tokens of about four characters."""
+    return [text[i:i + 4] for i in range(0, len(text), 4)] or [""]
+
+
+class MockLLMServer:
+    """Threaded mock model server; use as a context manager or call start()/stop()."""
+
+    def __init__(
+        self,
+        token_rate: float = 100.0,
+        ttft: float = 0.1,
+        summary_tokens: int = 200,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        """Configure the server.
+
+        Args:
+            token_rate: Generated tokens per second (0 for no delay)
+            ttft: Seconds before the first token
+            summary_tokens: Length of generated summaries, in words
+            host: Interface to bind
+            port: Port to bind; 0 picks a free one
+        """
+        self.token_rate = token_rate
+        self.ttft = ttft
+        self.summary_tokens = summary_tokens
+        self.stats = {"requests": 0, "prompt_chars": 0, "completion_tokens": 0}
+        self._stats_lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """Base URL of the running server."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "MockLLMServer":
+        """Serve requests from a background thread."""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Shut the server down and close its socket."""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "MockLLMServer":
+        """Start the server."""
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        """Stop the server."""
+        self.stop()
+
+    def generate(self, messages: List[Dict[str, str]]) -> Iterator[str]:
+        """Yield the reply token by token, paced by ttft and token_rate."""
+        tokens = split_tokens(completion_for(messages, self.summary_tokens))
+        with self._stats_lock:
+            self.stats["requests"] += 1
+            self.stats["prompt_chars"] += sum(len(m.get("content", "")) for m in messages)
+            self.stats["completion_tokens"] += len(tokens)
+        time.sleep(self.ttft)
+        delay = 1 / self.token_rate if self.token_rate else 0
+        for index, token in enumerate(tokens):
+            if index and delay:
+                time.sleep(delay)
+            yield token
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def send_json(self, payload, status=200):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def start_stream(self, content_type):
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+
+            def write_chunk(self, data: bytes):
+                self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+                self.wfile.flush()
+
+            def end_stream(self):
+                self.wfile.write(b"0\r\n\r\n")
+                self.wfile.flush()
+
+            def do_GET(self):
+                if self.path.startswith("/api/tags"):
+                    self.send_json({"models": [{"name": "mock-model", "model": "mock-model"}]})
+                elif self.path.startswith("/v1/models"):
+                    self.send_json({"object": "list", "data": [{"id": "mock-model", "object": "model"}]})
+                else:
+                    self.send_json({"error": "not found"}, 404)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                request = json.loads(self.rfile.read(length) or b"{}")
+                if self.path.startswith("/api/chat"):
+                    self.ollama_chat(request)
+                elif self.path.startswith("/v1/chat/completions"):
+                    self.openai_chat(request)
+                else:
+                    self.send_json({"error": "not found"}, 404)
+
+            def ollama_chat(self, request):
+                model = request.get("model", "mock-model")
+                started = time.monotonic()
+
+                def message(content, done):
+                    payload = {
+                        "model": model,
+                        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                        "message": {"role": "assistant", "content": content},
+                        "done": done,
+                    }
+                    if done:
+                        elapsed = int((time.monotonic() - started) * 1e9)
+                        payload.update(
+                            done_reason="stop",
+                            total_duration=elapsed,
+                            prompt_eval_count=prompt_tokens,
+                            eval_count=len(tokens),
+                            eval_duration=elapsed,
+                        )
+                    return payload
+
+                prompt_tokens = sum(len(m.get("content", "")) for m in request.get("messages", [])) // 4
+                tokens = []
+                if request.get("stream", True):
+                    self.start_stream("application/x-ndjson")
+                    for token in server.generate(request.get("messages", [])):
+                        tokens.append(token)
+                        self.write_chunk((json.dumps(message(token, False)) + "\n").encode())
+                    self.write_chunk((json.dumps(message("", True)) + "\n").encode())
+                    self.end_stream()
+                else:
+                    tokens = list(server.generate(request.get("messages", [])))
+                    self.send_json(message("".join(tokens), True))
+
+            def openai_chat(self, request):
+                model = request.get("model", "mock-model")
+                completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+                created = int(time.time())
+                prompt_tokens = sum(len(m.get("content", "")) for m in request.get("messages", [])) // 4
+                if request.get("stream"):
+                    self.start_stream("text/event-stream")
+                    for token in server.generate(request.get("messages", [])):
+                        chunk = {
+                            "id": completion_id,
+                            "object": "chat.completion.chunk",
+                            "created": created,
+                            "model": model,
+                            "choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}],
+                        }
+                        self.write_chunk(f"data: {json.dumps(chunk)}\n\n".encode())
+                    final = {
+                        "id": completion_id,
+                        "object": "chat.completion.chunk",
+                        "created": created,
+                        "model": model,
+                        "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+                    }
+                    self.write_chunk(f"data: {json.dumps(final)}\n\n".encode())
+                    self.write_chunk(b"data: [DONE]\n\n")
+                    self.end_stream()
+                else:
+                    tokens = list(server.generate(request.get("messages", [])))
+                    self.send_json({
+                        "id": completion_id,
+                        "object": "chat.completion",
+                        "created": created,
+                        "model": model,
+                        "choices": [{
+                            "index": 0,
+                            "message": {"role": "assistant", "content": "".join(tokens)},
+                            "finish_reason": "stop",
+                        }],
+                        "usage": {
+                            "prompt_tokens": prompt_tokens,
+                            "completion_tokens": len(tokens),
+                            "total_tokens": prompt_tokens + len(tokens),
+                        },
+                    })
+
+        return Handler
+
+
+def main(argv=None) -> None:
+    """Run the mock server in the foreground."""
+    parser = argparse.ArgumentParser(description="Mock Ollama / OpenAI-compatible model server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--token-rate", type=float, default=50.0, help="Tokens per second")
+    parser.add_argument("--ttft", type=float, default=0.3, help="Seconds to first token")
+    parser.add_argument("--summary-tokens", type=int, default=200, help="Words per summary")
+    args = parser.parse_args(argv)
+    server = MockLLMServer(args.token_rate, args.ttft, args.summary_tokens, args.host, args.port)
+    print(f"Mock model server listening on {server.url} (Ollama: {server.url}, OpenAI: {server.url}/v1)")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
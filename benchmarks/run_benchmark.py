@@ -0,0 +1,168 @@
+"""End-to-end latency benchmark of the research graph, fully offline.
+
+Starts the mock model server, replays recorded search responses, runs the graph
+on a set of topics, and reports per-node latency, wall time per topic and
+throughput. Every run uses identical inputs, so results from two commits can be
+compared directly.
+
+Usage:
+    python benchmarks/run_benchmark.py --topics 5 --loops 2 --token-rate 50 --ttft 0.3
+    python benchmarks/run_benchmark.py --provider lmstudio --search-api arxiv --json results.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import statistics
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from mock_llm_server import MockLLMServer  # noqa: E402
+from search_fixtures import PROVIDER_FUNCTIONS, SearchReplayer  # noqa: E402
+
+from ollama_deep_researcher.graph import build_graph  # noqa: E402
+from ollama_deep_researcher.llm_pool import clear_chat_models  # noqa: E402
+
+TOPICS = [
+    "grid-scale battery storage",
+    "heat pump efficiency in cold climates",
+    "sourdough fermentation science",
+    "rust compile time optimization",
+    "offshore wind turbine maintenance",
+    "microplastics in drinking water",
+    "quantum error correction codes",
+    "urban heat island mitigation",
+]
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Return the value at the given fraction (0-1) of the sorted values."""
+    ordered = sorted(values)
+    return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)]
+
+
+def run_benchmark(
+    topics: List[str],
+    configurable: Dict[str, Any],
+    server: MockLLMServer,
+    replayer: SearchReplayer,
+    verbose: bool = False,
+) -> Dict[str, Any]:
+    """Research each topic in turn and time every node.
+
+    Nodes run one after another, so the time between two consecutive "updates"
+    events of graph.stream is the latency of the node that produced the second.
+
+    Returns:
+        Per-node latencies, per-topic wall times and throughput figures
+    """
+    graph = build_graph()
+    node_latencies: Dict[str, List[float]] = defaultdict(list)
+    topic_seconds: List[float] = []
+    output = None if verbose else io.StringIO()
+    started = time.perf_counter()
+    with replayer.install(), contextlib.redirect_stdout(output or sys.stdout):
+        for topic in topics:
+            topic_started = last = time.perf_counter()
+            for update in graph.stream({"research_topic": topic}, {"configurable": configurable}, stream_mode="updates"):
+                now = time.perf_counter()
+                for node in update:
+                    node_latencies[node].append(now - last)
+                last = now
+            topic_seconds.append(time.perf_counter() - topic_started)
+    elapsed = time.perf_counter() - started
+    return {
+        "topics": len(topics),
+        "wall_seconds": elapsed,
+        "topics_per_hour": len(topics) * 3600 / elapsed if elapsed else 0.0,
+        "topic_seconds": {
+            "mean": statistics.mean(topic_seconds),
+            "p50": percentile(topic_seconds, 0.5),
+            "max": max(topic_seconds),
+        },
+        "nodes": {
+            node: {
+                "calls": len(latencies),
+                "mean": statistics.mean(latencies),
+                "p50": percentile(latencies, 0.5),
+                "p95": percentile(latencies, 0.95),
+                "total": sum(latencies),
+            }
+            for node, latencies in node_latencies.items()
+        },
+        "llm": dict(server.stats, tokens_per_second=server.stats["completion_tokens"] / elapsed if elapsed else 0.0),
+        "searches": dict(replayer.calls),
+    }
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    """Print per-node timings and the run totals as a table."""
+    wall = report["wall_seconds"]
+    print(f"{'node':<22}{'calls':>6}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'share':>8}")
+    for node, stats in sorted(report["nodes"].items(), key=lambda item: -item[1]["total"]):
+        print(
+            f"{node:<22}{stats['calls']:>6}{stats['mean'] * 1000:>10.1f}{stats['p50'] * 1000:>10.1f}"
+            f"{stats['p95'] * 1000:>10.1f}{stats['total'] / wall:>8.1%}"
+        )
+    topic = report["topic_seconds"]
+    print()
+    print(f"{report['topics']} topics in {wall:.2f}s: {report['topics_per_hour']:.1f} topics/hour")
+    print(f"per topic: mean {topic['mean']:.2f}s, p50 {topic['p50']:.2f}s, max {topic['max']:.2f}s")
+    llm = report["llm"]
+    print(f"LLM: {llm['requests']} requests, {llm['completion_tokens']} tokens generated")
+    print(f"searches: {', '.join(f'{api}={count}' for api, count in report['searches'].items() if count)}")
+
+
+def main(argv=None) -> int:
+    """Run the benchmark and print its report."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--topics", type=int, default=3, help="Number of topics to research (default: %(default)s)")
+    parser.add_argument("--loops", type=int, default=2, help="Research loops per topic (default: %(default)s)")
+    parser.add_argument("--provider", choices=["ollama", "lmstudio"], default="ollama")
+    parser.add_argument("--search-api", choices=sorted(PROVIDER_FUNCTIONS), default="duckduckgo")
+    parser.add_argument("--aggregate", help="Comma-separated search APIs to aggregate instead of --search-api")
+    parser.add_argument("--token-rate", type=float, default=50.0, help="Mock tokens per second (default: %(default)s)")
+    parser.add_argument("--ttft", type=float, default=0.3, help="Mock time to first token (default: %(default)s)")
+    parser.add_argument("--summary-tokens", type=int, default=200, help="Words per mock summary (default: %(default)s)")
+    parser.add_argument("--search-latency", type=float, default=0.2, help="Seconds per replayed search (default: %(default)s)")
+    parser.add_argument("--no-full-page", action="store_true", help="Don't include full page content")
+    parser.add_argument("--json", help="Also write the report to this JSON file")
+    parser.add_argument("--verbose", action="store_true", help="Show the graph's own output")
+    args = parser.parse_args(argv)
+
+    topics = [TOPICS[i % len(TOPICS)] for i in range(args.topics)]
+    with MockLLMServer(args.token_rate, args.ttft, args.summary_tokens) as server:
+        configurable = {
+            "llm_provider": args.provider,
+            "local_llm": "mock-model",
+            "ollama_base_url": server.url,
+            "lmstudio_base_url": f"{server.url}/v1",
+            "search_api": args.search_api,
+            "max_web_research_loops": args.loops,
+            "fetch_full_page": not args.no_full_page,
+            "use_tool_calling": False,
+            "enable_search_cache": False,
+            "enable_page_store": False,
+        }
+        if args.aggregate:
+            configurable["search_apis"] = args.aggregate.split(",")
+        clear_chat_models()
+        report = run_benchmark(topics, configurable, server, SearchReplayer(latency=args.search_latency), args.verbose)
+        clear_chat_models()
+
+    print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+"""Replayable search responses for every provider in ollama_deep_researcher.utils.
+
+Each provider has a fixture file in fixtures/search/<provider>.json:
+
+    {"provider": "tavily", "default": {...}, "queries": {"<query>": {...}}}
+
+Recorded queries are replayed verbatim. Any other query gets the "default"
+response with "{query}" and "{slug}" filled in, so every query returns distinct
+URLs, as it would from a live provider. The replayer stands in for the provider
+functions (tavily_search, duckduckgo_search, ...), so run_search, fan-out and
+caching logic still run as in production.
+
+To record live responses into the fixtures (needs network access and API keys):
+    python benchmarks/search_fixtures.py --record duckduckgo "query one" "query two"
+"""
+
+import argparse
+import copy
+import json
+import re
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from ollama_deep_researcher import utils  # noqa: E402
+
+FIXTURE_DIR = Path(__file__).resolve().parent / "fixtures" / "search"
+
+# Provider function in utils for each search API
+PROVIDER_FUNCTIONS = {
+    "tavily": "tavily_search",
+    "perplexity": "perplexity_search",
+    "duckduckgo": "duckduckgo_search",
+    "searxng": "searxng_search",
+    "arxiv": "arxiv_search",
+}
+
+
+def slugify(text: str) -> str:
+    """Turn a query into a fixture file name."""
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-") or "query"
+
+
+def _fill(value: Any, query: str, slug: str) -> Any:
+    if isinstance(value, str):
+        return value.replace("{query}", query).replace("{slug}", slug)
+    if isinstance(value, list):
+        return [_fill(item, query, slug) for item in value]
+    if isinstance(value, dict):
+        return {key: _fill(item, query, slug) for key, item in value.items()}
+    return value
+
+
+class SearchReplayer:
+    """Serve search responses from fixture files instead of live providers."""
+
+    def __init__(self, fixture_dir: Path = FIXTURE_DIR, latency: float = 0.0):
+        """Load the fixtures.
+
+        Args:
+            fixture_dir: Directory with one <provider>.json file per search API
+            latency: Seconds each simulated search takes
+        """
+        self.latency = latency
+        self.fixtures: Dict[str, Dict[str, Any]] = {}
+        for api in PROVIDER_FUNCTIONS:
+            path = fixture_dir / f"{api}.json"
+            if path.exists():
+                self.fixtures[api] = json.loads(path.read_text(encoding="utf-8"))
+        self.calls: Dict[str, int] = {api: 0 for api in self.fixtures}
+
+    def response(self, api: str, query: str, max_results: Optional[int] = None, fetch_full_page: bool = True) -> Dict[str, Any]:
+        """Return the replayed response for one search."""
+        fixture = self.fixtures[api]
+        self.calls[api] += 1
+        if self.latency:
+            time.sleep(self.latency)
+        recorded = fixture.get("queries", {}).get(query)
+        response = copy.deepcopy(recorded) if recorded is not None else _fill(fixture["default"], query, slugify(query))
+        if max_results is not None and api != "perplexity":
+            response["results"] = response["results"][:max_results]
+        if not fetch_full_page and api in ("tavily", "arxiv"):
+            for result in response["results"]:
+                result["raw_content"] = None if api == "tavily" else result["content"]
+        return response
+
+    def provider(self, api: str):
+        """Return a drop-in replacement for the provider function of one search API."""
+
+        def search(query, *args, **kwargs):
+            if api == "perplexity":
+                return self.response(api, query)
+            max_results = kwargs.get("max_results", args[0] if args and api != "tavily" else None)
+            fetch_full_page = kwargs.get("fetch_full_page", True)
+            return self.response(api, query, max_results, fetch_full_page)
+
+        return search
+
+    @contextmanager
+    def install(self):
+        """Replace the provider functions in utils for the duration of the block."""
+        originals = {name: getattr(utils, name) for name in PROVIDER_FUNCTIONS.values()}
+        try:
+            for api, name in PROVIDER_FUNCTIONS.items():
+                if api in self.fixtures:
+                    setattr(utils, name, self.provider(api))
+            yield self
+        finally:
+            for name, function in originals.items():
+                setattr(utils, name, function)
+
+
+def record(api: str, queries, fixture_dir: Path = FIXTURE_DIR, **kwargs) -> None:
+    """Run live searches and store their responses as recorded queries."""
+    path = fixture_dir / f"{api}.json"
+    fixture = json.loads(path.read_text(encoding="utf-8")) if path.exists() else {"provider": api, "queries": {}}
+    for query in queries:
+        fixture.setdefault("queries", {})[query] = utils.run_search(api, query, **kwargs)
+        print(f"Recorded {api}: {query} ({len(fixture['queries'][query].get('results', []))} results)")
+    path.write_text(json.dumps(fixture, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+
+
+def main(argv=None) -> int:
+    """Record live search responses for the given queries as fixtures."""
+    parser = argparse.ArgumentParser(description="Record live search responses as fixtures")
+    parser.add_argument("--record", required=True, choices=sorted(PROVIDER_FUNCTIONS), help="Search API")
+    parser.add_argument("--fetch-full-page", action="store_true")
+    parser.add_argument("queries", nargs="+")
+    args = parser.parse_args(argv)
+    record(args.record, args.queries, fetch_full_page=args.fetch_full_page)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,281 @@
+"""Run research on many topics at once.
+
+Usage:
+    python -m ollama_deep_researcher.batch topics.txt -o results.jsonl -c 4
+
+Topics are read one per line (blank lines and lines starting with "#" are skipped),
+or as JSON objects with a "topic" key. Each finished topic is written to the output
+as one JSON line as soon as it completes.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, TextIO
+
+from dotenv import load_dotenv
+
+from ollama_deep_researcher.configuration import Configuration
+from ollama_deep_researcher.scheduler import DEFAULT_MAX_CONCURRENCY
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BatchResult:
+    """Outcome of researching one topic."""
+
+    topic: str
+    status: str
+    summary: Optional[str] = None
+    error: Optional[str] = None
+    seconds: float = 0.0
+
+
+@dataclass
+class BatchReport:
+    """Results and throughput of a batch run."""
+
+    results: List[BatchResult] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def completed(self) -> int:
+        """Number of topics that produced a summary."""
+        return sum(result.status == "completed" for result in self.results)
+
+    @property
+    def failed(self) -> int:
+        """Number of topics that failed."""
+        return len(self.results) - self.completed
+
+    @property
+    def topics_per_hour(self) -> float:
+        """Completed topics per hour of wall-clock time."""
+        return self.completed * 3600 / self.elapsed if self.elapsed else 0.0
+
+
+def load_topics(lines: Iterable[str]) -> List[str]:
+    """Parse topics from plain-text or JSONL lines.
+
+    Args:
+        lines: Lines of a topics file
+
+    Returns:
+        The topics, in file order
+    """
+    topics = []
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if line.startswith("{"):
+            topics.append(json.loads(line)["topic"])
+        else:
+            topics.append(line)
+    return topics
+
+
+def research_topic(graph, topic: str, configurable: Dict[str, Any]) -> BatchResult:
+    """Research a single topic and capture the outcome instead of raising."""
+    started = time.monotonic()
+    try:
+        state = graph.invoke({"research_topic": topic}, {"configurable": dict(configurable)})
+        summary = state.get("running_summary") if state else None
+        if summary:
+            return BatchResult(topic, "completed", summary=summary, seconds=time.monotonic() - started)
+        return BatchResult(topic, "failed", error="No summary generated", seconds=time.monotonic() - started)
+    except Exception as e:
+        return BatchResult(topic, "failed", error=str(e), seconds=time.monotonic() - started)
+
+
+async def aresearch_topic(graph, topic: str, configurable: Dict[str, Any]) -> BatchResult:
+    """Async version of research_topic, for graphs built with async nodes."""
+    started = time.monotonic()
+    try:
+        state = await graph.ainvoke({"research_topic": topic}, {"configurable": dict(configurable)})
+        summary = state.get("running_summary") if state else None
+        if summary:
+            return BatchResult(topic, "completed", summary=summary, seconds=time.monotonic() - started)
+        return BatchResult(topic, "failed", error="No summary generated", seconds=time.monotonic() - started)
+    except Exception as e:
+        return BatchResult(topic, "failed", error=str(e), seconds=time.monotonic() - started)
+
+
+def run_batch(
+    topics: List[str],
+    concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    configurable: Optional[Dict[str, Any]] = None,
+    output: Optional[TextIO] = None,
+    on_result: Optional[Callable[[BatchResult], None]] = None,
+    graph=None,
+) -> BatchReport:
+    """Research many topics with bounded concurrency.
+
+    All topics run in this process against the same configuration, so they share
+    the pooled LLM clients, the on-disk search cache and the page store (both
+    looked up by cache_dir); a query or page fetched for one topic is reused by
+    every other topic that needs it.
+
+    Args:
+        topics: Research topics
+        concurrency: Number of topics researched at once
+        configurable: Configuration overrides passed to the graph (field names of
+            Configuration); unset fields fall back to environment variables
+        output: Text stream receiving one JSON line per finished topic
+        on_result: Callback invoked with each finished topic's result
+        graph: Compiled research graph; defaults to ollama_deep_researcher.graph.graph
+
+    Returns:
+        Results in completion order plus the batch's wall-clock time
+    """
+    if graph is None:
+        from ollama_deep_researcher.graph import graph
+    configurable = configurable or {}
+    report = BatchReport()
+    write_lock = threading.Lock()
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="batch") as executor:
+        futures = [
+            executor.submit(research_topic, graph, topic, configurable) for topic in topics
+        ]
+        for future in as_completed(futures):
+            result = future.result()
+            with write_lock:
+                report.results.append(result)
+                if output is not None:
+                    output.write(json.dumps(asdict(result)) + "\n")
+                    output.flush()
+            if on_result is not None:
+                on_result(result)
+    report.elapsed = time.monotonic() - started
+    return report
+
+
+async def arun_batch(
+    topics: List[str],
+    concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    configurable: Optional[Dict[str, Any]] = None,
+    output: Optional[TextIO] = None,
+    on_result: Optional[Callable[[BatchResult], None]] = None,
+    graph=None,
+) -> BatchReport:
+    """Async version of run_batch: one event loop drives every topic.
+
+    Takes the same arguments as run_batch, but `graph` defaults to
+    ollama_deep_researcher.async_graph.async_graph and concurrency is bounded with a
+    semaphore instead of a thread pool.
+    """
+    if graph is None:
+        from ollama_deep_researcher.async_graph import async_graph as graph
+    configurable = configurable or {}
+    report = BatchReport()
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    started = time.monotonic()
+
+    async def research(topic: str) -> BatchResult:
+        async with semaphore:
+            return await aresearch_topic(graph, topic, configurable)
+
+    for next_done in asyncio.as_completed([research(topic) for topic in topics]):
+        result = await next_done
+        report.results.append(result)
+        if output is not None:
+            output.write(json.dumps(asdict(result)) + "\n")
+            output.flush()
+        if on_result is not None:
+            on_result(result)
+    report.elapsed = time.monotonic() - started
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(
+        prog="python -m ollama_deep_researcher.batch",
+        description="Research every topic in a file and write the results as JSONL.",
+    )
+    parser.add_argument("topics", help="File with one topic per line, or '-' for stdin")
+    parser.add_argument("-o", "--output", help="JSONL output file (default: stdout)")
+    parser.add_argument(
+        "-c",
+        "--concurrency",
+        type=int,
+        default=int(os.environ.get("RESEARCH_MAX_CONCURRENCY", DEFAULT_MAX_CONCURRENCY)),
+        help="Topics researched at once (default: RESEARCH_MAX_CONCURRENCY or %(default)s)",
+    )
+    parser.add_argument(
+        "--async",
+        dest="use_async",
+        action="store_true",
+        help="Drive all topics from one event loop with the async graph",
+    )
+    parser.add_argument("--llm-provider", help="ollama or lmstudio")
+    parser.add_argument("--local-llm", help="Model name")
+    parser.add_argument("--search-api", help="Search API to use")
+    parser.add_argument("--max-web-research-loops", type=int, help="Research loops per topic")
+    args = parser.parse_args(argv)
+
+    # Progress goes to stderr so results can be piped from stdout
+    logging.basicConfig(level=logging.INFO, format="%(message)s", stream=sys.stderr)
+    load_dotenv()
+    from ollama_deep_researcher.graph import get_configured_search_cache
+
+    if args.topics == "-":
+        topics = load_topics(sys.stdin)
+    else:
+        with open(args.topics, encoding="utf-8") as f:
+            topics = load_topics(f)
+
+    configurable = {
+        name: value
+        for name, value in (
+            ("llm_provider", args.llm_provider),
+            ("local_llm", args.local_llm),
+            ("search_api", args.search_api),
+            ("max_web_research_loops", args.max_web_research_loops),
+        )
+        if value is not None
+    }
+    # Fail fast on invalid settings instead of once per topic
+    config = Configuration.from_runnable_config({"configurable": configurable})
+
+    def log(result: BatchResult):
+        logger.info("[%s] %s (%.1fs)", result.status, result.topic, result.seconds)
+
+    output = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        if args.use_async:
+            report = asyncio.run(
+                arun_batch(topics, args.concurrency, configurable, output=output, on_result=log)
+            )
+        else:
+            report = run_batch(topics, args.concurrency, configurable, output=output, on_result=log)
+    finally:
+        if args.output:
+            output.close()
+
+    logger.info(
+        "Completed %d/%d topics (%d failed) in %.1fs: %.1f topics/hour",
+        report.completed,
+        len(topics),
+        report.failed,
+        report.elapsed,
+        report.topics_per_hour,
+    )
+    search_cache = get_configured_search_cache(config)
+    if search_cache is not None:
+        stats = search_cache.stats()
+        logger.info("Search cache: %d hits, %d misses", stats["hits"], stats["misses"])
+    return 0 if report.failed == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,374 @@
+"""Persistent on-disk caches for search results and fetched pages."""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, Mapping, Optional
+
+# Seconds a cached response stays fresh, per search provider
+DEFAULT_SEARCH_TTLS = {
+    "tavily": 24 * 3600,
+    "perplexity": 24 * 3600,
+    "duckduckgo": 6 * 3600,
+    "searxng": 6 * 3600,
+    "arxiv": 7 * 24 * 3600,
+}
+DEFAULT_SEARCH_TTL = 24 * 3600
+DEFAULT_MAX_ENTRIES = 5000
+DEFAULT_MAX_PAGES = 2000
+
+_caches: Dict[str, "SearchCache"] = {}
+_page_stores: Dict[str, "PageStore"] = {}
+_caches_lock = threading.Lock()
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    if path != ":memory:":
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+    if path != ":memory:":
+        conn.execute("PRAGMA journal_mode=WAL")
+    return conn
+
+
+class SearchCache:
+    """SQLite-backed cache of search API responses.
+
+    Entries are keyed by (provider, query, max_results, fetch_full_page), expire after a
+    per-provider TTL and are evicted least-recently-used first once the cache holds more
+    than max_entries responses. The cache is safe to share between threads, and between
+    processes pointing at the same file.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        ttls: Optional[Mapping[str, float]] = None,
+        default_ttl: float = DEFAULT_SEARCH_TTL,
+    ):
+        """Open (or create) the cache database.
+
+        Args:
+            path: Location of the SQLite file, or ":memory:"
+            max_entries: Number of responses kept before LRU eviction kicks in
+            ttls: Per-provider TTL overrides in seconds, merged over DEFAULT_SEARCH_TTLS
+            default_ttl: TTL for providers without an explicit entry
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.ttls = {**DEFAULT_SEARCH_TTLS, **(ttls or {})}
+        self.default_ttl = default_ttl
+        self.hits: Counter = Counter()
+        self.misses: Counter = Counter()
+        self._lock = threading.Lock()
+        self._conn = _connect(path)
+        with self._lock:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS search_cache (
+                    key TEXT PRIMARY KEY,
+                    provider TEXT NOT NULL,
+                    response TEXT NOT NULL,
+                    expires_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS search_cache_last_access "
+                "ON search_cache (last_access)"
+            )
+
+    @staticmethod
+    def make_key(
+        provider: str, query: str, max_results: int, fetch_full_page: bool, **params: Any
+    ) -> str:
+        """Return the cache key for a search call.
+
+        Keyword arguments are any other provider-specific arguments that shape the
+        response, such as perplexity's loop_count.
+        """
+        raw = json.dumps(
+            [provider, query.strip(), max_results, bool(fetch_full_page), sorted(params.items())]
+        )
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(
+        self, provider: str, query: str, max_results: int, fetch_full_page: bool, **params: Any
+    ) -> Optional[Dict[str, Any]]:
+        """Return a fresh cached response, or None on a miss."""
+        key = self.make_key(provider, query, max_results, fetch_full_page, **params)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response FROM search_cache WHERE key = ? AND expires_at > ?",
+                (key, now),
+            ).fetchone()
+            if row is None:
+                self.misses[provider] += 1
+                return None
+            self._conn.execute(
+                "UPDATE search_cache SET last_access = ? WHERE key = ?", (now, key)
+            )
+            self.hits[provider] += 1
+        return json.loads(row[0])
+
+    def set(
+        self,
+        provider: str,
+        query: str,
+        max_results: int,
+        fetch_full_page: bool,
+        response: Dict[str, Any],
+        **params: Any,
+    ) -> None:
+        """Store a response and evict least-recently-used entries over the size limit."""
+        key = self.make_key(provider, query, max_results, fetch_full_page, **params)
+        now = time.time()
+        ttl = self.ttls.get(provider, self.default_ttl)
+        payload = json.dumps(response, default=str)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO search_cache "
+                "(key, provider, response, expires_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, provider, payload, now + ttl, now),
+            )
+            self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        self._conn.execute("DELETE FROM search_cache WHERE expires_at <= ?", (now,))
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM search_cache").fetchone()
+        if count > self.max_entries:
+            self._conn.execute(
+                "DELETE FROM search_cache WHERE key IN ("
+                "SELECT key FROM search_cache ORDER BY last_access ASC LIMIT ?)",
+                (count - self.max_entries,),
+            )
+
+    def clear(self) -> None:
+        """Drop every cached response and reset the counters."""
+        with self._lock:
+            self._conn.execute("DELETE FROM search_cache")
+            self.hits.clear()
+            self.misses.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and the current number of entries."""
+        with self._lock:
+            (entries,) = self._conn.execute(
+                "SELECT COUNT(*) FROM search_cache"
+            ).fetchone()
+        return {
+            "entries": entries,
+            "hits": sum(self.hits.values()),
+            "misses": sum(self.misses.values()),
+            "by_provider": {
+                provider: {"hits": self.hits[provider], "misses": self.misses[provider]}
+                for provider in sorted(set(self.hits) | set(self.misses))
+            },
+        }
+
+
+@dataclass
+class StoredPage:
+    """A previously fetched page and the validators needed to revalidate it."""
+
+    url: str
+    content_hash: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    markdown: str
+    converter: str = ""
+
+
+class PageStore:
+    """Content-addressed store of fetched pages.
+
+    Page bodies are stored once per SHA-256 content hash together with their markdown
+    conversion, and each URL points at the hash it last resolved to along with the
+    ETag/Last-Modified validators from that response. This lets fetchers send
+    conditional requests and skip both the download (304) and the markdown conversion
+    (unchanged hash) for pages that have not changed. Each conversion is tagged with
+    the converter that produced it, so conversions from an older pipeline can be
+    redone from the stored HTML.
+    """
+
+    def __init__(self, path: str, max_pages: int = DEFAULT_MAX_PAGES):
+        """Open (or create) the page store database.
+
+        Args:
+            path: Location of the SQLite file, or ":memory:"
+            max_pages: Number of URLs kept before least-recently-fetched pages are evicted
+        """
+        self.path = path
+        self.max_pages = max_pages
+        self.stats_counter: Counter = Counter()
+        self._lock = threading.Lock()
+        self._conn = _connect(path)
+        with self._lock:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS pages (
+                    url TEXT PRIMARY KEY,
+                    content_hash TEXT NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    fetched_at REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS blobs (
+                    content_hash TEXT PRIMARY KEY,
+                    html TEXT NOT NULL,
+                    markdown TEXT NOT NULL,
+                    converter TEXT NOT NULL DEFAULT ''
+                )
+                """
+            )
+            columns = [row[1] for row in self._conn.execute("PRAGMA table_info(blobs)")]
+            if "converter" not in columns:
+                # Stores created before conversions were versioned
+                self._conn.execute("ALTER TABLE blobs ADD COLUMN converter TEXT NOT NULL DEFAULT ''")
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS pages_fetched_at ON pages (fetched_at)"
+            )
+
+    @staticmethod
+    def hash_content(body: bytes) -> str:
+        """Return the content address for a response body."""
+        return hashlib.sha256(body).hexdigest()
+
+    def lookup(self, url: str) -> Optional[StoredPage]:
+        """Return the stored page for a URL, or None if it has never been fetched."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT p.content_hash, p.etag, p.last_modified, b.markdown, b.converter "
+                "FROM pages p JOIN blobs b ON b.content_hash = p.content_hash "
+                "WHERE p.url = ?",
+                (url,),
+            ).fetchone()
+        if row is None:
+            return None
+        return StoredPage(url, *row)
+
+    def markdown_for_hash(self, content_hash: str, converter: str = "") -> Optional[str]:
+        """Return the stored conversion for a body, if any URL has served it before.
+
+        Conversions made by a converter other than `converter` are ignored.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT markdown FROM blobs WHERE content_hash = ? AND converter = ?",
+                (content_hash, converter),
+            ).fetchone()
+        return row[0] if row else None
+
+    def html_for_hash(self, content_hash: str) -> Optional[str]:
+        """Return the stored HTML for a body, or None if it isn't stored."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT html FROM blobs WHERE content_hash = ?", (content_hash,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def put(
+        self,
+        url: str,
+        content_hash: str,
+        html: str,
+        markdown: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        converter: str = "",
+    ) -> None:
+        """Record the body a URL resolved to, along with its validators.
+
+        A stored conversion of the same body by a different converter is replaced.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO blobs (content_hash, html, markdown, converter) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (content_hash) DO UPDATE SET "
+                "markdown = excluded.markdown, converter = excluded.converter "
+                "WHERE converter != excluded.converter",
+                (content_hash, html, markdown, converter),
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages "
+                "(url, content_hash, etag, last_modified, fetched_at) VALUES (?, ?, ?, ?, ?)",
+                (url, content_hash, etag, last_modified, now),
+            )
+            self._evict()
+
+    def touch(self, url: str) -> None:
+        """Mark a page as freshly revalidated."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE pages SET fetched_at = ? WHERE url = ?", (time.time(), url)
+            )
+
+    def record(self, event: str) -> None:
+        """Count a fetch outcome ("not_modified", "unchanged", "reused", "reconverted" or "converted")."""
+        with self._lock:
+            self.stats_counter[event] += 1
+
+    def _evict(self) -> None:
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM pages").fetchone()
+        if count > self.max_pages:
+            self._conn.execute(
+                "DELETE FROM pages WHERE url IN ("
+                "SELECT url FROM pages ORDER BY fetched_at ASC LIMIT ?)",
+                (count - self.max_pages,),
+            )
+            self._conn.execute(
+                "DELETE FROM blobs WHERE content_hash NOT IN "
+                "(SELECT content_hash FROM pages)"
+            )
+
+    def stats(self) -> Dict[str, Any]:
+        """Return fetch outcome counters and the number of stored pages and bodies."""
+        with self._lock:
+            (pages,) = self._conn.execute("SELECT COUNT(*) FROM pages").fetchone()
+            (blobs,) = self._conn.execute("SELECT COUNT(*) FROM blobs").fetchone()
+            return {"pages": pages, "blobs": blobs, **self.stats_counter}
+
+
+def get_page_store(path: str) -> PageStore:
+    """Return the process-wide PageStore for a database file, creating it on first use."""
+    path = os.path.abspath(os.path.expanduser(path))
+    with _caches_lock:
+        if path not in _page_stores:
+            _page_stores[path] = PageStore(path)
+        return _page_stores[path]
+
+
+def get_search_cache(path: str) -> SearchCache:
+    """Return the process-wide SearchCache for a database file, creating it on first use."""
+    path = os.path.abspath(os.path.expanduser(path))
+    with _caches_lock:
+        if path not in _caches:
+            _caches[path] = SearchCache(path)
+        return _caches[path]
+
+
+def release_cache_memory() -> int:
+    """Ask every open cache database to free its in-memory page cache.
+
+    Returns:
+        The number of databases shrunk
+    """
+    with _caches_lock:
+        stores = list(_caches.values()) + list(_page_stores.values())
+    for store in stores:
+        with store._lock:
+            store._conn.execute("PRAGMA shrink_memory")
+    return len(stores)
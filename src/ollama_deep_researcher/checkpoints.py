@@ -0,0 +1,51 @@
+"""SQLite checkpoint storage for resumable research runs."""
+
+import os
+import sqlite3
+from typing import Callable
+
+
+def create_sqlite_checkpointer(path: str):
+    """Create a LangGraph checkpointer that saves graph state to a SQLite file.
+
+    Requires the optional `langgraph-checkpoint-sqlite` package.
+
+    Args:
+        path: Location of the SQLite file, or ":memory:"
+
+    Returns:
+        A SqliteSaver usable from multiple threads
+    """
+    try:
+        from langgraph.checkpoint.sqlite import SqliteSaver
+    except ImportError as e:
+        raise ImportError(
+            "Checkpointing requires langgraph-checkpoint-sqlite: "
+            "pip install langgraph-checkpoint-sqlite"
+        ) from e
+    if path != ":memory:":
+        path = os.path.expanduser(path)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    conn = sqlite3.connect(path, check_same_thread=False)
+    return SqliteSaver(conn)
+
+
+def delete_orphaned_checkpoints(checkpointer, keep: Callable[[str], bool]) -> int:
+    """Delete the checkpoints of every thread that keep() rejects.
+
+    Used to drop the saved state of tasks that no longer exist, e.g. after the task
+    store reaped them, so the checkpoint file doesn't grow without bound.
+
+    Args:
+        checkpointer: A SqliteSaver from create_sqlite_checkpointer
+        keep: Called with each thread ID; False deletes that thread's checkpoints
+
+    Returns:
+        How many threads were deleted
+    """
+    with checkpointer.cursor(transaction=False) as cur:
+        thread_ids = [row[0] for row in cur.execute("SELECT DISTINCT thread_id FROM checkpoints")]
+    orphaned = [thread_id for thread_id in thread_ids if not keep(thread_id)]
+    for thread_id in orphaned:
+        checkpointer.delete_thread(thread_id)
+    return len(orphaned)
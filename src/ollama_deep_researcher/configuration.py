@@ -22,6 +22,31 @@ class Configuration(BaseModel):
         title="Research Depth",
         description="Number of research iterations to perform",
     )
+    stop_on_convergence: bool = Field(
+        default=False,
+        title="Stop on Convergence",
+        description="End research before max_web_research_loops once new loops stop finding new sources, changing the summary or producing new queries",
+    )
+    min_research_loops: int = Field(
+        default=1,
+        title="Minimum Research Loops",
+        description="Research loops always run before convergence can end research",
+    )
+    min_source_novelty: float = Field(
+        default=0.2,
+        title="Minimum Source Novelty",
+        description="Share (0-1) of a loop's sources that must be new for it to count as finding new sources",
+    )
+    min_summary_change: float = Field(
+        default=0.1,
+        title="Minimum Summary Change",
+        description="Share (0-1) of the summary a loop must rewrite for it to count as changing the summary",
+    )
+    max_query_similarity: float = Field(
+        default=0.8,
+        title="Maximum Query Similarity",
+        description="Word overlap (0-1) with an earlier query at which a follow-up query counts as a repeat",
+    )
     local_llm: str = Field(
         default="llama3.2",
         title="LLM Model Name",
@@ -40,6 +65,31 @@ class Configuration(BaseModel):
         title="Fetch Full Page",
         description="Include the full page content in the search results",
     )
+    extract_passages: bool = Field(
+        default=True,
+        title="Extract Passages",
+        description="Keep the passages of long pages that best match the query instead of only the start of each page",
+    )
+    search_timeout: float = Field(
+        default=20.0,
+        title="Search Timeout",
+        description="Per-provider deadline in seconds when aggregating multiple search APIs",
+    )
+    enable_search_cache: bool = Field(
+        default=True,
+        title="Enable Search Cache",
+        description="Reuse recent search results from the on-disk cache instead of calling the search API again",
+    )
+    enable_page_store: bool = Field(
+        default=True,
+        title="Enable Page Store",
+        description="Keep fetched full pages on disk and revalidate them with ETag/Last-Modified instead of re-downloading",
+    )
+    cache_dir: str = Field(
+        default="~/.cache/ollama-deep-researcher",
+        title="Cache Directory",
+        description="Directory holding the on-disk search cache and page store",
+    )
     ollama_base_url: str = Field(
         default="http://localhost:11434/",
         title="Ollama Base URL",
@@ -55,6 +105,11 @@ class Configuration(BaseModel):
         title="Strip Thinking Tokens",
         description="Whether to strip <think> tokens from model responses",
     )
+    stream_summary: bool = Field(
+        default=True,
+        title="Stream Summary",
+        description="Stream summary tokens to the progress callback as they are generated",
+    )
     use_tool_calling: bool = Field(
         default=False,
         title="Use Tool Calling",
@@ -75,20 +130,60 @@ class Configuration(BaseModel):
         title="Maximum Validation Retries",
         description="Maximum number of search retries when sources fail validation",
     )
+    relevance_prefilter: bool = Field(
+        default=True,
+        title="Relevance Pre-filter",
+        description="Score sources lexically against the topic before LLM validation; only ambiguous ones go to the LLM",
+    )
+    prefilter_reject_below: float = Field(
+        default=0.15,
+        title="Pre-filter Reject Threshold",
+        description="Lexical relevance score (0-1) below which a source is rejected without an LLM call",
+    )
+    prefilter_accept_above: float = Field(
+        default=0.75,
+        title="Pre-filter Accept Threshold",
+        description="Lexical relevance score (0-1) at or above which a source is accepted without an LLM call",
+    )
+    pack_context: bool = Field(
+        default=True,
+        title="Pack Context",
+        description="Fit the research text into the model's context window, most relevant sources first",
+    )
+    num_ctx: Optional[int] = Field(
+        default=None,
+        title="Context Window (tokens)",
+        description="Model context window in tokens; passed to Ollama as num_ctx (None for the server default of 4096)",
+    )
+    context_reserve_tokens: int = Field(
+        default=1024,
+        title="Reserved Output Tokens",
+        description="Tokens of the context window kept free for the generated summary",
+    )
+    tokenizer: Literal["approximate", "tiktoken"] = Field(
+        default="approximate",
+        title="Tokenizer",
+        description="How prompt tokens are counted: a fast character/word estimate, or tiktoken's cl100k_base",
+    )
+    compact_state: bool = Field(
+        default=False,
+        title="Compact State",
+        description="Keep only the latest research text and compact source metadata in graph state, so its size doesn't grow with the number of loops",
+    )
     enable_memory_monitoring: bool = Field(
         default=True,
         title="Enable Memory Monitoring",
-        description="Monitor memory usage during research",
+        description="Sample process memory and record it for every graph node",
     )
     memory_limit_mb: Optional[int] = Field(
         default=None,
         title="Memory Limit (MB)",
-        description="Optional memory limit in MB (None for no limit)",
+        description="Memory limit in MB; once crossed, caches are evicted and full-page content dropped, then research fails if still over (None for no limit)",
     )
     optimize_for_low_memory: bool = Field(
         default=False,
         title="Optimize for Low Memory",
-        description="Use memory-efficient settings for resource-constrained environments",
+        description="Read fetched pages up to a size cap and keep only the page text the prompt uses in graph state",
     )
 
     @classmethod
@@ -0,0 +1,166 @@
+"""Token counting and packing of research text into the model's context window."""
+
+import logging
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import List
+
+from ollama_deep_researcher.lexical import score_texts
+from ollama_deep_researcher.sources import CHARS_PER_TOKEN, SourceBundle
+
+logger = logging.getLogger(__name__)
+
+# Ollama's context window when num_ctx isn't set
+DEFAULT_NUM_CTX = 4096
+
+# Don't bother adding a truncated source with less room than this
+MIN_PARTIAL_TOKENS = 64
+
+TRUNCATION_MARKER = "... [truncated]"
+
+_PIECE_RE = re.compile(r"\w+|[^\w\s]")
+
+
+def approximate_token_count(text: str) -> int:
+    """Estimate the token count of text without a tokenizer.
+
+    Takes the larger of the character-based estimate and the number of words and
+    punctuation marks, so both long prose and symbol-heavy text (URLs, tables,
+    code) are counted conservatively.
+    """
+    if not text:
+        return 0
+    return max(-(-len(text) // CHARS_PER_TOKEN), len(_PIECE_RE.findall(text)))
+
+
+@lru_cache(maxsize=1)
+def _tiktoken_encoding():
+    """Load tiktoken's cl100k_base encoding, or return None if it isn't available."""
+    try:
+        import tiktoken
+
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        # Not installed, or the encoding can't be downloaded (e.g. offline)
+        logger.warning("tiktoken unavailable, using approximate token counts: %s", e)
+        return None
+
+
+def count_tokens(text: str, tokenizer: str = "approximate") -> int:
+    """Count the tokens in text.
+
+    Args:
+        text: Text to count
+        tokenizer: "tiktoken" for a real BPE tokenizer (falls back to the
+            approximation when tiktoken can't be loaded), or "approximate"
+
+    Returns:
+        The token count
+    """
+    if tokenizer == "tiktoken":
+        encoding = _tiktoken_encoding()
+        if encoding is not None:
+            return len(encoding.encode(text, disallowed_special=()))
+    return approximate_token_count(text)
+
+
+def truncate_to_tokens(text: str, max_tokens: int, tokenizer: str = "approximate") -> str:
+    """Cut text down to at most max_tokens tokens, marking the cut."""
+    if count_tokens(text, tokenizer) <= max_tokens:
+        return text
+    budget = max(max_tokens - count_tokens(TRUNCATION_MARKER, tokenizer), 0)
+    if tokenizer == "tiktoken" and _tiktoken_encoding() is not None:
+        encoding = _tiktoken_encoding()
+        return encoding.decode(encoding.encode(text, disallowed_special=())[:budget]) + TRUNCATION_MARKER
+    end = min(len(text), budget * CHARS_PER_TOKEN)
+    while end > 0 and approximate_token_count(text[:end]) > budget:
+        end = end * 9 // 10
+    return text[:end] + TRUNCATION_MARKER
+
+
+@dataclass
+class PackedContext:
+    """Research text fitted into a token budget."""
+
+    text: str
+    budget: int
+    used_tokens: int
+    dropped_tokens: int
+    included: List[str] = field(default_factory=list)  # URLs, most relevant first
+    truncated: List[str] = field(default_factory=list)
+    dropped: List[str] = field(default_factory=list)
+
+
+def pack_sources(
+    bundle: SourceBundle,
+    query: str,
+    budget: int,
+    max_tokens_per_source: int,
+    fetch_full_page: bool,
+    tokenizer: str = "approximate",
+    extract_passages: bool = False,
+) -> PackedContext:
+    """Fill a token budget with sources, most relevant first.
+
+    Sources are ranked by lexical relevance to `query` and added whole while they
+    fit. A source that doesn't fit is truncated to the remaining room if at least
+    MIN_PARTIAL_TOKENS are left, which fills the budget and drops every source after
+    it. With less room left it is dropped instead, and smaller, less relevant
+    sources may still fit whole after it.
+
+    Args:
+        bundle: Sources to pack
+        query: Text to rank the sources against, e.g. the research topic
+        budget: Maximum number of tokens for the packed text
+        max_tokens_per_source: Per-source page content limit used when rendering
+        fetch_full_page: Whether to include each source's full page content
+        tokenizer: Tokenizer passed to count_tokens
+        extract_passages: Whether to cut long pages down to the passages matching
+            `query` rather than their start
+
+    Returns:
+        The packed text and what was kept, truncated and dropped
+    """
+    header = "Sources:\n\n"
+    remaining = budget - count_tokens(header, tokenizer)
+    records = list(bundle)
+    scores = score_texts(
+        query, [f"{record.title} {record.content} {record.raw_content or ''}" for record in records]
+    )
+    ranked = sorted(zip(scores, range(len(records))), key=lambda pair: (-pair[0], pair[1]))
+
+    parts = [header]
+    packed = PackedContext(text="", budget=budget, used_tokens=0, dropped_tokens=0)
+    for _, position in ranked:
+        record = records[position]
+        text = "".join(
+            record.render(max_tokens_per_source, fetch_full_page, query if extract_passages else None)
+        )
+        tokens = count_tokens(text, tokenizer)
+        if tokens <= remaining:
+            parts.append(text)
+            packed.included.append(record.url)
+            remaining -= tokens
+        elif remaining >= MIN_PARTIAL_TOKENS:
+            text = truncate_to_tokens(text, remaining, tokenizer)
+            parts.append(text)
+            packed.truncated.append(record.url)
+            packed.dropped_tokens += tokens - count_tokens(text, tokenizer)
+            remaining = 0
+        else:
+            packed.dropped.append(record.url)
+            packed.dropped_tokens += tokens
+
+    packed.text = "".join(parts).strip()
+    packed.used_tokens = count_tokens(packed.text, tokenizer)
+    return packed
+
+
+def pack_text(text: str, budget: int, tokenizer: str = "approximate") -> PackedContext:
+    """Fit unstructured research text into a token budget by truncating it."""
+    tokens = count_tokens(text, tokenizer)
+    if tokens > budget:
+        text = truncate_to_tokens(text, budget, tokenizer)
+    used = count_tokens(text, tokenizer)
+    return PackedContext(text=text, budget=budget, used_tokens=used, dropped_tokens=max(tokens - used, 0))
@@ -0,0 +1,110 @@
+"""Convergence detection for the research loop.
+
+After each loop, route_research asks whether another round is likely to add
+anything. It looks at three signals:
+
+- source novelty: share of the latest search's URLs that earlier loops hadn't seen
+- summary change: how much the latest summarization rewrote the running summary
+- query similarity: word overlap between the next follow-up query and earlier ones
+
+Research stops early when the next query repeats an earlier one, or when the latest
+loop brought both few new sources and little change to the summary.
+"""
+
+import difflib
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterable, List, Optional
+
+from ollama_deep_researcher.configuration import Configuration
+from ollama_deep_researcher.lexical import tokenize
+from ollama_deep_researcher.sources import canonicalize_url
+
+
+def source_novelty(urls: Iterable[str], seen_urls: Iterable[str]) -> float:
+    """Return the fraction (0-1) of distinct URLs that are not in seen_urls.
+
+    URLs are compared in canonical form, as SourceBundle deduplicates them. A search
+    that returned nothing counts as no novelty.
+    """
+    urls = {canonicalize_url(url) for url in urls}
+    if not urls:
+        return 0.0
+    return len(urls - {canonicalize_url(url) for url in seen_urls}) / len(urls)
+
+
+def summary_change(previous: Optional[str], current: str) -> float:
+    """Return how much of the summary changed (0-1), by word-level diff.
+
+    The first summary of a run counts as a complete change.
+    """
+    if not previous:
+        return 1.0
+    matcher = difflib.SequenceMatcher(None, previous.split(), current.split())
+    return 1.0 - matcher.ratio()
+
+
+def query_similarity(query: Optional[str], previous_queries: Iterable[str]) -> float:
+    """Return the highest word overlap (Jaccard, 0-1) between query and any previous query."""
+    if not query:
+        return 0.0
+    words = set(tokenize(query))
+    best = 0.0
+    for previous in previous_queries:
+        if previous.strip().lower() == query.strip().lower():
+            return 1.0
+        previous_words = set(tokenize(previous))
+        if words and previous_words:
+            best = max(best, len(words & previous_words) / len(words | previous_words))
+    return best
+
+
+@dataclass
+class Convergence:
+    """Convergence signals after a research loop, and whether research should stop."""
+
+    converged: bool
+    reason: Optional[str]
+    source_novelty: float
+    summary_change: Optional[float]
+    query_similarity: float
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the signals as a dict for progress updates, with scores rounded to 3 places."""
+        return {
+            key: round(value, 3) if isinstance(value, float) else value
+            for key, value in asdict(self).items()
+        }
+
+
+def previous_queries(search_query: Optional[str], query_history: List[str]) -> List[str]:
+    """Return the queries run before search_query, which may be the last history entry."""
+    if query_history and query_history[-1] == search_query:
+        return query_history[:-1]
+    return query_history
+
+
+def check_convergence(state: Any, configurable: Configuration) -> Convergence:
+    """Decide whether the research loop has converged.
+
+    Args:
+        state: Current graph state, after reflect_on_summary produced the next query
+        configurable: Configuration object with the convergence thresholds
+
+    Returns:
+        The signals and whether (and why) research should stop
+    """
+    novelty = state.source_novelty
+    change = state.summary_change
+    similarity = query_similarity(state.search_query, previous_queries(state.search_query, state.query_history))
+
+    reason = None
+    if state.research_loop_count >= configurable.min_research_loops:
+        if similarity >= configurable.max_query_similarity:
+            reason = "the next query repeats an earlier one"
+        elif (
+            novelty < configurable.min_source_novelty
+            and change is not None
+            and change < configurable.min_summary_change
+        ):
+            reason = "the last loop found few new sources and barely changed the summary"
+    return Convergence(reason is not None, reason, novelty, change, similarity)
@@ -0,0 +1,196 @@
+"""Main-content extraction for fetched web pages.
+
+Pages are stripped of scripts, navigation, footers, cookie banners and similar
+boilerplate, then the block most likely to hold the article is picked with a
+readability-style score before the result is converted to markdown. Converting
+only the main content is both cheaper than converting the whole page and gives
+the LLM far less noise per token.
+"""
+
+import re
+from typing import Dict, Optional
+
+from bs4 import BeautifulSoup, Comment, Tag
+from markdownify import MarkdownConverter
+
+try:
+    import lxml  # noqa: F401
+
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
+# Identifies the markdown produced by this pipeline; stored conversions made by a
+# different version are redone (see PageStore)
+CONVERTER_VERSION = "main-content-1"
+
+# Elements that never hold article text
+BOILERPLATE_TAGS = (
+    "script", "style", "noscript", "template", "svg", "canvas", "iframe", "object",
+    "embed", "form", "button", "input", "select", "textarea", "nav", "header",
+    "footer", "aside", "dialog", "link", "meta",
+)
+
+# class/id patterns of boilerplate and of content containers
+NEGATIVE_PATTERN = re.compile(
+    r"advert|\bads?\b|banner|breadcrumb|comment|consent|cookie|disqus|footer|gdpr|"
+    r"header|masthead|menu|modal|navbar|\bnav\b|newsletter|popup|promo|related|"
+    r"share|sidebar|social|sponsor|subscribe|widget",
+    re.I,
+)
+POSITIVE_PATTERN = re.compile(
+    r"article|\bbody\b|content|entry|h-entry|hentry|main|page|post|story|text",
+    re.I,
+)
+
+# Blocks whose text is scored, and how each candidate's tag adjusts its score
+SCORED_TAGS = ("p", "pre", "td", "blockquote")
+TAG_WEIGHTS = {
+    "article": 10, "main": 10, "div": 5, "section": 3, "pre": 3, "td": 3,
+    "blockquote": 3, "ol": -3, "ul": -3, "dl": -3, "th": -5, "li": -3,
+}
+MIN_BLOCK_CHARS = 25
+
+# Below this much text the best candidate is probably wrong; keep the whole body
+MIN_CONTENT_CHARS = 250
+
+_converter = MarkdownConverter()
+
+
+def _attributes(element: Tag) -> str:
+    return " ".join(element.get("class") or []) + " " + (element.get("id") or "")
+
+
+def _class_weight(element: Tag) -> int:
+    attributes = _attributes(element)
+    weight = 0
+    if NEGATIVE_PATTERN.search(attributes):
+        weight -= 25
+    if POSITIVE_PATTERN.search(attributes):
+        weight += 25
+    return weight
+
+
+def _link_density(element: Tag, text_length: int) -> float:
+    if not text_length:
+        return 1.0
+    link_length = sum(len(link.get_text(strip=True)) for link in element.find_all("a"))
+    return min(link_length / text_length, 1.0)
+
+
+def _is_hidden(element: Tag) -> bool:
+    style = (element.get("style") or "").replace(" ", "").lower()
+    return (
+        element.has_attr("hidden")
+        or element.get("aria-hidden") == "true"
+        or "display:none" in style
+        or "visibility:hidden" in style
+    )
+
+
+def _wraps_main_content(element: Tag, page_length: int) -> bool:
+    """Check whether a block is a page-level wrapper rather than boilerplate.
+
+    Layout wrappers often carry classes like "wy-grid-for-nav" or "has-sidebar";
+    they contain the main content and must not be removed with the boilerplate.
+    """
+    if element.find(["article", "main"]) or element.find(attrs={"role": "main"}):
+        return True
+    return len(element.get_text(" ", strip=True)) > page_length / 2
+
+
+def strip_boilerplate(soup: BeautifulSoup) -> None:
+    """Remove comments, non-content tags, hidden elements and boilerplate blocks in place."""
+    for comment in soup.find_all(string=lambda text: isinstance(text, Comment)):
+        comment.extract()
+    for element in soup.find_all(BOILERPLATE_TAGS):
+        element.decompose()
+    page_length = len(soup.get_text(" ", strip=True))
+    for element in soup.find_all(True):
+        if element.decomposed or element.name in ("html", "body", "article", "main"):
+            continue
+        if _is_hidden(element):
+            element.decompose()
+            continue
+        attributes = _attributes(element)
+        if (
+            NEGATIVE_PATTERN.search(attributes)
+            and not POSITIVE_PATTERN.search(attributes)
+            and not _wraps_main_content(element, page_length)
+        ):
+            element.decompose()
+
+
+def find_main_content(soup: BeautifulSoup) -> Tag:
+    """Return the element most likely to contain the page's main content.
+
+    Every paragraph-like block scores 1 point, plus a point per comma and per 100
+    characters (up to 3); its parent receives the score and its grandparent half of
+    it. Candidates are adjusted by tag and class/id, scaled down by the share of
+    their text that is link text, and the best one wins. Siblings of the winner
+    that also look like content are kept with it. If the winner holds too little
+    text, the <article>, <main> or <body> element is returned instead.
+    """
+    scores: Dict[int, float] = {}
+    candidates: Dict[int, Tag] = {}
+    for block in soup.find_all(SCORED_TAGS):
+        text = block.get_text(" ", strip=True)
+        if len(text) < MIN_BLOCK_CHARS:
+            continue
+        score = 1 + text.count(",") + min(len(text) // 100, 3)
+        for ancestor, share in ((block.parent, 1.0), (block.parent.parent if block.parent else None, 0.5)):
+            if not isinstance(ancestor, Tag) or ancestor.name in ("html", "[document]"):
+                continue
+            key = id(ancestor)
+            if key not in candidates:
+                candidates[key] = ancestor
+                scores[key] = TAG_WEIGHTS.get(ancestor.name, 0) + _class_weight(ancestor)
+            scores[key] += score * share
+
+    top: Optional[Tag] = None
+    top_score = 0.0
+    final_scores: Dict[int, float] = {}
+    for key, candidate in candidates.items():
+        text_length = len(candidate.get_text(" ", strip=True))
+        final_scores[key] = scores[key] * (1 - _link_density(candidate, text_length))
+        if final_scores[key] > top_score:
+            top, top_score = candidate, final_scores[key]
+
+    fallback = soup.find("article") or soup.find("main") or soup.body or soup
+    if top is None or len(top.get_text(" ", strip=True)) < MIN_CONTENT_CHARS:
+        return fallback
+
+    # Keep siblings that score close to the winner, or are substantial paragraphs
+    threshold = max(10.0, top_score * 0.2)
+    parent = top.parent
+    if not isinstance(parent, Tag):
+        return top
+    kept = []
+    for sibling in parent.find_all(True, recursive=False):
+        if sibling is top or final_scores.get(id(sibling), 0) >= threshold:
+            kept.append(sibling)
+        elif sibling.name == "p":
+            text = sibling.get_text(" ", strip=True)
+            if len(text) > 80 and _link_density(sibling, len(text)) < 0.25:
+                kept.append(sibling)
+    if len(kept) == 1:
+        return top
+    container = soup.new_tag("div")
+    for sibling in kept:
+        container.append(sibling.extract())
+    return container
+
+
+def html_to_markdown(html: str) -> str:
+    """Convert a page's main content to markdown.
+
+    Args:
+        html: The page's HTML
+
+    Returns:
+        Markdown for the main content, with boilerplate removed
+    """
+    soup = BeautifulSoup(html, HTML_PARSER)
+    strip_boilerplate(soup)
+    markdown = _converter.convert_soup(find_main_content(soup))
+    return re.sub(r"\n{3,}", "\n\n", markdown).strip()
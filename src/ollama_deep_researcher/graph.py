@@ -1,30 +1,49 @@
 import json
+import os
+import time
+from dataclasses import dataclass
 
 from pydantic import BaseModel, Field
+from typing import Any, Callable, Optional
 from typing_extensions import Literal
 
 from langchain_core.messages import HumanMessage, SystemMessage
 from langchain_core.runnables import RunnableConfig
 from langchain_core.tools import tool
-from langchain_ollama import ChatOllama
 from langgraph.graph import START, END, StateGraph
 
+from ollama_deep_researcher.cache import (
+    PageStore,
+    SearchCache,
+    get_page_store,
+    get_search_cache,
+)
 from ollama_deep_researcher.configuration import Configuration, SearchAPI
+from ollama_deep_researcher.context import (
+    DEFAULT_NUM_CTX,
+    PackedContext,
+    count_tokens,
+    pack_sources,
+    pack_text,
+)
+from ollama_deep_researcher.convergence import check_convergence, source_novelty, summary_change
+from ollama_deep_researcher.memory import LOW_MEMORY_MAX_PAGE_BYTES, guard_node
+from ollama_deep_researcher.relevance import PrefilterResult, prefilter_sources
+from ollama_deep_researcher.sources import SourceBundle
 from ollama_deep_researcher.utils import (
-    deduplicate_and_format_sources,
-    tavily_search,
+    SUPPORTED_SEARCH_APIS,
+    fan_out_search,
     format_sources,
-    perplexity_search,
-    duckduckgo_search,
-    searxng_search,
-    arxiv_search,
+    run_search,
     strip_thinking_tokens,
     get_config_value,
+    ThinkingTokenFilter,
 )
 from ollama_deep_researcher.state import (
     SummaryState,
     SummaryStateInput,
     SummaryStateOutput,
+    replace,
 )
 from ollama_deep_researcher.prompts import (
     query_writer_instructions,
@@ -36,38 +55,67 @@ from ollama_deep_researcher.prompts import (
     json_mode_reflection_instructions,
     tool_calling_reflection_instructions,
 )
-from ollama_deep_researcher.lmstudio import ChatLMStudio
+from ollama_deep_researcher.llm_pool import get_chat_model
 
 # Constants
 MAX_TOKENS_PER_SOURCE = 1000
 CHARS_PER_TOKEN = 4
+SUMMARY_STREAM_INTERVAL = 0.25  # Seconds between partial summary updates
 
-def generate_search_query_with_structured_output(
+@tool
+class Query(BaseModel):
+    """
+    This tool is used to generate a query for web search.
+    """
+
+    query: str = Field(description="The actual search query string")
+    rationale: str = Field(
+        description="Brief explanation of why this query is relevant"
+    )
+
+
+@tool
+class FollowUpQuery(BaseModel):
+    """
+    This tool is used to generate a follow-up query to address a knowledge gap.
+    """
+
+    follow_up_query: str = Field(
+        description="Write a specific question to address this gap"
+    )
+    knowledge_gap: str = Field(
+        description="Describe what information is missing or needs clarification"
+    )
+
+
+def get_query_llm(configurable: Configuration, tool_class, query_model: str = None):
+    """Return the LLM for query generation, with the tool bound in tool calling mode."""
+    llm = get_llm(configurable, query_model)
+    if configurable.use_tool_calling:
+        return llm.bind_tools([tool_class])
+    return llm
+
+
+def parse_structured_query(
+    result,
     configurable: Configuration,
-    messages: list,
-    tool_class,
     fallback_query: str,
     tool_query_field: str,
     json_query_field: str,
-    query_model: str = None,
-):
-    """Helper function to generate search queries using either tool calling or JSON mode.
-    
+) -> dict:
+    """Extract the search query from a tool call or JSON response.
+
     Args:
+        result: LLM response message
         configurable: Configuration object
-        messages: List of messages to send to LLM
-        tool_class: Tool class for tool calling mode
         fallback_query: Fallback search query if extraction fails
         tool_query_field: Field name in tool args containing the query
         json_query_field: Field name in JSON response containing the query
-        
+
     Returns:
         Dictionary with "search_query" key
     """
     if configurable.use_tool_calling:
-        llm = get_llm(configurable, query_model).bind_tools([tool_class])
-        result = llm.invoke(messages)
-
         if not result.tool_calls:
             return {"search_query": fallback_query}
         
@@ -80,8 +128,6 @@ def generate_search_query_with_structured_output(
     
     else:
         # Use JSON mode
-        llm = get_llm(configurable, query_model)
-        result = llm.invoke(messages)
         print(f"result: {result}")
         content = result.content
 
@@ -96,10 +142,51 @@ def generate_search_query_with_structured_output(
                 content = strip_thinking_tokens(content)
             return {"search_query": fallback_query}
 
+
+def generate_search_query_with_structured_output(
+    configurable: Configuration,
+    messages: list,
+    tool_class,
+    fallback_query: str,
+    tool_query_field: str,
+    json_query_field: str,
+    query_model: str = None,
+):
+    """Helper function to generate search queries using either tool calling or JSON mode.
+    
+    Args:
+        configurable: Configuration object
+        messages: List of messages to send to LLM
+        tool_class: Tool class for tool calling mode
+        fallback_query: Fallback search query if extraction fails
+        tool_query_field: Field name in tool args containing the query
+        json_query_field: Field name in JSON response containing the query
+        
+    Returns:
+        Dictionary with "search_query" key
+    """
+    result = get_query_llm(configurable, tool_class, query_model).invoke(messages)
+    return parse_structured_query(
+        result, configurable, fallback_query, tool_query_field, json_query_field
+    )
+
+def get_llm_base_url(configurable: Configuration) -> str:
+    """Return the model server URL for the configured LLM provider."""
+    if configurable.llm_provider == "lmstudio":
+        return configurable.lmstudio_base_url
+    return configurable.ollama_base_url
+
+def get_llm_options(configurable: Configuration) -> dict:
+    """Return provider-specific model options, e.g. Ollama's num_ctx."""
+    if configurable.llm_provider == "ollama" and configurable.num_ctx:
+        return {"num_ctx": configurable.num_ctx}
+    return {}
+
 def get_llm(configurable: Configuration, model_override: str = None):
-    """Helper function to initialize LLM based on configuration.
+    """Helper function to get the pooled LLM client for a configuration.
 
     Uses JSON mode if use_tool_calling is False, otherwise regular mode for tool calling.
+    Clients are shared across nodes, loops and research tasks via llm_pool.
 
     Args:
         configurable: Configuration object containing LLM settings
@@ -110,51 +197,117 @@ def get_llm(configurable: Configuration, model_override: str = None):
     """
     model = model_override or configurable.local_llm
     
+    base_url = get_llm_base_url(configurable)
     if configurable.llm_provider == "lmstudio":
-        if configurable.use_tool_calling:
-            return ChatLMStudio(
-                base_url=configurable.lmstudio_base_url,
-                model=model,
-                temperature=0,
-            )
-        else:
-            return ChatLMStudio(
-                base_url=configurable.lmstudio_base_url,
-                model=model,
-                temperature=0,
-                format="json",
-            )
+        # LMStudio needs an explicit JSON response format unless tools are bound
+        format = None if configurable.use_tool_calling else "json"
     else:  # Default to Ollama
-        if configurable.use_tool_calling:
-            return ChatOllama(
-                base_url=configurable.ollama_base_url,
-                model=model,
-                temperature=0,
-            )
+        # No format="json" for Ollama - causes malformed JSON with control characters
+        # Using prompt-based JSON instead for reliable output
+        format = None
+
+    return get_chat_model(
+        configurable.llm_provider,
+        base_url,
+        model,
+        temperature=0,
+        format=format,
+        **get_llm_options(configurable),
+    )
+
+def get_configured_search_cache(configurable: Configuration) -> Optional[SearchCache]:
+    """Return the shared search cache for this configuration, or None if caching is disabled."""
+    if not configurable.enable_search_cache:
+        return None
+    return get_search_cache(os.path.join(configurable.cache_dir, "search_cache.sqlite"))
+
+def get_configured_page_store(configurable: Configuration) -> Optional[PageStore]:
+    """Return the shared page store for this configuration, or None if it is disabled."""
+    if not (configurable.enable_page_store and configurable.fetch_full_page):
+        return None
+    return get_page_store(os.path.join(configurable.cache_dir, "pages.sqlite"))
+
+class SummaryStreamer:
+    """Forward partial summary text to the progress callback as tokens arrive.
+
+    The first visible text is forwarded immediately and later tokens are batched every
+    SUMMARY_STREAM_INTERVAL seconds, so the UI sees output quickly without one activity
+    update per token. Updates carry the stage "summary_stream" and either a "reset"
+    with the full "text" to display, which starts each new summary, or a "delta" to
+    append. Thinking tokens are filtered out as they arrive and never reach the UI.
+    """
+
+    def __init__(self, progress_callback, strip_thinking: bool):
+        """Start a new summary stream.
+
+        Args:
+            progress_callback: Callback receiving (step, detail, verbose_data)
+            strip_thinking: Whether to hide <think> blocks from the streamed text
+        """
+        self.progress_callback = progress_callback
+        self.thinking_filter = ThinkingTokenFilter() if strip_thinking else None
+        self.chunks = []
+        self.pending = ""
+        self.started = False
+        self.last_emit = 0.0
+
+    def add(self, content: str) -> None:
+        """Record the next chunk of model output."""
+        if not content:
+            return
+        self.chunks.append(content)
+        self.pending += self.thinking_filter.feed(content) if self.thinking_filter else content
+        if (self.pending and not self.started) or time.monotonic() - self.last_emit >= SUMMARY_STREAM_INTERVAL:
+            self.emit()
+
+    def finish(self) -> str:
+        """Send the final update and return the complete text, before thinking tokens are stripped."""
+        if self.thinking_filter:
+            self.pending += self.thinking_filter.flush()
+        self.emit(final=True)
+        return "".join(self.chunks)
+
+    def emit(self, final: bool = False) -> None:
+        """Send any text received since the last update."""
+        self.last_emit = time.monotonic()
+        if not self.pending and not final:
+            return
+        if self.started:
+            update = {"stage": "summary_stream", "delta": self.pending}
         else:
-            return ChatOllama(
-                base_url=configurable.ollama_base_url,
-                model=model,
-                temperature=0,
-                # Removed format="json" - causes malformed JSON with control characters
-                # Using prompt-based JSON instead for reliable output
-            )
+            update = {"stage": "summary_stream", "reset": True, "text": self.pending}
+        update["final"] = final
+        self.progress_callback("✍️ Writing summary", None, update)
+        self.pending = ""
+        self.started = True
 
-# Nodes
-def generate_query(state: SummaryState, config: RunnableConfig):
-    """LangGraph node that generates a search query based on the research topic.
 
-    Uses an LLM to create an optimized search query for web research based on
-    the user's research topic. Supports both LMStudio and Ollama as LLM providers.
+def stream_summary_text(llm, messages: list, progress_callback, strip_thinking: bool) -> str:
+    """Stream a summary from the LLM, forwarding partial text to the progress callback.
+
+    See SummaryStreamer for how updates are batched and formatted.
 
     Args:
-        state: Current graph state containing the research topic
-        config: Configuration for the runnable, including LLM provider settings
+        llm: Chat model to stream from
+        messages: Messages to send to the LLM
+        progress_callback: Callback receiving (step, detail, verbose_data)
+        strip_thinking: Whether to hide <think> blocks from the streamed text
 
     Returns:
-        Dictionary with state update, including search_query key containing the generated query
+        The complete summary text, before thinking tokens are stripped
     """
+    streamer = SummaryStreamer(progress_callback, strip_thinking)
+    for chunk in llm.stream(messages):
+        streamer.add(chunk.content)
+    return streamer.finish()
 
+# Nodes
+def prepare_query_generation(state: SummaryState, config: RunnableConfig) -> dict:
+    """Build the arguments for generating the first search query.
+
+    Returns:
+        Keyword arguments for generate_search_query_with_structured_output
+    """
     # Get progress callback if available
     progress_callback = config.get("configurable", {}).get("progress_callback", lambda x, y=None, z=None: None)
     
@@ -182,17 +335,6 @@ def generate_query(state: SummaryState, config: RunnableConfig):
         {"stage": "query_generation", "topic": state.research_topic}
     )
 
-    @tool
-    class Query(BaseModel):
-        """
-        This tool is used to generate a query for web search.
-        """
-
-        query: str = Field(description="The actual search query string")
-        rationale: str = Field(
-            description="Brief explanation of why this query is relevant"
-        )
-
     messages = [
         SystemMessage(
             content=formatted_prompt + (
@@ -206,7 +348,7 @@ def generate_query(state: SummaryState, config: RunnableConfig):
     # Check for custom query model
     query_model = config.get("configurable", {}).get("query_model")
     
-    result = generate_search_query_with_structured_output(
+    return dict(
         configurable=configurable,
         messages=messages,
         tool_class=Query,
@@ -215,147 +357,228 @@ def generate_query(state: SummaryState, config: RunnableConfig):
         json_query_field="query",
         query_model=query_model,
     )
-    
-    # Add generated query to history for future reference
+
+
+def add_query_to_history(result: dict) -> dict:
+    """Add a generated query to query_history for future reference."""
     if "search_query" in result:
         result["query_history"] = [result["search_query"]]
-    
     return result
 
 
-def web_research(state: SummaryState, config: RunnableConfig):
-    """LangGraph node that performs web research using the generated search query.
+def generate_query(state: SummaryState, config: RunnableConfig):
+    """LangGraph node that generates a search query based on the research topic.
 
-    Executes a web search using the configured search API (tavily, perplexity,
-    duckduckgo, or searxng) and formats the results for further processing.
+    Uses an LLM to create an optimized search query for web research based on
+    the user's research topic. Supports both LMStudio and Ollama as LLM providers.
 
     Args:
-        state: Current graph state containing the search query and research loop count
-        config: Configuration for the runnable, including search API settings
+        state: Current graph state containing the research topic
+        config: Configuration for the runnable, including LLM provider settings
 
     Returns:
-        Dictionary with state update, including sources_gathered, research_loop_count, and web_research_results
+        Dictionary with state update, including search_query key containing the generated query
     """
+    result = generate_search_query_with_structured_output(**prepare_query_generation(state, config))
+    return add_query_to_history(result)
 
-    # Configure
-    configurable = Configuration.from_runnable_config(config)
-    
-    # Get progress callback if available
-    progress_callback = config.get("configurable", {}).get("progress_callback", None)
-    if not progress_callback:
-        progress_callback = lambda x, y=None, z=None: None
-    
-    # Fix: don't add 1 to loop count since it starts at 1
-    current_loop = state.research_loop_count
-    if current_loop == 0:
-        current_loop = 1
-    
-    # Check if we have multiple search APIs to aggregate
-    search_apis = config.get("configurable", {}).get("search_apis", None)
-    
-    if search_apis and isinstance(search_apis, list) and len(search_apis) > 0:
-        # Multi-source search aggregation
-        progress_callback(
-            f"🔍 Aggregating results from {len(search_apis)} sources (Loop {current_loop}/{configurable.max_web_research_loops})",
-            f"Query: {state.search_query}",
-            {"sources": search_apis, "loop": current_loop}
-        )
+
+def get_passage_query(state: SummaryState, configurable: Configuration) -> Optional[str]:
+    """Return the text long pages are matched against, or None to keep the start of each page."""
+    if not configurable.extract_passages:
+        return None
+    return f"{state.research_topic} {state.search_query}"
+
+
+def research_results_update(configurable: Configuration, research: str) -> Any:
+    """Update for web_research_results: in compaction mode only the latest research is kept."""
+    return replace([research]) if configurable.compact_state else [research]
+
+
+def sources_gathered_update(state: SummaryState, configurable: Configuration, formatted_sources: str) -> Any:
+    """Update for sources_gathered with one loop's "* title : url" lines.
+
+    In compaction mode, all loops' lines are merged into a single deduplicated entry.
+    """
+    if not configurable.compact_state:
+        return [formatted_sources]
+    lines = dict.fromkeys(
+        line
+        for sources in [*state.sources_gathered, formatted_sources]
+        for line in sources.split("\n")
+        if line.strip()
+    )
+    return replace(["\n".join(lines)])
+
+
+class WebResearchRun:
+    """Bookkeeping for one web_research step, shared by the sync and async nodes.
+
+    The node only performs the searches: it passes each provider's outcome to
+    add_result() when aggregating several search APIs, then builds the state update
+    with aggregated_update() or, for a single API, single_update().
+    """
+
+    def __init__(self, state: SummaryState, config: RunnableConfig):
+        """Resolve configuration and announce the searches about to run."""
+        self.state = state
+        self.configurable = configurable = Configuration.from_runnable_config(config)
+        
+        # Get progress callback if available
+        progress_callback = config.get("configurable", {}).get("progress_callback", None)
+        if not progress_callback:
+            progress_callback = lambda x, y=None, z=None: None
+        self.progress_callback = progress_callback
+        
+        # Fix: don't add 1 to loop count since it starts at 1
+        current_loop = state.research_loop_count
+        if current_loop == 0:
+            current_loop = 1
         
-        all_search_results = []
-        all_formatted_sources = []
+        self.search_cache = get_configured_search_cache(configurable)
+        self.page_store = get_configured_page_store(configurable)
+        self.all_search_results = []
+        self.all_formatted_sources = []
+        self.supported_apis = []
         
-        for api in search_apis:
+        # Check if we have multiple search APIs to aggregate
+        search_apis = config.get("configurable", {}).get("search_apis", None)
+        self.aggregate = bool(search_apis and isinstance(search_apis, list) and len(search_apis) > 0)
+        
+        if self.aggregate:
+            # Multi-source search aggregation
             progress_callback(
-                f"📡 Searching {api}...",
+                f"🔍 Aggregating results from {len(search_apis)} sources (Loop {current_loop}/{configurable.max_web_research_loops})",
                 f"Query: {state.search_query}",
-                {"api": api, "loop": current_loop}
+                {"sources": search_apis, "loop": current_loop}
             )
             
-            try:
-                if api == "tavily":
-                    results = tavily_search(
-                        state.search_query,
-                        fetch_full_page=configurable.fetch_full_page,
-                        max_results=2,  # Fewer results per source when aggregating
-                    )
-                elif api == "perplexity":
-                    results = perplexity_search(
-                        state.search_query, state.research_loop_count
-                    )
-                elif api == "duckduckgo":
-                    results = duckduckgo_search(
-                        state.search_query,
-                        max_results=2,
-                        fetch_full_page=configurable.fetch_full_page,
-                    )
-                elif api == "searxng":
-                    results = searxng_search(
-                        state.search_query,
-                        max_results=2,
-                        fetch_full_page=configurable.fetch_full_page,
-                    )
-                elif api == "arxiv":
-                    results = arxiv_search(
-                        state.search_query,
-                        max_results=2,
-                        fetch_full_page=configurable.fetch_full_page,
-                    )
-                else:
+            for api in search_apis:
+                if api not in SUPPORTED_SEARCH_APIS:
                     progress_callback(
                         f"⚠️ Skipping unsupported API: {api}",
                         None,
                         {"api": api, "error": "Unsupported"}
                     )
                     continue
-                
-                if results and "results" in results and len(results["results"]) > 0:
-                    all_search_results.append(results)
-                    all_formatted_sources.append(format_sources(results))
-                    progress_callback(
-                        f"✅ Found {len(results['results'])} results from {api}",
-                        f"Sources: {', '.join(r['title'][:50] for r in results['results'][:2])}",
-                        {"api": api, "count": len(results["results"]), "results": results["results"]}
-                    )
-                else:
-                    progress_callback(
-                        f"⚠️ No results from {api}",
-                        None,
-                        {"api": api, "count": 0}
-                    )
-                    
-            except Exception as e:
+                self.supported_apis.append(api)
                 progress_callback(
-                    f"❌ Error searching {api}: {str(e)}",
-                    str(e),
-                    {"api": api, "error": str(e)}
+                    f"📡 Searching {api}...",
+                    f"Query: {state.search_query}",
+                    {"api": api, "loop": current_loop}
                 )
+        else:
+            # Single search API (original behavior)
+            progress_callback(
+                f"🔍 Searching web (Loop {current_loop}/{configurable.max_web_research_loops})",
+                f"Query: {state.search_query} | API: {configurable.search_api}",
+                {"api": configurable.search_api, "loop": current_loop}
+            )
+            
+            # Get the search API
+            self.search_api = get_config_value(configurable.search_api)
+
+    def fan_out_kwargs(self) -> dict:
+        """Arguments for fan_out_search when aggregating providers."""
+        return dict(
+            max_results=2,  # Fewer results per source when aggregating
+            fetch_full_page=self.configurable.fetch_full_page,
+            loop_count=self.state.research_loop_count,
+            timeout=self.configurable.search_timeout,
+            cache=self.search_cache,
+            page_store=self.page_store,
+            max_page_bytes=self.max_page_bytes,
+        )
+
+    def search_kwargs(self) -> dict:
+        """Arguments for run_search with the single configured API."""
+        return dict(
+            max_results=1 if self.search_api == "tavily" else 3,
+            fetch_full_page=self.configurable.fetch_full_page,
+            loop_count=self.state.research_loop_count,
+            cache=self.search_cache,
+            page_store=self.page_store,
+            max_page_bytes=self.max_page_bytes,
+        )
+
+    @property
+    def max_page_bytes(self) -> Optional[int]:
+        """Bytes read per fetched page; capped in the low-memory profile."""
+        return LOW_MEMORY_MAX_PAGE_BYTES if self.configurable.optimize_for_low_memory else None
+
+    def records_update(self, bundle: SourceBundle) -> list:
+        """Source records to keep in state; the low-memory profile drops unused page text."""
+        if self.configurable.optimize_for_low_memory:
+            bundle = bundle.condensed(MAX_TOKENS_PER_SOURCE, get_passage_query(self.state, self.configurable))
+        return bundle.to_dicts()
+
+    def add_result(self, api: str, results, error: Optional[BaseException]) -> None:
+        """Record one provider's outcome while aggregating."""
+        progress_callback = self.progress_callback
+        if error is not None:
+            progress_callback(
+                f"❌ Error searching {api}: {str(error)}",
+                str(error),
+                {"api": api, "error": str(error)}
+            )
+        elif results and "results" in results and len(results["results"]) > 0:
+            self.all_search_results.append(results)
+            self.all_formatted_sources.append(format_sources(results))
+            progress_callback(
+                f"✅ Found {len(results['results'])} results from {api}",
+                f"Sources: {', '.join(r['title'][:50] for r in results['results'][:2])}",
+                {"api": api, "count": len(results["results"]), "results": results["results"]}
+            )
+        else:
+            progress_callback(
+                f"⚠️ No results from {api}",
+                None,
+                {"api": api, "count": 0}
+            )
+
+    def aggregated_update(self) -> dict:
+        """Deduplicate and format all aggregated results into a state update."""
+        state = self.state
+        all_search_results = self.all_search_results
+        all_formatted_sources = self.all_formatted_sources
+        search_cache = self.search_cache
+        progress_callback = self.progress_callback
         
-        # Deduplicate and format all aggregated results
         if all_search_results:
-            search_str = deduplicate_and_format_sources(
-                all_search_results,
-                max_tokens_per_source=MAX_TOKENS_PER_SOURCE,
-                fetch_full_page=configurable.fetch_full_page,
-                seen_urls=state.seen_urls,
+            bundle = SourceBundle.from_search_responses(all_search_results, seen_urls=state.seen_urls)
+            search_str = bundle.render(
+                MAX_TOKENS_PER_SOURCE,
+                self.configurable.fetch_full_page,
+                get_passage_query(state, self.configurable),
             )
             
             # Update seen URLs with new URLs from this search
-            for result_set in all_search_results:
-                if "results" in result_set:
-                    for result in result_set["results"]:
-                        if "url" in result:
-                            state.seen_urls.add(result["url"])
+            urls = [
+                result["url"]
+                for result_set in all_search_results
+                for result in result_set.get("results", [])
+                if "url" in result
+            ]
+            novelty = source_novelty(urls, state.seen_urls)
+            seen_urls = set(state.seen_urls) | set(urls)
             formatted_sources = "\n".join(all_formatted_sources)
             
             total_results = sum(len(r.get('results', [])) for r in all_search_results)
             progress_callback(
                 f"🎯 Aggregation complete: {total_results} total results from {len(all_search_results)} sources",
                 f"Successfully searched: {len([s for s in all_formatted_sources if s])} APIs",
-                {"total_sources": len(all_search_results), "total_results": total_results}
+                {
+                    "total_sources": len(all_search_results),
+                    "total_results": total_results,
+                    "search_cache": search_cache.stats() if search_cache else None,
+                }
             )
         else:
+            bundle = SourceBundle()
             search_str = "No search results found."
             formatted_sources = ""
+            seen_urls = state.seen_urls
+            novelty = 0.0
             progress_callback(
                 "⚠️ No results from any search source",
                 "All search attempts failed or returned no results",
@@ -363,119 +586,96 @@ def web_research(state: SummaryState, config: RunnableConfig):
             )
         
         return {
-            "sources_gathered": [formatted_sources],
+            "sources_gathered": sources_gathered_update(state, self.configurable, formatted_sources),
+            "source_records": self.records_update(bundle),
+            "seen_urls": seen_urls,
+            "source_novelty": novelty,
             "research_loop_count": state.research_loop_count + 1,
-            "web_research_results": [search_str],
+            "web_research_results": research_results_update(self.configurable, search_str),
         }
-    else:
-        # Single search API (original behavior)
-        progress_callback(
-            f"🔍 Searching web (Loop {current_loop}/{configurable.max_web_research_loops})",
-            f"Query: {state.search_query} | API: {configurable.search_api}",
-            {"api": configurable.search_api, "loop": current_loop}
-        )
-
-        # Get the search API
-        search_api = get_config_value(configurable.search_api)
 
-        # Search the web
-        if search_api == "tavily":
-            search_results = tavily_search(
-                state.search_query,
-                fetch_full_page=configurable.fetch_full_page,
-                max_results=1,
-            )
-            search_str = deduplicate_and_format_sources(
-                search_results,
-                max_tokens_per_source=MAX_TOKENS_PER_SOURCE,
-                fetch_full_page=configurable.fetch_full_page,
-                seen_urls=state.seen_urls,
-            )
-        elif search_api == "perplexity":
-            search_results = perplexity_search(
-                state.search_query, state.research_loop_count
-            )
-            search_str = deduplicate_and_format_sources(
-                search_results,
-                max_tokens_per_source=MAX_TOKENS_PER_SOURCE,
-                fetch_full_page=configurable.fetch_full_page,
-                seen_urls=state.seen_urls,
-            )
-        elif search_api == "duckduckgo":
-            search_results = duckduckgo_search(
-                state.search_query,
-                max_results=3,
-                fetch_full_page=configurable.fetch_full_page,
-            )
-            search_str = deduplicate_and_format_sources(
-                search_results,
-                max_tokens_per_source=MAX_TOKENS_PER_SOURCE,
-                fetch_full_page=configurable.fetch_full_page,
-                seen_urls=state.seen_urls,
-            )
-        elif search_api == "searxng":
-            search_results = searxng_search(
-                state.search_query,
-                max_results=3,
-                fetch_full_page=configurable.fetch_full_page,
-            )
-            search_str = deduplicate_and_format_sources(
-                search_results,
-                max_tokens_per_source=MAX_TOKENS_PER_SOURCE,
-                fetch_full_page=configurable.fetch_full_page,
-                seen_urls=state.seen_urls,
-            )
-        elif search_api == "arxiv":
-            search_results = arxiv_search(
-                state.search_query,
-                max_results=3,
-                fetch_full_page=configurable.fetch_full_page,
-            )
-            search_str = deduplicate_and_format_sources(
-                search_results,
-                max_tokens_per_source=MAX_TOKENS_PER_SOURCE,
-                fetch_full_page=configurable.fetch_full_page,
-                seen_urls=state.seen_urls,
-            )
-        else:
-            raise ValueError(f"Unsupported search API: {configurable.search_api}")
+    def single_update(self, search_results) -> dict:
+        """Format the single configured API's results into a state update."""
+        state = self.state
+        search_api = self.search_api
+        search_cache = self.search_cache
+        
+        bundle = SourceBundle.from_search_responses(search_results, seen_urls=state.seen_urls)
+        search_str = bundle.render(
+            MAX_TOKENS_PER_SOURCE,
+            self.configurable.fetch_full_page,
+            get_passage_query(state, self.configurable),
+        )
 
         # Update seen URLs with new URLs from this single search
-        if search_results and "results" in search_results:
-            for result in search_results["results"]:
-                if "url" in result:
-                    state.seen_urls.add(result["url"])
+        urls = [result["url"] for result in (search_results or {}).get("results", []) if "url" in result]
+        novelty = source_novelty(urls, state.seen_urls)
+        seen_urls = set(state.seen_urls) | set(urls)
         
         # Log successful search
         num_results = len(search_results.get("results", [])) if search_results else 0
-        progress_callback(
+        self.progress_callback(
             f"✅ {search_api.title()} search successful",
             f"Found {num_results} results for web research",
-            {"api": search_api, "results_count": num_results}
+            {
+                "api": search_api,
+                "results_count": num_results,
+                "search_cache": search_cache.stats() if search_cache else None,
+            }
         )
 
         return {
-            "sources_gathered": [format_sources(search_results)],
+            "sources_gathered": sources_gathered_update(state, self.configurable, format_sources(search_results)),
+            "source_records": self.records_update(bundle),
+            "seen_urls": seen_urls,
+            "source_novelty": novelty,
             "research_loop_count": state.research_loop_count + 1,
-            "web_research_results": [search_str],
+            "web_research_results": research_results_update(self.configurable, search_str),
         }
 
 
-def validate_sources(state: SummaryState, config: RunnableConfig):
-    """LangGraph node that validates the quality and relevance of web research sources.
+def web_research(state: SummaryState, config: RunnableConfig):
+    """LangGraph node that performs web research using the generated search query.
 
-    Analyzes the gathered sources to ensure they are relevant, credible, and provide
-    substantive information related to the research topic. Filters out low-quality
-    or irrelevant sources and can trigger new searches if needed.
+    Executes a web search using the configured search API (tavily, perplexity,
+    duckduckgo, or searxng) and formats the results for further processing.
 
     Args:
-        state: Current graph state containing research topic and web research results
-        config: Configuration for the runnable, including LLM provider settings
+        state: Current graph state containing the search query and research loop count
+        config: Configuration for the runnable, including search API settings
 
     Returns:
-        Dictionary with state update, including validated_sources flag and filtered results
+        Dictionary with state update, including sources_gathered, research_loop_count, and web_research_results
     """
-    
+    run = WebResearchRun(state, config)
+    if run.aggregate:
+        # Dispatch every provider at once and merge results in completion order
+        for api, results, error in fan_out_search(
+            run.supported_apis, state.search_query, **run.fan_out_kwargs()
+        ):
+            run.add_result(api, results, error)
+        return run.aggregated_update()
+
+    # Search the web
+    search_results = run_search(run.search_api, state.search_query, **run.search_kwargs())
+    return run.single_update(search_results)
+
+
+@dataclass
+class SourceValidation:
+    """A prepared validate_sources run, shared by the sync and async nodes."""
+
+    state: SummaryState
+    configurable: Configuration
+    bundle: SourceBundle
+    prefiltered: Optional[PrefilterResult] = None
+    current_retries: int = 0
+    messages: Optional[list] = None  # None when no LLM call is needed
+    update: Optional[dict] = None  # Set when the node can return without validating
+
+
+def prepare_source_validation(state: SummaryState, config: RunnableConfig) -> SourceValidation:
+    """Pre-filter the latest sources and build the LLM validation prompt for the rest."""
     # Get progress callback if available
     progress_callback = config.get("configurable", {}).get("progress_callback", lambda x, y=None, z=None: None)
     
@@ -484,20 +684,53 @@ def validate_sources(state: SummaryState, config: RunnableConfig):
     
     # Get most recent web research and sources
     if not state.web_research_results:
-        return {"validated_sources": False, "validation_retry_needed": False}
+        return SourceValidation(
+            state, configurable, SourceBundle(),
+            update={"validated_sources": False, "validation_retry_needed": False},
+        )
     
-    most_recent_web_research = state.web_research_results[-1]
-    most_recent_sources = state.sources_gathered[-1] if state.sources_gathered else ""
+    # Evaluate the deduplicated sources that actually made it into the research text
+    bundle = SourceBundle.from_dicts(state.source_records)
+    if bundle:
+        most_recent_sources = bundle.render_list()
+        source_count = len(bundle)
+    else:
+        most_recent_sources = state.sources_gathered[-1] if state.sources_gathered else ""
+        source_count = len(most_recent_sources.split('* ')) - 1
     
     # Check if we've already tried validating too many times
     current_retries = getattr(state, 'validation_retries', 0)
     
     progress_callback(
         "🔍 Analyzing source quality",
-        f"Validating {len(most_recent_sources.split('* '))-1} sources for relevance",
-        {"source_count": len(most_recent_sources.split('* '))-1, "retry_count": current_retries}
+        f"Validating {source_count} sources for relevance",
+        {"source_count": source_count, "retry_count": current_retries}
     )
     
+    # Settle obviously relevant and obviously irrelevant sources locally, so only
+    # the ambiguous middle band is sent to the LLM
+    prefiltered = None
+    if bundle and configurable.relevance_prefilter:
+        prefiltered = prefilter_sources(
+            state.research_topic,
+            bundle,
+            reject_below=configurable.prefilter_reject_below,
+            accept_above=configurable.prefilter_accept_above,
+        )
+        most_recent_sources = prefiltered.ambiguous.render_list()
+        progress_callback(
+            "⚡ Pre-filtered sources by relevance",
+            f"{len(prefiltered.accepted)} accepted, {len(prefiltered.rejected)} rejected, "
+            f"{len(prefiltered.ambiguous)} need LLM review",
+            {
+                "stage": "relevance_prefilter",
+                "accepted": prefiltered.accepted.urls,
+                "rejected": prefiltered.rejected.urls,
+                "ambiguous": prefiltered.ambiguous.urls,
+                "scores": prefiltered.scores,
+            }
+        )
+    
     # Create structured validation prompt with enhanced academic paper evaluation
     validation_prompt = f"""
     Analyze these web search results for research on: {state.research_topic}
@@ -539,147 +772,233 @@ def validate_sources(state: SummaryState, config: RunnableConfig):
     }}
     """
     
-    # Initialize LLM for validation with JSON mode
-    if configurable.llm_provider == "lmstudio":
-        llm = ChatLMStudio(
-            base_url=configurable.lmstudio_base_url,
-            model=configurable.local_llm,
-            temperature=0,
-            format="json",
-        )
-    else:  # Default to Ollama
-        llm = ChatOllama(
-            base_url=configurable.ollama_base_url,
-            model=configurable.local_llm,
-            temperature=0,
-            format="json",
-        )
-    
-    # Run validation
-    try:
-        result = llm.invoke([
+    if prefiltered is not None and not prefiltered.ambiguous:
+        # Nothing left for the model to judge
+        messages = None
+    else:
+        messages = [
             SystemMessage(content="You are a research quality assessor. Evaluate source relevance and return JSON."),
             HumanMessage(content=validation_prompt)
-        ])
-        
+        ]
+    return SourceValidation(state, configurable, bundle, prefiltered, current_retries, messages)
+
+
+def get_validation_llm(configurable: Configuration):
+    """Return the pooled JSON-mode LLM used to score sources."""
+    return get_chat_model(
+        configurable.llm_provider,
+        get_llm_base_url(configurable),
+        configurable.local_llm,
+        temperature=0,
+        format="json",
+        **get_llm_options(configurable),
+    )
+
+
+def finish_source_validation(validation: SourceValidation, content: Optional[str]) -> dict:
+    """Turn the LLM's validation response (None if it wasn't asked) into a state update."""
+    state = validation.state
+    configurable = validation.configurable
+    current_retries = validation.current_retries
+    if content is None:
+        validation_data = {"sources": []}
+    else:
         # Parse validation result
-        validation_result = result.content
         if configurable.strip_thinking_tokens:
-            validation_result = strip_thinking_tokens(validation_result)
-        
-        import json
-        validation_data = json.loads(validation_result)
-        
-        # Check if sources meet minimum relevance score
-        valid_sources = []
-        for source_eval in validation_data.get("sources", []):
-            score = source_eval.get("relevance_score", 0)
-            if score >= configurable.min_source_relevance_score:
-                valid_sources.append(source_eval)
-                print(f"✅ Valid source (score: {score}): {source_eval.get('title', 'Unknown')}")
-            else:
-                print(f"❌ Filtered source (score: {score}): {source_eval.get('title', 'Unknown')} - {source_eval.get('reason', '')}")
-        
-        # Determine if we have enough valid sources
-        has_valid_sources = len(valid_sources) > 0
+            content = strip_thinking_tokens(content)
+        validation_data = json.loads(content)
+    
+    # Check if sources meet minimum relevance score
+    valid_sources = []
+    for source_eval in validation_data.get("sources", []):
+        score = source_eval.get("relevance_score", 0)
+        if score >= configurable.min_source_relevance_score:
+            valid_sources.append(source_eval)
+            print(f"✅ Valid source (score: {score}): {source_eval.get('title', 'Unknown')}")
+        else:
+            print(f"❌ Filtered source (score: {score}): {source_eval.get('title', 'Unknown')} - {source_eval.get('reason', '')}")
+    
+    valid_urls = [source_eval.get("url", "") for source_eval in valid_sources]
+    evaluated_count = len(validation_data.get("sources", []))
+    if validation.prefiltered is not None:
+        valid_urls = validation.prefiltered.accepted.urls + valid_urls
+        evaluated_count = len(validation.bundle)
+    
+    # Determine if we have enough valid sources
+    has_valid_sources = len(valid_urls) > 0
+    
+    if not has_valid_sources and configurable.require_valid_sources:
+        print(f"⚠️ No valid sources found. Minimum score required: {configurable.min_source_relevance_score}")
         
-        if not has_valid_sources and configurable.require_valid_sources:
-            print(f"⚠️ No valid sources found. Minimum score required: {configurable.min_source_relevance_score}")
-            
-            # Check if we've exceeded retry limit - prevent infinite recursion
-            if current_retries >= configurable.max_validation_retries:
-                print(f"❌ Maximum validation retries ({configurable.max_validation_retries}) exceeded")
-                # Don't retry anymore - just continue with what we have
-                return {
-                    "validated_sources": False,
-                    "validation_failed": False,  # Don't fail completely, just continue
-                    "validation_retry_needed": False,
-                    "web_research_results": state.web_research_results  # Keep existing results
-                }
-            
-            # Only retry if we haven't exceeded the limit
-            print(f"🔄 Retrying search (attempt {current_retries + 1}/{configurable.max_validation_retries})")
+        # Check if we've exceeded retry limit - prevent infinite recursion
+        if current_retries >= configurable.max_validation_retries:
+            print(f"❌ Maximum validation retries ({configurable.max_validation_retries}) exceeded")
+            # Don't retry anymore - just continue with the existing results
             return {
                 "validated_sources": False,
-                "validation_retry_needed": True,
-                "validation_retries": current_retries + 1,
-                "search_query": f"{state.search_query} academic research scholarly"
+                "validation_failed": False,  # Don't fail completely, just continue
+                "validation_retry_needed": False,
             }
         
-        # If we have valid sources, filter the results
-        if has_valid_sources and len(valid_sources) < len(validation_data.get("sources", [])):
-            # Filter the web research results to only include valid sources
-            filtered_results = []
-            for source_eval in valid_sources:
-                # Extract the relevant portion from the original results
-                url = source_eval.get("url", "")
-                if url and url in most_recent_web_research:
-                    # Find and extract this source's content
-                    start_idx = most_recent_web_research.find(url)
-                    if start_idx != -1:
-                        # Find the next source or end
-                        next_source_idx = most_recent_web_research.find("\n\nSource:", start_idx + 1)
-                        if next_source_idx == -1:
-                            source_content = most_recent_web_research[start_idx:]
-                        else:
-                            source_content = most_recent_web_research[start_idx:next_source_idx]
-                        filtered_results.append(source_content)
-            
-            if filtered_results:
-                filtered_web_research = "\n\n".join(filtered_results)
-                return {
-                    "validated_sources": True,
-                    "web_research_results": [filtered_web_research] if filtered_web_research else state.web_research_results
-                }
-        
-        return {"validated_sources": has_valid_sources}
-        
+        # Only retry if we haven't exceeded the limit
+        print(f"🔄 Retrying search (attempt {current_retries + 1}/{configurable.max_validation_retries})")
+        return {
+            "validated_sources": False,
+            "validation_retry_needed": True,
+            "validation_retries": current_retries + 1,
+            "search_query": f"{state.search_query} academic research scholarly"
+        }
+    
+    # If we have valid sources, keep only their records and re-render the research text.
+    # Records are looked up by canonical URL, so URLs the LLM reformatted still match.
+    if has_valid_sources and len(valid_urls) < evaluated_count:
+        filtered = validation.bundle.filter(valid_urls)
+        if filtered:
+            return {
+                "validated_sources": True,
+                "source_records": filtered.to_dicts(),
+                "web_research_results": research_results_update(
+                    configurable,
+                    filtered.render(
+                        MAX_TOKENS_PER_SOURCE,
+                        configurable.fetch_full_page,
+                        get_passage_query(state, configurable),
+                    ),
+                ),
+            }
+    
+    return {"validated_sources": has_valid_sources}
+
+
+def validate_sources(state: SummaryState, config: RunnableConfig):
+    """LangGraph node that validates the quality and relevance of web research sources.
+
+    Analyzes the gathered sources to ensure they are relevant, credible, and provide
+    substantive information related to the research topic. Filters out low-quality
+    or irrelevant sources and can trigger new searches if needed.
+
+    Args:
+        state: Current graph state containing research topic and web research results
+        config: Configuration for the runnable, including LLM provider settings
+
+    Returns:
+        Dictionary with state update, including validated_sources flag and filtered results
+    """
+    validation = prepare_source_validation(state, config)
+    if validation.update is not None:
+        return validation.update
+    
+    # Run validation
+    try:
+        content = None
+        if validation.messages is not None:
+            llm = get_validation_llm(validation.configurable)
+            content = llm.invoke(validation.messages).content
+        return finish_source_validation(validation, content)
     except Exception as e:
         print(f"Validation error: {e}")
         # Fallback to simple validation
         return {"validated_sources": True}
 
 
-def summarize_sources(state: SummaryState, config: RunnableConfig):
-    """LangGraph node that summarizes web research results.
+@dataclass
+class SummaryRequest:
+    """A prepared summarize_sources LLM call, shared by the sync and async nodes."""
+
+    configurable: Configuration
+    llm: Any
+    messages: list
+    progress_callback: Callable
+    compact_records: Optional[list] = None  # Source records to keep once summarized, in compaction mode
+    previous_summary: Optional[str] = None  # Running summary before this loop, to measure its change
+
+
+def format_summary_request(research_topic: str, existing_summary: Optional[str], research: str) -> str:
+    """Build the human message asking the model to write or update the summary."""
+    if existing_summary:
+        return (
+            f"<Existing Summary> \n {existing_summary} \n <Existing Summary>\n\n"
+            f"<New Context> \n {research} \n <New Context>"
+            f"Update the Existing Summary with the New Context on this topic: \n <User Input> \n {research_topic} \n <User Input>\n\n"
+        )
+    return (
+        f"<Context> \n {research} \n <Context>"
+        f"Create a Summary using the Context on this topic: \n <User Input> \n {research_topic} \n <User Input>\n\n"
+    )
 
-    Uses an LLM to create or update a running summary based on the newest web research
-    results, integrating them with any existing summary.
+
+def pack_research_context(
+    state: SummaryState, configurable: Configuration, prompt_tokens: int
+) -> PackedContext:
+    """Fit the latest research into what's left of the context window.
+
+    The budget is the context window minus the tokens reserved for the summary and
+    the rest of the prompt. Structured source records are packed most relevant first;
+    research without records is truncated.
 
     Args:
-        state: Current graph state containing research topic, running summary,
-              and web research results
-        config: Configuration for the runnable, including LLM provider settings
+        state: Current graph state
+        configurable: Configuration object
+        prompt_tokens: Tokens used by the prompt apart from the research text
 
     Returns:
-        Dictionary with state update, including running_summary key containing the updated summary
+        The packed research text and what had to be dropped
     """
-    
+    num_ctx = configurable.num_ctx or DEFAULT_NUM_CTX
+    budget = max(num_ctx - configurable.context_reserve_tokens - prompt_tokens, 0)
+    bundle = SourceBundle.from_dicts(state.source_records)
+    if bundle:
+        return pack_sources(
+            bundle,
+            f"{state.research_topic} {state.search_query}",
+            budget,
+            MAX_TOKENS_PER_SOURCE,
+            configurable.fetch_full_page,
+            configurable.tokenizer,
+            extract_passages=configurable.extract_passages,
+        )
+    return pack_text(state.web_research_results[-1], budget, configurable.tokenizer)
+
+
+def prepare_summary(state: SummaryState, config: RunnableConfig) -> SummaryRequest:
+    """Build the summarization prompt and pick the pooled summarization model."""
     # Get progress callback if available
     progress_callback = config.get("configurable", {}).get("progress_callback", lambda x, y=None, z=None: None)
 
     # Existing summary
     existing_summary = state.running_summary
 
-    # Most recent web research
-    most_recent_web_research = state.web_research_results[-1]
+    # Get configuration
+    configurable = Configuration.from_runnable_config(config)
 
-    # Build the human message
-    if existing_summary:
-        human_message_content = (
-            f"<Existing Summary> \n {existing_summary} \n <Existing Summary>\n\n"
-            f"<New Context> \n {most_recent_web_research} \n <New Context>"
-            f"Update the Existing Summary with the New Context on this topic: \n <User Input> \n {state.research_topic} \n <User Input>\n\n"
+    # Most recent web research, fitted into the context window if configured
+    most_recent_web_research = state.web_research_results[-1]
+    if configurable.pack_context:
+        prompt_tokens = count_tokens(
+            summarizer_instructions + format_summary_request(state.research_topic, existing_summary, ""),
+            configurable.tokenizer,
         )
-    else:
-        human_message_content = (
-            f"<Context> \n {most_recent_web_research} \n <Context>"
-            f"Create a Summary using the Context on this topic: \n <User Input> \n {state.research_topic} \n <User Input>\n\n"
+        packed = pack_research_context(state, configurable, prompt_tokens)
+        most_recent_web_research = packed.text
+        progress_callback(
+            "📦 Packed research into the context window",
+            f"{packed.used_tokens}/{packed.budget} tokens used, {packed.dropped_tokens} tokens dropped",
+            {
+                "stage": "context_packing",
+                "budget": packed.budget,
+                "used_tokens": packed.used_tokens,
+                "dropped_tokens": packed.dropped_tokens,
+                "included": packed.included,
+                "truncated": packed.truncated,
+                "dropped": packed.dropped,
+            }
         )
 
-    # Run the LLM
-    configurable = Configuration.from_runnable_config(config)
-    
+    # Build the human message
+    human_message_content = format_summary_request(
+        state.research_topic, existing_summary, most_recent_web_research
+    )
+
     # Log summary generation
     if existing_summary:
         progress_callback(
@@ -702,33 +1021,37 @@ def summarize_sources(state: SummaryState, config: RunnableConfig):
         # Use the main model that was selected by the user
         summarization_model = configurable.local_llm
     
-    if configurable.llm_provider == "lmstudio":
-        llm = ChatLMStudio(
-            base_url=configurable.lmstudio_base_url,
-            model=summarization_model,
-            temperature=0,
-        )
-    else:  # Default to Ollama
-        llm = ChatOllama(
-            base_url=configurable.ollama_base_url,
-            model=summarization_model,
-            temperature=0,
-        )
+    llm = get_chat_model(
+        configurable.llm_provider,
+        get_llm_base_url(configurable),
+        summarization_model,
+        temperature=0,
+        **get_llm_options(configurable),
+    )
     progress_callback(
         f"🤖 Invoking {summarization_model} for summarization",
         f"Using {configurable.llm_provider} provider",
         {"model": summarization_model, "provider": configurable.llm_provider}
     )
 
-    result = llm.invoke(
-        [
-            SystemMessage(content=summarizer_instructions),
-            HumanMessage(content=human_message_content),
-        ]
-    )
+    messages = [
+        SystemMessage(content=summarizer_instructions),
+        HumanMessage(content=human_message_content),
+    ]
+
+    # Once summarized, page text is never read again; keep only the source metadata
+    compact_records = None
+    if configurable.compact_state:
+        compact_records = [{**record, "raw_content": None} for record in state.source_records]
+    return SummaryRequest(configurable, llm, messages, progress_callback, compact_records, state.running_summary)
+
+
+def finish_summary(request: SummaryRequest, running_summary: str) -> dict:
+    """Clean up the generated summary and turn it into a state update."""
+    configurable = request.configurable
+    progress_callback = request.progress_callback
 
     # Strip thinking tokens if configured
-    running_summary = result.content
     if configurable.strip_thinking_tokens:
         running_summary = strip_thinking_tokens(running_summary)
     
@@ -738,43 +1061,51 @@ def summarize_sources(state: SummaryState, config: RunnableConfig):
         {"summary_length": len(running_summary.split()), "stripped_thinking": configurable.strip_thinking_tokens}
     )
 
-    return {"running_summary": running_summary}
+    update = {"running_summary": running_summary}
+    if configurable.stop_on_convergence:
+        update["summary_change"] = summary_change(request.previous_summary, running_summary)
+    if request.compact_records is not None:
+        update["source_records"] = request.compact_records
+    return update
 
 
-def reflect_on_summary(state: SummaryState, config: RunnableConfig):
-    """LangGraph node that identifies knowledge gaps and generates follow-up queries.
+def summarize_sources(state: SummaryState, config: RunnableConfig):
+    """LangGraph node that summarizes web research results.
 
-    Analyzes the current summary to identify areas for further research and generates
-    a new search query to address those gaps. Uses structured output to extract
-    the follow-up query in JSON format.
+    Uses an LLM to create or update a running summary based on the newest web research
+    results, integrating them with any existing summary.
 
     Args:
-        state: Current graph state containing the running summary and research topic
+        state: Current graph state containing research topic, running summary,
+              and web research results
         config: Configuration for the runnable, including LLM provider settings
 
     Returns:
-        Dictionary with state update, including search_query key containing the generated follow-up query
+        Dictionary with state update, including running_summary key containing the updated summary
     """
+    request = prepare_summary(state, config)
+    if request.configurable.stream_summary:
+        running_summary = stream_summary_text(
+            request.llm, request.messages, request.progress_callback,
+            request.configurable.strip_thinking_tokens,
+        )
+    else:
+        running_summary = request.llm.invoke(request.messages).content
+    return finish_summary(request, running_summary)
+
+
+def prepare_reflection(state: SummaryState, config: RunnableConfig) -> dict:
+    """Build the arguments for generating a follow-up query from the summary.
 
+    Returns:
+        Keyword arguments for generate_search_query_with_structured_output
+    """
     # Generate a query
     configurable = Configuration.from_runnable_config(config)
     formatted_prompt = reflection_instructions.format(
         research_topic=state.research_topic
     )
 
-    @tool
-    class FollowUpQuery(BaseModel):
-        """
-        This tool is used to generate a follow-up query to address a knowledge gap.
-        """
-
-        follow_up_query: str = Field(
-            description="Write a specific question to address this gap"
-        )
-        knowledge_gap: str = Field(
-            description="Describe what information is missing or needs clarification"
-        )
-
     messages = [
         SystemMessage(
             content=formatted_prompt + (
@@ -790,7 +1121,7 @@ def reflect_on_summary(state: SummaryState, config: RunnableConfig):
     # Check for custom query model
     query_model = config.get("configurable", {}).get("query_model")
     
-    return generate_search_query_with_structured_output(
+    return dict(
         configurable=configurable,
         messages=messages,
         tool_class=FollowUpQuery,
@@ -801,6 +1132,24 @@ def reflect_on_summary(state: SummaryState, config: RunnableConfig):
     )
 
 
+def reflect_on_summary(state: SummaryState, config: RunnableConfig):
+    """LangGraph node that identifies knowledge gaps and generates follow-up queries.
+
+    Analyzes the current summary to identify areas for further research and generates
+    a new search query to address those gaps. Uses structured output to extract
+    the follow-up query in JSON format.
+
+    Args:
+        state: Current graph state containing the running summary and research topic
+        config: Configuration for the runnable, including LLM provider settings
+
+    Returns:
+        Dictionary with state update, including search_query key containing the generated follow-up query, which is also added to query_history
+    """
+    result = generate_search_query_with_structured_output(**prepare_reflection(state, config))
+    return add_query_to_history(result)
+
+
 def finalize_summary(state: SummaryState):
     """LangGraph node that finalizes the research summary.
 
@@ -850,6 +1199,8 @@ def route_research(
 
     Controls the research loop by deciding whether to continue gathering information
     or to finalize the summary based on the configured maximum number of research loops.
+    With stop_on_convergence, research is finalized early once further loops are
+    unlikely to add anything (see convergence.check_convergence).
 
     Args:
         state: Current graph state containing the research loop count
@@ -860,10 +1211,21 @@ def route_research(
     """
 
     configurable = Configuration.from_runnable_config(config)
-    if state.research_loop_count <= configurable.max_web_research_loops:
-        return "web_research"
-    else:
+    if state.research_loop_count > configurable.max_web_research_loops:
         return "finalize_summary"
+    if configurable.stop_on_convergence:
+        convergence = check_convergence(state, configurable)
+        if convergence.converged:
+            progress_callback = config.get("configurable", {}).get(
+                "progress_callback", lambda x, y=None, z=None: None
+            )
+            progress_callback(
+                f"🏁 Research converged after {state.research_loop_count} loops",
+                f"Stopping early: {convergence.reason}",
+                {"stage": "convergence", "loop": state.research_loop_count, **convergence.to_dict()},
+            )
+            return "finalize_summary"
+    return "web_research"
 
 
 def route_validation(
@@ -896,28 +1258,70 @@ def route_validation(
     return "summarize_sources"
 
 
-# Add nodes and edges
-builder = StateGraph(
-    SummaryState,
-    input=SummaryStateInput,
-    output=SummaryStateOutput,
-    config_schema=Configuration,
-)
-builder.add_node("generate_query", generate_query)
-builder.add_node("web_research", web_research)
-builder.add_node("validate_sources", validate_sources)
-builder.add_node("summarize_sources", summarize_sources)
-builder.add_node("reflect_on_summary", reflect_on_summary)
-builder.add_node("finalize_summary", finalize_summary)
-
-# Add edges
-builder.add_edge(START, "generate_query")
-builder.add_edge("generate_query", "web_research")
-builder.add_edge("web_research", "validate_sources")
-# Conditional routing from validate_sources based on validation results
-builder.add_conditional_edges("validate_sources", route_validation)
-builder.add_edge("summarize_sources", "reflect_on_summary")
-builder.add_conditional_edges("reflect_on_summary", route_research)
-builder.add_edge("finalize_summary", END)
-
-graph = builder.compile()
+# Node implementations, by node name; async_graph swaps in async versions
+NODES = {
+    "generate_query": generate_query,
+    "web_research": web_research,
+    "validate_sources": validate_sources,
+    "summarize_sources": summarize_sources,
+    "reflect_on_summary": reflect_on_summary,
+    "finalize_summary": finalize_summary,
+}
+
+
+def create_builder(nodes: Optional[dict] = None) -> StateGraph:
+    """Wire up the research graph.
+
+    Every node is wrapped with memory.guard_node, which records its memory use and
+    enforces memory_limit_mb.
+
+    Args:
+        nodes: Node implementations to use instead of those in NODES, by node name
+
+    Returns:
+        The uncompiled graph builder
+    """
+    nodes = {**NODES, **(nodes or {})}
+    builder = StateGraph(
+        SummaryState,
+        input=SummaryStateInput,
+        output=SummaryStateOutput,
+        config_schema=Configuration,
+    )
+    # Add nodes and edges
+    for name, node in nodes.items():
+        builder.add_node(name, guard_node(name, node))
+
+    # Add edges
+    builder.add_edge(START, "generate_query")
+    builder.add_edge("generate_query", "web_research")
+    builder.add_edge("web_research", "validate_sources")
+    # Conditional routing from validate_sources based on validation results
+    builder.add_conditional_edges("validate_sources", route_validation)
+    builder.add_edge("summarize_sources", "reflect_on_summary")
+    builder.add_conditional_edges("reflect_on_summary", route_research)
+    builder.add_edge("finalize_summary", END)
+    return builder
+
+
+builder = create_builder()
+
+
+def build_graph(checkpointer=None):
+    """Compile the research graph, optionally with a checkpointer.
+
+    With a checkpointer, state is saved after every node under the run's
+    configurable "thread_id", so a failed run can be resumed by invoking the graph
+    again with None as input and the same thread_id; only the failed node reruns.
+
+    Args:
+        checkpointer: A LangGraph checkpoint saver, or None for no checkpointing
+
+    Returns:
+        The compiled graph
+    """
+    return builder.compile(checkpointer=checkpointer)
+
+
+# Uncheckpointed graph for LangGraph Studio / langgraph.json, which supply their own persistence
+graph = build_graph()
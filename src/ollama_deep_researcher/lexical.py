@@ -0,0 +1,176 @@
+"""Lexical text scoring: word tokens, BM25-style relevance scores and passage extraction.
+
+Used both to triage search sources (relevance) and to cut long pages down to the
+passages that match the query (sources).
+"""
+
+import re
+from typing import Dict, List, Optional
+
+# BM25 term-frequency saturation and length normalization parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Target size of a passage when splitting page content
+PASSAGE_CHARS = 600
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have how in is it its of on or that the "
+    "this to was were what when where which who why will with about into over than "
+    "vs versus does do did can".split()
+)
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Shortest stem left after removing "ing", "ed" or a final "e"; shorter stems are too
+# likely to be a different word ("united" -> "unit", "plane" -> "plan")
+MIN_STEM_LENGTH = 5
+
+# Words ending in "s" that are not plurals of a shorter word ("news" is not "new")
+INVARIANT_WORDS = frozenset(
+    "news series species means lens bias atlas canvas chaos cosmos kudos always perhaps".split()
+)
+
+
+def normalize_token(token: str) -> str:
+    """Strip plural and common verb suffixes so word forms match ("foxes" -> "fox").
+
+    A light, rule-based stemmer: good enough that a source titled "Fox" matches the
+    topic "foxes", without pulling in a stemming library. It errs on the side of
+    leaving a word alone, since two different words sharing a stem inflate relevance
+    scores that decide which sources are rejected without an LLM check.
+    """
+    if len(token) <= 3 or token.isdigit() or token in INVARIANT_WORDS:
+        return token
+    if token.endswith("ies") and len(token) > 4:
+        return token[:-3] + "y"
+    if token.endswith(("sses", "xes", "zes", "ches", "shes")):
+        return token[:-2]
+    if token.endswith("s") and not token.endswith(("ss", "us", "is")):
+        return normalize_token(token[:-1])
+    for suffix in ("ing", "ed"):
+        stem = token[: -len(suffix)]
+        if token.endswith(suffix) and len(stem) >= MIN_STEM_LENGTH and not stem.endswith("e"):
+            token = stem
+            break
+    if token.endswith("e") and len(token) > MIN_STEM_LENGTH:
+        token = token[:-1]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase text and split it into normalized word tokens, dropping stopwords."""
+    return [
+        normalize_token(token)
+        for token in _TOKEN_RE.findall(text.lower())
+        if token not in STOPWORDS and (len(token) > 1 or token.isdigit())
+    ]
+
+
+def score_texts(query: str, documents: List[str]) -> List[float]:
+    """Score documents against a query with a normalized BM25-style score.
+
+    Each query term contributes its BM25 term-frequency component, with saturation
+    (k1) and length normalization (b) relative to the average document length, capped
+    at 1.0 (one occurrence in an average-length document). Terms are weighted equally
+    rather than by IDF, since a handful of search results is far too small a corpus to
+    estimate document frequencies from. The score is the mean over query terms, so 1.0
+    means every query term appears and 0.0 means none do; long documents that mention
+    a term only in passing score lower.
+
+    Args:
+        query: Text to match, e.g. the research topic
+        documents: Texts to score
+
+    Returns:
+        One score in [0, 1] per document
+    """
+    terms = set(tokenize(query))
+    if not terms or not documents:
+        return [0.0] * len(documents)
+    tokenized = [tokenize(document) for document in documents]
+    avg_length = sum(map(len, tokenized)) / len(tokenized) or 1.0
+    scores = []
+    for tokens in tokenized:
+        counts: Dict[str, int] = {}
+        for token in tokens:
+            if token in terms:
+                counts[token] = counts.get(token, 0) + 1
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * len(tokens) / avg_length)
+        score = sum(min(tf * (BM25_K1 + 1) / (tf + norm), 1.0) for tf in counts.values())
+        scores.append(score / len(terms))
+    return scores
+
+
+def split_passages(text: str, max_chars: int = PASSAGE_CHARS) -> List[str]:
+    """Split page text into passages of roughly max_chars characters.
+
+    Consecutive paragraphs (separated by blank lines) are merged until a passage
+    would exceed max_chars; paragraphs longer than that are cut into max_chars pieces.
+    """
+    passages: List[str] = []
+    current = ""
+    for paragraph in re.split(r"\n\s*\n", text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if current and len(current) + len(paragraph) + 2 > max_chars:
+            passages.append(current)
+            current = ""
+        while len(paragraph) > max_chars:
+            if current:
+                passages.append(current)
+                current = ""
+            passages.append(paragraph[:max_chars])
+            paragraph = paragraph[max_chars:]
+        current = f"{current}\n\n{paragraph}" if current else paragraph
+    if current:
+        passages.append(current)
+    return passages
+
+
+def extract_passages(
+    text: str, query: str, char_limit: int, max_chars: int = PASSAGE_CHARS
+) -> Optional[str]:
+    """Keep the passages of a page that best match a query, within a size limit.
+
+    The text is split with split_passages and scored with score_texts. Passages are
+    taken best first while they fit in `char_limit`, then put back in page order;
+    gaps between kept passages are marked with "[...]".
+
+    Args:
+        text: Page content (markdown or plain text)
+        query: Text to match, e.g. the research topic and search query
+        char_limit: Maximum number of characters to return
+        max_chars: Target passage size
+
+    Returns:
+        The selected passages, the text itself if it already fits, or None if no
+        passage matches the query (callers then fall back to the start of the page)
+    """
+    if len(text) <= char_limit:
+        return text
+    passages = split_passages(text, max_chars)
+    scores = score_texts(query, passages)
+    ranked = sorted(range(len(passages)), key=lambda i: (-scores[i], i))
+    selected = []
+    used = len("\n\n[...]")  # Trailing marker after the last passage
+    for position in ranked:
+        if scores[position] <= 0:
+            break
+        # Budget for the passage plus the separator in front of it
+        size = len(passages[position]) + len("\n\n[...]\n\n")
+        if used + size <= char_limit:
+            selected.append(position)
+            used += size
+    if not selected:
+        return None
+    selected.sort()
+    parts = [] if selected[0] == 0 else ["[...]"]
+    for previous, position in zip([None] + selected, selected):
+        if previous is not None and position != previous + 1:
+            parts.append("[...]")
+        parts.append(passages[position])
+    if selected[-1] != len(passages) - 1:
+        parts.append("[...]")
+    return "\n\n".join(parts)
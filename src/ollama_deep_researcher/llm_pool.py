@@ -0,0 +1,79 @@
+"""Shared chat model clients for the research assistant."""
+
+import asyncio
+import threading
+import weakref
+from typing import Any, Dict, Optional, Tuple
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_ollama import ChatOllama
+
+from ollama_deep_researcher.lmstudio import ChatLMStudio
+
+_clients: Dict[Tuple, BaseChatModel] = {}
+# Clients used from async code hold connections bound to the event loop that opened
+# them, so each running loop gets its own pool
+_loop_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple, BaseChatModel]]" = (
+    weakref.WeakKeyDictionary()
+)
+_clients_lock = threading.Lock()
+
+
+def get_chat_model(
+    provider: str,
+    base_url: str,
+    model: str,
+    temperature: float = 0,
+    format: Optional[str] = None,
+    **options: Any,
+) -> BaseChatModel:
+    """Return a chat model client, reusing an existing one with the same settings.
+
+    Clients are keyed by (provider, base_url, model, format, temperature) plus any extra
+    options, so every node, research loop and concurrent research task asking for the
+    same model shares one client and its keep-alive HTTP connections. Called from a
+    running event loop, the client is shared only within that loop, since its async
+    connections cannot be reused once the loop is closed.
+
+    Args:
+        provider: "ollama" or "lmstudio"
+        base_url: Base URL of the model server
+        model: Model name
+        temperature: Sampling temperature
+        format: Response format (e.g. "json"), or None for free text
+        **options: Additional constructor arguments, part of the cache key
+
+    Returns:
+        A shared ChatOllama or ChatLMStudio instance
+    """
+    key = (provider, base_url, model, format, temperature, tuple(sorted(options.items())))
+    loop = _running_loop()
+    with _clients_lock:
+        clients = _clients if loop is None else _loop_clients.setdefault(loop, {})
+        client = clients.get(key)
+        if client is None:
+            kwargs = dict(base_url=base_url, model=model, temperature=temperature, **options)
+            if format is not None:
+                kwargs["format"] = format
+            if provider == "lmstudio":
+                client = ChatLMStudio(**kwargs)
+            else:  # Default to Ollama
+                client = ChatOllama(**kwargs)
+            clients[key] = client
+        return client
+
+
+def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+def clear_chat_models() -> int:
+    """Drop every pooled client and return how many were released."""
+    with _clients_lock:
+        count = len(_clients) + sum(len(clients) for clients in _loop_clients.values())
+        _clients.clear()
+        _loop_clients.clear()
+        return count
@@ -0,0 +1,294 @@
+"""Process memory sampling and memory-limit enforcement for the research graph.
+
+With enable_memory_monitoring, a background thread samples the process's resident
+set size (RSS), and the RSS of every graph node at start and end and the peak seen
+while it ran are recorded as a "memory" span (see telemetry). With memory_limit_mb, each node first checks RSS against the
+limit. Once it is crossed, caches are evicted and, if that isn't enough, the node
+runs with full-page content dropped from its context; if RSS is still over the
+limit at the next node, the run fails with MemoryLimitExceeded instead of letting
+the process be killed. Checkpointed runs can be resumed later.
+
+Nodes are wrapped with guard_node() when the graph is built.
+"""
+
+import asyncio
+import ctypes
+import ctypes.util
+import gc
+import inspect
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from langchain_core.runnables import RunnableConfig
+
+from ollama_deep_researcher.cache import release_cache_memory
+from ollama_deep_researcher.configuration import Configuration
+from ollama_deep_researcher.llm_pool import clear_chat_models
+from ollama_deep_researcher.telemetry import Span, span
+
+try:
+    import psutil
+except ImportError:  # Optional; /proc is read directly on Linux
+    psutil = None
+
+MB = 1024 * 1024
+SAMPLE_INTERVAL = 0.5  # Seconds between RSS samples
+HISTORY_SIZE = 1000  # Per-node records kept by the sampler
+
+# Page bodies read per fetch in the low-memory profile; the rest is discarded unread
+LOW_MEMORY_MAX_PAGE_BYTES = 512 * 1024
+
+# Settings a node runs with once memory is over the limit
+SHRUNK_SETTINGS = {"fetch_full_page": False, "optimize_for_low_memory": True}
+
+
+class MemoryLimitExceeded(RuntimeError):
+    """The process stayed over memory_limit_mb after caches were evicted and context shrunk."""
+
+
+def rss_mb() -> Optional[float]:
+    """Return the resident set size of this process in MB, or None if it can't be read."""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss / MB
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / MB
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _malloc_trim() -> None:
+    # glibc keeps freed memory mapped; hand it back to the OS where possible
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6")
+        libc.malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
+
+
+def release_memory() -> None:
+    """Evict in-memory caches and return freed memory to the operating system."""
+    clear_chat_models()
+    release_cache_memory()
+    gc.collect()
+    _malloc_trim()
+
+
+@dataclass
+class NodeMemory:
+    """RSS of the process while one graph node ran, in MB."""
+
+    node: str
+    start_mb: float
+    end_mb: Optional[float] = None
+    peak_mb: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the record as a dict, with values rounded to 0.1 MB."""
+        return {
+            "node": self.node,
+            "start_mb": round(self.start_mb, 1),
+            "end_mb": round(self.end_mb, 1) if self.end_mb is not None else None,
+            "peak_mb": round(self.peak_mb, 1) if self.peak_mb is not None else None,
+        }
+
+
+class MemorySampler:
+    """Sample process RSS on a background thread and attribute it to running nodes."""
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL, history_size: int = HISTORY_SIZE):
+        """Start the sampling thread.
+
+        Args:
+            interval: Seconds between samples
+            history_size: Number of per-node records kept in history
+        """
+        self.interval = interval
+        self.last_mb: Optional[float] = None
+        self.peak_mb: Optional[float] = None
+        self.history: deque = deque(maxlen=history_size)
+        self._running: Dict[int, NodeMemory] = {}
+        self._lock = threading.Lock()
+        self.sample()
+        self._thread = threading.Thread(target=self._run, name="memory-sampler", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.interval)
+            self.sample()
+
+    def sample(self) -> Optional[float]:
+        """Read RSS now, update the peaks of running nodes and return it."""
+        value = rss_mb()
+        if value is None:
+            return None
+        with self._lock:
+            self.last_mb = value
+            self.peak_mb = value if self.peak_mb is None else max(self.peak_mb, value)
+            for record in self._running.values():
+                record.peak_mb = max(record.peak_mb, value)
+        return value
+
+    @contextmanager
+    def track(self, node: str) -> Iterator[Optional[NodeMemory]]:
+        """Record RSS while the enclosed block runs a node.
+
+        Yields the node's record, whose end and peak are filled in when the block
+        exits, or None if RSS can't be read on this platform.
+        """
+        start = self.sample()
+        if start is None:
+            yield None
+            return
+        record = NodeMemory(node, start, peak_mb=start)
+        with self._lock:
+            self._running[id(record)] = record
+        try:
+            yield record
+        finally:
+            with self._lock:
+                del self._running[id(record)]
+            record.end_mb = self.sample() or record.start_mb
+            record.peak_mb = max(record.peak_mb, record.end_mb)
+            self.history.append(record)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return current and peak RSS and the highest peak seen per node."""
+        node_peaks: Dict[str, float] = {}
+        for record in list(self.history):
+            node_peaks[record.node] = round(max(node_peaks.get(record.node, 0.0), record.peak_mb), 1)
+        return {
+            "rss_mb": round(self.last_mb, 1) if self.last_mb is not None else None,
+            "peak_mb": round(self.peak_mb, 1) if self.peak_mb is not None else None,
+            "node_peak_mb": node_peaks,
+        }
+
+
+_sampler: Optional[MemorySampler] = None
+_sampler_lock = threading.Lock()
+
+
+def get_sampler() -> MemorySampler:
+    """Return the process-wide sampler, starting it on first use."""
+    global _sampler
+    with _sampler_lock:
+        if _sampler is None:
+            _sampler = MemorySampler()
+        return _sampler
+
+
+def check_memory_limit(state: Any, configurable: Configuration, progress_callback: Callable) -> bool:
+    """Enforce memory_limit_mb before a node runs.
+
+    Args:
+        state: Current graph state; its memory_pressure flag says whether the
+            previous node already ran with shrunk context
+        configurable: Configuration object
+        progress_callback: Progress callback of the run
+
+    Returns:
+        Whether the node should run with shrunk context (see SHRUNK_SETTINGS)
+
+    Raises:
+        MemoryLimitExceeded: If memory is still over the limit after evicting caches
+            and the previous node already ran with shrunk context
+    """
+    limit = configurable.memory_limit_mb
+    current = rss_mb() if limit else None
+    if current is None or current <= limit:
+        return False
+
+    release_memory()
+    after = rss_mb() or current
+    if after <= limit:
+        progress_callback(
+            "🧹 Memory limit reached, evicted caches",
+            f"{current:.0f} MB → {after:.0f} MB (limit {limit} MB)",
+            {"stage": "memory_limit", "action": "evicted", "before_mb": round(current, 1), "after_mb": round(after, 1), "limit_mb": limit},
+        )
+        return False
+    if getattr(state, "memory_pressure", False):
+        raise MemoryLimitExceeded(
+            f"Memory use is {after:.0f} MB, over the {limit} MB limit, even after evicting caches "
+            f"and dropping full-page content"
+        )
+    progress_callback(
+        "⚠️ Memory limit reached, dropping full-page content",
+        f"{after:.0f} MB after evicting caches (limit {limit} MB)",
+        {"stage": "memory_limit", "action": "shrunk", "before_mb": round(current, 1), "after_mb": round(after, 1), "limit_mb": limit},
+    )
+    return True
+
+
+def guard_node(name: str, node: Callable) -> Callable:
+    """Wrap a graph node (sync or async) with memory monitoring and the memory limit.
+
+    The wrapper always takes (state, config) and passes config on only if the node
+    accepts it. When the node runs with shrunk context, its state update sets
+    memory_pressure; the flag is cleared again once memory is back under the limit.
+
+    Args:
+        name: Node name, used in memory records
+        node: The node function
+
+    Returns:
+        The wrapped node
+    """
+    accepts_config = "config" in inspect.signature(node).parameters
+
+    def before(state, config: RunnableConfig):
+        configurable = Configuration.from_runnable_config(config)
+        progress_callback = (config.get("configurable") or {}).get(
+            "progress_callback", lambda x, y=None, z=None: None
+        )
+        shrink = check_memory_limit(state, configurable, progress_callback)
+        if shrink:
+            config = {**config, "configurable": {**(config.get("configurable") or {}), **SHRUNK_SETTINGS}}
+        return configurable, shrink, config
+
+    def after(state, update, shrink: bool):
+        if isinstance(update, dict) and shrink != getattr(state, "memory_pressure", False):
+            update = {**update, "memory_pressure": shrink}
+        return update
+
+    if asyncio.iscoroutinefunction(node):
+
+        async def guarded(state, config: RunnableConfig):
+            configurable, shrink, config = before(state, config)
+            args = (state, config) if accepts_config else (state,)
+            if not configurable.enable_memory_monitoring:
+                return after(state, await node(*args), shrink)
+            with span("memory", name) as memory_span:
+                with get_sampler().track(name) as record:
+                    update = await node(*args)
+                record_memory(memory_span, record)
+            return after(state, update, shrink)
+
+    else:
+
+        def guarded(state, config: RunnableConfig):
+            configurable, shrink, config = before(state, config)
+            args = (state, config) if accepts_config else (state,)
+            if not configurable.enable_memory_monitoring:
+                return after(state, node(*args), shrink)
+            with span("memory", name) as memory_span:
+                with get_sampler().track(name) as record:
+                    update = node(*args)
+                record_memory(memory_span, record)
+            return after(state, update, shrink)
+
+    guarded.__name__ = guarded.__qualname__ = getattr(node, "__name__", name)
+    guarded.__doc__ = node.__doc__
+    return guarded
+
+
+def record_memory(memory_span: Span, record: Optional[NodeMemory]) -> None:
+    """Add a node's RSS record to its memory span."""
+    if record is not None:
+        memory_span.set(**{key: value for key, value in record.to_dict().items() if key != "node"})
@@ -0,0 +1,88 @@
+"""Fast lexical relevance scoring for search sources."""
+
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+
+from ollama_deep_researcher.lexical import score_texts
+from ollama_deep_researcher.sources import SourceBundle, SourceRecord, canonicalize_url
+
+# Domains that never answer a research question (see KNOWN_ISSUES.md)
+DEFAULT_DOMAIN_DENYLIST = (
+    "merriam-webster.com",
+    "dictionary.com",
+    "thesaurus.com",
+    "dictionary.cambridge.org",
+    "collinsdictionary.com",
+    "thefreedictionary.com",
+    "vocabulary.com",
+    "wiktionary.org",
+    "urbandictionary.com",
+    "yourdictionary.com",
+    "charitynavigator.org",
+    "globalgiving.org",
+    "justgiving.com",
+    "gofundme.com",
+)
+
+
+def is_denied_domain(url: str, denylist: Iterable[str] = DEFAULT_DOMAIN_DENYLIST) -> bool:
+    """Check whether a URL's host is, or is a subdomain of, a denylisted domain."""
+    host = canonicalize_url(url).split("/", 1)[0].split(":", 1)[0]
+    return any(host == domain or host.endswith(f".{domain}") for domain in denylist)
+
+
+@dataclass
+class PrefilterResult:
+    """Sources split into those accepted, rejected, or left for the LLM to judge."""
+
+    accepted: SourceBundle = field(default_factory=SourceBundle)
+    ambiguous: SourceBundle = field(default_factory=SourceBundle)
+    rejected: SourceBundle = field(default_factory=SourceBundle)
+    scores: Dict[str, float] = field(default_factory=dict)
+
+
+def prefilter_sources(
+    topic: str,
+    bundle: SourceBundle,
+    reject_below: float,
+    accept_above: float,
+    denylist: Optional[Iterable[str]] = None,
+) -> PrefilterResult:
+    """Settle clearly relevant and clearly irrelevant sources without an LLM call.
+
+    Sources on a denylisted domain are rejected outright. The rest are scored on
+    their title and snippet against the topic: scores below `reject_below` are
+    rejected, scores at or above `accept_above` are accepted, and only the middle
+    band is left for LLM validation.
+
+    Args:
+        topic: The research topic
+        bundle: Sources to triage
+        reject_below: Scores below this are rejected
+        accept_above: Scores at or above this are accepted
+        denylist: Domains to reject; defaults to DEFAULT_DOMAIN_DENYLIST
+
+    Returns:
+        The triaged sources and each source's score, keyed by URL
+    """
+    denylist = DEFAULT_DOMAIN_DENYLIST if denylist is None else tuple(denylist)
+    records = list(bundle)
+    scores = score_texts(topic, [f"{record.title} {record.content}" for record in records])
+    accepted: List[SourceRecord] = []
+    ambiguous: List[SourceRecord] = []
+    rejected: List[SourceRecord] = []
+    result_scores = {}
+    for record, score in zip(records, scores):
+        if is_denied_domain(record.url, denylist):
+            score = 0.0
+            rejected.append(record)
+        elif score < reject_below:
+            rejected.append(record)
+        elif score >= accept_above:
+            accepted.append(record)
+        else:
+            ambiguous.append(record)
+        result_scores[record.url] = round(score, 3)
+    return PrefilterResult(
+        SourceBundle(accepted), SourceBundle(ambiguous), SourceBundle(rejected), result_scores
+    )
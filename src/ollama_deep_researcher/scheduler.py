@@ -0,0 +1,167 @@
+"""Bounded worker pool and admission queue for research tasks."""
+
+import heapq
+import itertools
+import logging
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONCURRENCY = 2
+
+
+@dataclass(order=True)
+class _Job:
+    sort_key: Tuple[int, int]
+    task_id: str = field(compare=False)
+    backend: str = field(compare=False)
+    fn: Callable[..., Any] = field(compare=False)
+    args: tuple = field(compare=False)
+    kwargs: dict = field(compare=False)
+
+
+class ResearchScheduler:
+    """Run research tasks on a fixed number of worker threads.
+
+    Submitted tasks wait in an admission queue ordered by priority (higher first) and
+    then submission order. A worker only picks up a task when its LLM backend is below
+    its concurrency limit, so a burst of submissions queues up instead of piling
+    dozens of concurrent graph runs onto one model server.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = DEFAULT_MAX_CONCURRENCY,
+        backend_limits: Optional[Mapping[str, int]] = None,
+    ):
+        """Start the worker pool.
+
+        Args:
+            max_workers: Number of research tasks that may run at once
+            backend_limits: Maximum concurrent tasks per LLM backend; backends not
+                listed are only bounded by max_workers
+        """
+        self.max_workers = max(1, max_workers)
+        self.backend_limits = dict(backend_limits or {})
+        self._queue: List[_Job] = []
+        self._running: Dict[str, int] = {}
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+        self._shutdown = False
+        self._workers = [
+            threading.Thread(target=self._work, name=f"research-worker-{i}", daemon=True)
+            for i in range(self.max_workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    @classmethod
+    def from_env(cls) -> "ResearchScheduler":
+        """Build a scheduler from RESEARCH_MAX_CONCURRENCY and RESEARCH_BACKEND_CONCURRENCY.
+
+        RESEARCH_BACKEND_CONCURRENCY is a comma-separated list of backend=limit pairs,
+        e.g. "ollama=1,lmstudio=2".
+        """
+        max_workers = int(os.environ.get("RESEARCH_MAX_CONCURRENCY", DEFAULT_MAX_CONCURRENCY))
+        backend_limits = {}
+        for pair in os.environ.get("RESEARCH_BACKEND_CONCURRENCY", "").split(","):
+            if "=" in pair:
+                backend, limit = pair.split("=", 1)
+                backend_limits[backend.strip()] = int(limit)
+        return cls(max_workers=max_workers, backend_limits=backend_limits)
+
+    def submit(
+        self,
+        task_id: str,
+        fn: Callable[..., Any],
+        *args: Any,
+        backend: str = "ollama",
+        priority: int = 0,
+        **kwargs: Any,
+    ) -> int:
+        """Queue a task and return its 1-based position in the admission queue."""
+        job = _Job((-priority, next(self._counter)), task_id, backend, fn, args, kwargs)
+        with self._cond:
+            if self._shutdown:
+                raise RuntimeError("Scheduler has been shut down")
+            heapq.heappush(self._queue, job)
+            self._cond.notify_all()
+            return self._position(task_id)
+
+    def position(self, task_id: str) -> Optional[int]:
+        """Return a queued task's 1-based position, or None if it is not waiting."""
+        with self._cond:
+            return self._position(task_id)
+
+    def _position(self, task_id: str) -> Optional[int]:
+        for index, job in enumerate(sorted(self._queue), start=1):
+            if job.task_id == task_id:
+                return index
+        return None
+
+    def queued_task_ids(self) -> List[str]:
+        """Return the ids of waiting tasks in dispatch order."""
+        with self._cond:
+            return [job.task_id for job in sorted(self._queue)]
+
+    def cancel(self, task_id: str) -> bool:
+        """Remove a task that has not started yet."""
+        with self._cond:
+            for index, job in enumerate(self._queue):
+                if job.task_id == task_id:
+                    self._queue.pop(index)
+                    heapq.heapify(self._queue)
+                    return True
+        return False
+
+    def stats(self) -> Dict[str, Any]:
+        """Return queue length and running tasks per backend."""
+        with self._cond:
+            return {
+                "max_workers": self.max_workers,
+                "queued": len(self._queue),
+                "running": dict(self._running),
+                "backend_limits": dict(self.backend_limits),
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop accepting tasks; workers exit once the queue drains."""
+        with self._cond:
+            self._shutdown = True
+            self._cond.notify_all()
+        if wait:
+            for worker in self._workers:
+                worker.join()
+
+    def _next_runnable(self) -> Optional[_Job]:
+        for job in sorted(self._queue):
+            limit = self.backend_limits.get(job.backend)
+            if limit is None or self._running.get(job.backend, 0) < limit:
+                self._queue.remove(job)
+                heapq.heapify(self._queue)
+                return job
+        return None
+
+    def _work(self) -> None:
+        while True:
+            with self._cond:
+                job = self._next_runnable()
+                while job is None:
+                    if self._shutdown and not self._queue:
+                        return
+                    self._cond.wait()
+                    job = self._next_runnable()
+                self._running[job.backend] = self._running.get(job.backend, 0) + 1
+                # Queue positions of the remaining tasks changed
+                self._cond.notify_all()
+            try:
+                job.fn(*job.args, **job.kwargs)
+            except Exception:
+                logger.exception("Research task %s failed", job.task_id)
+            finally:
+                with self._cond:
+                    self._running[job.backend] -= 1
+                    self._cond.notify_all()
@@ -0,0 +1,248 @@
+"""Structured search sources, rendered to prompt text only when needed."""
+
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Union
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from ollama_deep_researcher.lexical import extract_passages
+
+CHARS_PER_TOKEN = 4
+
+# Query parameters that only track where a click came from
+TRACKING_PARAMS = {"fbclid", "gclid", "dclid", "msclkid", "mc_cid", "mc_eid", "ref_src"}
+
+
+def canonicalize_url(url: str) -> str:
+    """Normalize a URL so trivially different spellings of it compare equal.
+
+    Drops the scheme, "www.", default ports, fragments, trailing slashes and
+    tracking parameters (utm_*, fbclid, ...), lowercases the host and sorts the
+    remaining query parameters. URLs echoed back by an LLM without a scheme or
+    with a slash added still match the original.
+
+    Args:
+        url: URL to normalize
+
+    Returns:
+        The canonical form, used only as a lookup key
+    """
+    url = url.strip().strip("<>\"'")
+    try:
+        parts = urlsplit(url if "://" in url else f"//{url}")
+        port = parts.port
+    except ValueError:
+        # Not a parseable URL; still usable as an exact-match key
+        return url.lower()
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[len("www."):]
+    if port in (80, 443):
+        port = None
+    netloc = f"{host}:{port}" if port else host
+    query = sorted(
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in TRACKING_PARAMS
+    )
+    path = parts.path.rstrip("/")
+    return f"{netloc}{path}" + (f"?{urlencode(query)}" if query else "")
+
+
+@dataclass
+class SourceRecord:
+    """One search result, as kept between graph nodes."""
+
+    title: str
+    url: str
+    content: str
+    raw_content: Optional[str] = None
+
+    @classmethod
+    def from_result(cls, result: Dict[str, Any]) -> "SourceRecord":
+        """Build a record from a search API result dict."""
+        return cls(
+            title=result.get("title", ""),
+            url=result["url"],
+            content=result.get("content", ""),
+            raw_content=result.get("raw_content", ""),
+        )
+
+    def render(
+        self, max_tokens_per_source: int, fetch_full_page: bool, query: Optional[str] = None
+    ) -> List[str]:
+        """Return the text pieces for this source in the research prompt.
+
+        Args:
+            max_tokens_per_source: Maximum number of tokens of page content
+            fetch_full_page: Whether to include the full page content
+            query: If given, page content over the limit is cut down to the passages
+                that best match this query instead of the start of the page
+        """
+        parts = [
+            f"Source: {self.title}\n===\n",
+            f"URL: {self.url}\n===\n",
+            f"Most relevant content from source: {self.content}\n===\n",
+        ]
+        if fetch_full_page:
+            # Using rough estimate of characters per token
+            char_limit = max_tokens_per_source * CHARS_PER_TOKEN
+            raw_content = self.raw_content
+            if raw_content is None:
+                raw_content = ""
+                print(f"Warning: No raw_content found for source {self.url}")
+            if len(raw_content) > char_limit and query:
+                passages = extract_passages(raw_content, query, char_limit)
+                if passages is not None:
+                    parts.append(
+                        f"Relevant passages from full source, limited to {max_tokens_per_source} tokens: {passages}\n\n"
+                    )
+                    return parts
+            if len(raw_content) > char_limit:
+                raw_content = raw_content[:char_limit] + "... [truncated]"
+            parts.append(
+                f"Full source content limited to {max_tokens_per_source} tokens: {raw_content}\n\n"
+            )
+        return parts
+
+    def condensed(self, max_tokens_per_source: int, query: Optional[str] = None) -> "SourceRecord":
+        """Return a copy whose page content is cut down to what render() would include.
+
+        Used to drop the rest of long pages from graph state as soon as they are fetched.
+        """
+        char_limit = max_tokens_per_source * CHARS_PER_TOKEN
+        raw_content = self.raw_content
+        if raw_content and len(raw_content) > char_limit:
+            passages = None
+            if query:
+                passages = extract_passages(raw_content, query, char_limit)
+            raw_content = passages if passages is not None else raw_content[:char_limit]
+        return SourceRecord(self.title, self.url, self.content, raw_content)
+
+
+@dataclass
+class SourceBundle:
+    """Deduplicated sources from one research loop.
+
+    Sources stay as records while nodes filter them, and are turned into prompt
+    text with a single join by render(). to_dicts()/from_dicts() convert to plain
+    dicts for storage in graph state. Records are indexed by canonical URL, so
+    looking sources up by a (possibly reformatted) URL doesn't scan the bundle.
+    """
+
+    records: List[SourceRecord] = field(default_factory=list)
+    _index: Dict[str, int] = field(default_factory=dict, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        """Index the records by canonical URL."""
+        for position, record in enumerate(self.records):
+            self._index.setdefault(canonicalize_url(record.url), position)
+
+    @classmethod
+    def from_search_responses(
+        cls,
+        search_response: Union[Dict[str, Any], List[Dict[str, Any]]],
+        seen_urls: Optional[Iterable[str]] = None,
+    ) -> "SourceBundle":
+        """Collect unique sources from one or more search responses.
+
+        Args:
+            search_response: Either a dict with a 'results' key containing a list of
+                search results, or a list of such dicts (or of result lists)
+            seen_urls: URLs from earlier loops to leave out
+
+        Returns:
+            A bundle with one record per new URL, in first-seen order
+
+        Raises:
+            ValueError: If input is neither a dict with 'results' key nor a list of search results
+        """
+        if isinstance(search_response, dict):
+            sources_list = search_response["results"]
+        elif isinstance(search_response, list):
+            sources_list = []
+            for response in search_response:
+                if isinstance(response, dict) and "results" in response:
+                    sources_list.extend(response["results"])
+                else:
+                    sources_list.extend(response)
+        else:
+            raise ValueError(
+                "Input must be either a dict with 'results' or a list of search results"
+            )
+
+        seen = {canonicalize_url(url) for url in seen_urls or ()}
+        records = []
+        for source in sources_list:
+            key = canonicalize_url(source["url"])
+            if key not in seen:
+                seen.add(key)
+                records.append(SourceRecord.from_result(source))
+        return cls(records)
+
+    @classmethod
+    def from_dicts(cls, records: Iterable[Dict[str, Any]]) -> "SourceBundle":
+        """Rebuild a bundle stored with to_dicts()."""
+        return cls([SourceRecord(**record) for record in records])
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """Convert the records to plain dicts for graph state."""
+        return [asdict(record) for record in self.records]
+
+    def __len__(self) -> int:
+        """Return the number of sources."""
+        return len(self.records)
+
+    def __iter__(self):
+        """Iterate over the source records in order."""
+        return iter(self.records)
+
+    @property
+    def urls(self) -> List[str]:
+        """URLs of the sources, in order."""
+        return [record.url for record in self.records]
+
+    def get(self, url: str) -> Optional[SourceRecord]:
+        """Return the source with this URL (compared canonically), or None."""
+        position = self._index.get(canonicalize_url(url))
+        return self.records[position] if position is not None else None
+
+    def filter(self, urls: Iterable[str]) -> "SourceBundle":
+        """Return a bundle with only the sources whose URL is in `urls`.
+
+        URLs are compared canonically and looked up in the index, so the cost
+        depends on the number of URLs kept, not on the size of the bundle.
+        Sources keep their original order; unknown URLs are ignored.
+        """
+        positions = {
+            self._index[key]
+            for key in map(canonicalize_url, filter(None, urls))
+            if key in self._index
+        }
+        return SourceBundle([self.records[position] for position in sorted(positions)])
+
+    def render(
+        self, max_tokens_per_source: int, fetch_full_page: bool = False, query: Optional[str] = None
+    ) -> str:
+        """Format the sources as research text for an LLM prompt.
+
+        Args:
+            max_tokens_per_source: Maximum number of tokens of page content per source
+            fetch_full_page: Whether to include each source's full page content
+            query: If given, long pages are cut down to their passages that best
+                match it rather than truncated (see SourceRecord.render)
+
+        Returns:
+            The formatted sources
+        """
+        parts = ["Sources:\n\n"]
+        for record in self.records:
+            parts.extend(record.render(max_tokens_per_source, fetch_full_page, query))
+        return "".join(parts).strip()
+
+    def condensed(self, max_tokens_per_source: int, query: Optional[str] = None) -> "SourceBundle":
+        """Return a bundle of condensed copies of the records (see SourceRecord.condensed)."""
+        return SourceBundle([record.condensed(max_tokens_per_source, query) for record in self.records])
+
+    def render_list(self) -> str:
+        """Format the sources as a bullet list of "* title : url" lines."""
+        return "\n".join(f"* {record.title} : {record.url}" for record in self.records)
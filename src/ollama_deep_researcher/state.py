@@ -1,14 +1,31 @@
 import operator
 from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
 from typing_extensions import Annotated
 
+# Key of the update made by replace()
+REPLACE_KEY = "__replace__"
+
+
+def replace(values: List[Any]) -> Dict[str, List[Any]]:
+    """Wrap a list update so it overwrites an add_or_replace channel instead of extending it."""
+    return {REPLACE_KEY: list(values)}
+
+
+def add_or_replace(current: List[Any], update: Any) -> List[Any]:
+    """Reducer that appends list updates, or overwrites the list with a replace() update."""
+    if isinstance(update, dict) and REPLACE_KEY in update:
+        return update[REPLACE_KEY]
+    return operator.add(current or [], update or [])
+
 
 @dataclass(kw_only=True)
 class SummaryState:
     research_topic: str = field(default=None)  # Report topic
     search_query: str = field(default=None)  # Search query
-    web_research_results: Annotated[list, operator.add] = field(default_factory=list)
-    sources_gathered: Annotated[list, operator.add] = field(default_factory=list)
+    web_research_results: Annotated[list, add_or_replace] = field(default_factory=list)
+    sources_gathered: Annotated[list, add_or_replace] = field(default_factory=list)
+    source_records: list = field(default_factory=list)  # SourceBundle dicts from the latest loop
     research_loop_count: int = field(default=0)  # Research loop count
     running_summary: str = field(default=None)  # Final report
     validated_sources: bool = field(default=False)  # Source validation flag
@@ -17,6 +34,9 @@ class SummaryState:
     validation_failed: bool = field(default=False)  # Validation completely failed
     seen_urls: set = field(default_factory=set)  # Track URLs across research loops
     query_history: Annotated[list, operator.add] = field(default_factory=list)  # Previous queries for refinement
+    source_novelty: float = field(default=1.0)  # Share of the latest search's URLs not seen in earlier loops
+    summary_change: Optional[float] = field(default=None)  # How much the latest summarization changed the summary (0-1)
+    memory_pressure: bool = field(default=False)  # Last node ran with shrunk context to stay under memory_limit_mb
 
 
 @dataclass(kw_only=True)
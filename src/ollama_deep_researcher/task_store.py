@@ -0,0 +1,323 @@
+"""Durable storage for web UI research tasks and their activity logs."""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+
+DEFAULT_TASK_TTL = 24 * 3600
+
+# Only tasks in these states are ever deleted for age
+FINISHED_STATUSES = ("completed", "failed")
+
+
+class TaskStore(ABC):
+    """Storage backend for research task status, results and activity logs.
+
+    Tasks are plain dicts with at least id, topic, status and created_at. Every change
+    bumps the task's integer "version", which status endpoints use as an ETag and event
+    streams use to detect updates. Activity entries are numbered 1, 2, 3, ... per task
+    so clients can fetch only the entries after a cursor.
+    """
+
+    @abstractmethod
+    def create(self, task: Dict[str, Any]) -> None:
+        """Store a new task."""
+
+    @abstractmethod
+    def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """Return a task (without its activity log), or None if it doesn't exist."""
+
+    @abstractmethod
+    def update(self, task_id: str, **fields: Any) -> int:
+        """Set task fields and return the new version."""
+
+    @abstractmethod
+    def append_activity(self, task_id: str, entry: Dict[str, Any], **fields: Any) -> int:
+        """Append an activity entry, optionally setting task fields, and return the new version."""
+
+    @abstractmethod
+    def activity(self, task_id: str, since: int = 0) -> List[Dict[str, Any]]:
+        """Return activity entries after the first `since` entries."""
+
+    @abstractmethod
+    def activity_count(self, task_id: str) -> int:
+        """Return the number of activity entries for a task."""
+
+    @abstractmethod
+    def version(self, task_id: str) -> Optional[int]:
+        """Return a task's version, or None if it doesn't exist."""
+
+    @abstractmethod
+    def reap(self) -> int:
+        """Delete finished tasks not updated within the TTL and return how many were removed."""
+
+
+class SQLiteTaskStore(TaskStore):
+    """TaskStore backed by a SQLite database.
+
+    Safe to share between threads and between processes (e.g. gunicorn workers)
+    pointing at the same file.
+    """
+
+    def __init__(self, path: str, ttl: float = DEFAULT_TASK_TTL):
+        """Open (or create) the task database.
+
+        Args:
+            path: Location of the SQLite file, or ":memory:"
+            ttl: Seconds after its last update before reap() deletes a finished task
+        """
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None, timeout=30
+        )
+        with self._lock:
+            if path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS tasks (
+                    id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    version INTEGER NOT NULL DEFAULT 0,
+                    updated_at REAL NOT NULL,
+                    data TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS tasks_updated_at ON tasks (updated_at);
+                CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status);
+                CREATE TABLE IF NOT EXISTS activity (
+                    task_id TEXT NOT NULL,
+                    seq INTEGER NOT NULL,
+                    entry TEXT NOT NULL,
+                    PRIMARY KEY (task_id, seq)
+                );
+                """
+            )
+
+    def create(self, task: Dict[str, Any]) -> None:
+        """Store a new task."""
+        data = {k: v for k, v in task.items() if k != "version"}
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO tasks (id, status, version, updated_at, data) VALUES (?, ?, 0, ?, ?)",
+                (task["id"], task["status"], time.time(), json.dumps(data)),
+            )
+
+    def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """Return a task (without its activity log), or None if it doesn't exist."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT version, data FROM tasks WHERE id = ?", (task_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {**json.loads(row[1]), "version": row[0]}
+
+    def _update(self, task_id: str, fields: Dict[str, Any]) -> int:
+        # Caller holds the lock and an open transaction
+        row = self._conn.execute(
+            "SELECT version, data FROM tasks WHERE id = ?", (task_id,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(task_id)
+        data = {**json.loads(row[1]), **fields}
+        version = row[0] + 1
+        self._conn.execute(
+            "UPDATE tasks SET status = ?, version = ?, updated_at = ?, data = ? WHERE id = ?",
+            (data["status"], version, time.time(), json.dumps(data), task_id),
+        )
+        return version
+
+    def update(self, task_id: str, **fields: Any) -> int:
+        """Set task fields and return the new version."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                version = self._update(task_id, fields)
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+        return version
+
+    def append_activity(self, task_id: str, entry: Dict[str, Any], **fields: Any) -> int:
+        """Append an activity entry, optionally setting task fields, and return the new version."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                (count,) = self._conn.execute(
+                    "SELECT COUNT(*) FROM activity WHERE task_id = ?", (task_id,)
+                ).fetchone()
+                self._conn.execute(
+                    "INSERT INTO activity (task_id, seq, entry) VALUES (?, ?, ?)",
+                    (task_id, count + 1, json.dumps(entry, default=str)),
+                )
+                version = self._update(task_id, fields)
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+        return version
+
+    def activity(self, task_id: str, since: int = 0) -> List[Dict[str, Any]]:
+        """Return activity entries after the first `since` entries."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT entry FROM activity WHERE task_id = ? AND seq > ? ORDER BY seq",
+                (task_id, max(since, 0)),
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def activity_count(self, task_id: str) -> int:
+        """Return the number of activity entries for a task."""
+        with self._lock:
+            (count,) = self._conn.execute(
+                "SELECT COUNT(*) FROM activity WHERE task_id = ?", (task_id,)
+            ).fetchone()
+        return count
+
+    def version(self, task_id: str) -> Optional[int]:
+        """Return a task's version, or None if it doesn't exist."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT version FROM tasks WHERE id = ?", (task_id,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def reap(self) -> int:
+        """Delete finished tasks not updated within the TTL and return how many were removed.
+
+        Pending and running tasks are kept however old they are, so a task waiting in a
+        long queue or running a long research is never deleted under its worker.
+        """
+        cutoff = time.time() - self.ttl
+        expired = "status IN (?, ?) AND updated_at < ?"
+        params = (*FINISHED_STATUSES, cutoff)
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._conn.execute(
+                f"DELETE FROM activity WHERE task_id IN (SELECT id FROM tasks WHERE {expired})",
+                params,
+            )
+            removed = self._conn.execute(f"DELETE FROM tasks WHERE {expired}", params).rowcount
+            self._conn.execute("COMMIT")
+        return removed
+
+
+class RedisTaskStore(TaskStore):
+    """TaskStore backed by Redis (or any Redis-compatible server).
+
+    Requires the optional `redis` package. Task fields live in a hash and activity
+    entries in a list; once a task has finished, both expire TTL seconds after its
+    last update, so no separate reaping is needed.
+    """
+
+    def __init__(self, url: str, ttl: float = DEFAULT_TASK_TTL, prefix: str = "ldr:task:"):
+        """Connect to Redis.
+
+        Args:
+            url: Redis connection URL, e.g. redis://localhost:6379/0
+            ttl: Seconds after its last update before a finished task expires
+            prefix: Key prefix for task hashes and activity lists
+        """
+        try:
+            import redis
+        except ImportError as e:
+            raise ImportError(
+                "RedisTaskStore requires the redis package: pip install redis"
+            ) from e
+        self.client = redis.Redis.from_url(url, decode_responses=True)
+        self.ttl = int(ttl)
+        self.prefix = prefix
+
+    def _keys(self, task_id: str):
+        return f"{self.prefix}{task_id}", f"{self.prefix}{task_id}:activity"
+
+    def _write(self, task_id: str, fields: Dict[str, Any], entry=None) -> int:
+        task_key, activity_key = self._keys(task_id)
+        if not self.client.exists(task_key):
+            raise KeyError(task_id)
+        pipe = self.client.pipeline()
+        if fields:
+            pipe.hset(task_key, mapping={k: json.dumps(v) for k, v in fields.items()})
+        if entry is not None:
+            pipe.rpush(activity_key, json.dumps(entry, default=str))
+        pipe.hincrby(task_key, "version", 1)
+        status = fields["status"] if "status" in fields else json.loads(self.client.hget(task_key, "status"))
+        for key in (task_key, activity_key):
+            if status in FINISHED_STATUSES:
+                pipe.expire(key, self.ttl)
+            else:
+                pipe.persist(key)
+        return pipe.execute()[-3]
+
+    def create(self, task: Dict[str, Any]) -> None:
+        """Store a new task."""
+        task_key, _ = self._keys(task["id"])
+        mapping = {k: json.dumps(v) for k, v in task.items() if k != "version"}
+        pipe = self.client.pipeline()
+        pipe.hset(task_key, mapping={**mapping, "version": 0})
+        if task["status"] in FINISHED_STATUSES:
+            pipe.expire(task_key, self.ttl)
+        pipe.execute()
+
+    def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """Return a task (without its activity log), or None if it doesn't exist."""
+        raw = self.client.hgetall(self._keys(task_id)[0])
+        if not raw:
+            return None
+        version = int(raw.pop("version", 0))
+        return {**{k: json.loads(v) for k, v in raw.items()}, "version": version}
+
+    def update(self, task_id: str, **fields: Any) -> int:
+        """Set task fields and return the new version."""
+        return self._write(task_id, fields)
+
+    def append_activity(self, task_id: str, entry: Dict[str, Any], **fields: Any) -> int:
+        """Append an activity entry, optionally setting task fields, and return the new version."""
+        return self._write(task_id, fields, entry)
+
+    def activity(self, task_id: str, since: int = 0) -> List[Dict[str, Any]]:
+        """Return activity entries after the first `since` entries."""
+        entries = self.client.lrange(self._keys(task_id)[1], max(since, 0), -1)
+        return [json.loads(entry) for entry in entries]
+
+    def activity_count(self, task_id: str) -> int:
+        """Return the number of activity entries for a task."""
+        return self.client.llen(self._keys(task_id)[1])
+
+    def version(self, task_id: str) -> Optional[int]:
+        """Return a task's version, or None if it doesn't exist."""
+        version = self.client.hget(self._keys(task_id)[0], "version")
+        return int(version) if version is not None else None
+
+    def reap(self) -> int:
+        """Redis expires tasks on its own; nothing to do."""
+        return 0
+
+
+def create_task_store(url: str, ttl: float = DEFAULT_TASK_TTL) -> TaskStore:
+    """Create a task store from a URL.
+
+    Args:
+        url: "redis://..." / "rediss://..." for Redis, "sqlite:///path" or a plain file
+            path for SQLite, or ":memory:" for a throwaway in-process store
+        ttl: Seconds after its last update before a finished task is removed
+
+    Returns:
+        The configured TaskStore
+    """
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisTaskStore(url, ttl=ttl)
+    if url.startswith("sqlite:///"):
+        url = url[len("sqlite:///"):]
+    if url != ":memory:":
+        url = os.path.expanduser(url)
+    return SQLiteTaskStore(url, ttl=ttl)
@@ -0,0 +1,416 @@
+"""Structured spans and Prometheus metrics for research runs.
+
+Every graph node, search call, page fetch and LLM call is recorded as a Span with
+its start and end time and attributes such as bytes transferred or prompt and
+completion tokens. Spans go to the Tracer of the current research task, which
+exports them as a JSON timeline, and are aggregated process-wide in METRICS,
+which renders them in the Prometheus text exposition format.
+
+Search and fetch spans are opened by utils with span(); node and LLM spans come
+from TelemetryCallbackHandler, passed to the graph in the runnable config's
+callbacks.
+"""
+
+import contextvars
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+# Upper bounds of the span duration histogram buckets, in seconds
+DURATION_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+# Spans kept per task; later spans are only counted so a runaway task can't grow without bound
+MAX_SPANS = 5000
+
+METRIC_PREFIX = "deep_researcher"
+
+
+@dataclass
+class Span:
+    """One timed operation: a graph node, search, page fetch or LLM call."""
+
+    kind: str
+    name: str
+    start: float = field(default_factory=time.perf_counter)
+    end: Optional[float] = None
+    status: str = "ok"
+    attributes: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def duration(self) -> float:
+        """Seconds from start to end, or to now while the span is still open."""
+        return (self.end if self.end is not None else time.perf_counter()) - self.start
+
+    def set(self, **attributes: Any) -> None:
+        """Add attributes to the span."""
+        self.attributes.update(attributes)
+
+    def fail(self, error: BaseException) -> None:
+        """Mark the span as failed with the given error."""
+        self.status = "error"
+        self.attributes["error"] = f"{type(error).__name__}: {error}"
+
+    def finish(self) -> "Span":
+        """Set the end time, unless already set, and return the span."""
+        if self.end is None:
+            self.end = time.perf_counter()
+        return self
+
+    def to_dict(self, origin: float = 0.0) -> Dict[str, Any]:
+        """Return the span as a JSON-serializable dict, with times relative to origin."""
+        return {
+            "kind": self.kind,
+            "name": self.name,
+            "start": round(self.start - origin, 6),
+            "end": round((self.end if self.end is not None else self.start) - origin, 6),
+            "duration": round(self.duration, 6),
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+
+def _escape_label(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels: Any) -> str:
+    return "{" + ",".join(f'{key}="{_escape_label(value)}"' for key, value in labels.items()) + "}"
+
+
+class Metrics:
+    """Process-wide aggregates of every finished span, rendered for Prometheus."""
+
+    def __init__(self):
+        """Start with no recorded values."""
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Drop all recorded values."""
+        with self._lock:
+            self._spans: Dict[Tuple[str, str, str], int] = defaultdict(int)
+            self._buckets: Dict[Tuple[str, str], List[int]] = defaultdict(lambda: [0] * len(DURATION_BUCKETS))
+            self._duration_sum: Dict[Tuple[str, str], float] = defaultdict(float)
+            self._duration_count: Dict[Tuple[str, str], int] = defaultdict(int)
+            self._bytes: Dict[str, int] = defaultdict(int)
+            self._prompt_tokens: Dict[str, int] = defaultdict(int)
+            self._completion_tokens: Dict[str, int] = defaultdict(int)
+            self._generation_seconds: Dict[str, float] = defaultdict(float)
+            self._node_peak_mb: Dict[str, float] = {}
+
+    def observe(self, span: Span) -> None:
+        """Add a finished span to the aggregates."""
+        key = (span.kind, span.name)
+        duration = span.duration
+        attributes = span.attributes
+        with self._lock:
+            self._spans[(span.kind, span.name, span.status)] += 1
+            self._duration_sum[key] += duration
+            self._duration_count[key] += 1
+            buckets = self._buckets[key]
+            for index, bound in enumerate(DURATION_BUCKETS):
+                if duration <= bound:
+                    buckets[index] += 1
+            if attributes.get("bytes"):
+                self._bytes[span.kind] += attributes["bytes"]
+            if span.kind == "llm":
+                self._prompt_tokens[span.name] += attributes.get("prompt_tokens") or 0
+                self._completion_tokens[span.name] += attributes.get("completion_tokens") or 0
+                self._generation_seconds[span.name] += attributes.get("generation_seconds") or 0.0
+            if span.kind == "memory" and attributes.get("peak_mb") is not None:
+                self._node_peak_mb[span.name] = max(self._node_peak_mb.get(span.name, 0.0), attributes["peak_mb"])
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return span counts and LLM token totals as a dict."""
+        with self._lock:
+            return {
+                "spans": {f"{kind}:{name}:{status}": count for (kind, name, status), count in self._spans.items()},
+                "bytes": dict(self._bytes),
+                "prompt_tokens": dict(self._prompt_tokens),
+                "completion_tokens": dict(self._completion_tokens),
+                "node_peak_mb": dict(self._node_peak_mb),
+            }
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format (version 0.0.4)."""
+        p = METRIC_PREFIX
+        lines = []
+        with self._lock:
+            lines += [
+                f"# HELP {p}_spans_total Finished spans by kind, name and status.",
+                f"# TYPE {p}_spans_total counter",
+            ]
+            for (kind, name, status), count in sorted(self._spans.items()):
+                lines.append(f"{p}_spans_total{_labels(kind=kind, name=name, status=status)} {count}")
+
+            lines += [
+                f"# HELP {p}_span_duration_seconds Span duration by kind and name.",
+                f"# TYPE {p}_span_duration_seconds histogram",
+            ]
+            for (kind, name), buckets in sorted(self._buckets.items()):
+                for bound, count in zip(DURATION_BUCKETS, buckets):
+                    labels = _labels(kind=kind, name=name, le=f"{bound:g}")
+                    lines.append(f"{p}_span_duration_seconds_bucket{labels} {count}")
+                count = self._duration_count[(kind, name)]
+                lines.append(f"{p}_span_duration_seconds_bucket{_labels(kind=kind, name=name, le='+Inf')} {count}")
+                lines.append(f"{p}_span_duration_seconds_sum{_labels(kind=kind, name=name)} {self._duration_sum[(kind, name)]:.6f}")
+                lines.append(f"{p}_span_duration_seconds_count{_labels(kind=kind, name=name)} {count}")
+
+            lines += [
+                f"# HELP {p}_bytes_total Bytes received by searches and page fetches.",
+                f"# TYPE {p}_bytes_total counter",
+            ]
+            for kind, total in sorted(self._bytes.items()):
+                lines.append(f"{p}_bytes_total{_labels(kind=kind)} {total}")
+
+            for metric, values, help_text in (
+                ("llm_prompt_tokens_total", self._prompt_tokens, "Prompt tokens sent to each model."),
+                ("llm_completion_tokens_total", self._completion_tokens, "Completion tokens generated by each model."),
+                ("llm_generation_seconds_total", self._generation_seconds, "Seconds each model spent generating tokens."),
+            ):
+                lines += [f"# HELP {p}_{metric} {help_text}", f"# TYPE {p}_{metric} counter"]
+                for model, total in sorted(values.items()):
+                    value = f"{total:.6f}" if isinstance(total, float) else str(total)
+                    lines.append(f"{p}_{metric}{_labels(model=model)} {value}")
+
+            lines += [
+                f"# HELP {p}_node_peak_rss_megabytes Highest process RSS seen while each graph node ran.",
+                f"# TYPE {p}_node_peak_rss_megabytes gauge",
+            ]
+            for node, peak in sorted(self._node_peak_mb.items()):
+                lines.append(f"{p}_node_peak_rss_megabytes{_labels(node=node)} {peak}")
+        return "\n".join(lines) + "\n"
+
+
+METRICS = Metrics()
+
+
+class Tracer:
+    """Collect the spans of one research task and export them as a timeline."""
+
+    def __init__(self, metrics: Optional[Metrics] = METRICS, max_spans: int = MAX_SPANS):
+        """Start the task's clock.
+
+        Args:
+            metrics: Aggregates every recorded span is added to, or None
+            max_spans: Spans kept for the timeline; later spans are only counted
+        """
+        self.metrics = metrics
+        self.max_spans = max_spans
+        self.origin = time.perf_counter()
+        self.started_at = datetime.now().isoformat()
+        self.spans: List[Span] = []
+        self.dropped = 0
+        self._lock = threading.Lock()
+
+    def record(self, span: Span) -> None:
+        """Add a finished span to the timeline and the metrics."""
+        span.finish()
+        with self._lock:
+            if len(self.spans) < self.max_spans:
+                self.spans.append(span)
+            else:
+                self.dropped += 1
+        if self.metrics is not None:
+            self.metrics.observe(span)
+
+    def timeline(self) -> Dict[str, Any]:
+        """Return the spans recorded so far, ordered by start time, with per-kind totals.
+
+        Span start and end times are seconds since the tracer was created.
+        """
+        with self._lock:
+            spans = sorted(self.spans, key=lambda span: span.start)
+            dropped = self.dropped
+        totals: Dict[str, Dict[str, Any]] = {}
+        for span in spans:
+            total = totals.setdefault(span.kind, {"count": 0, "seconds": 0.0, "errors": 0})
+            total["count"] += 1
+            total["seconds"] = round(total["seconds"] + span.duration, 6)
+            total["errors"] += span.status != "ok"
+            for attribute in ("bytes", "prompt_tokens", "completion_tokens"):
+                if span.attributes.get(attribute):
+                    total[attribute] = total.get(attribute, 0) + span.attributes[attribute]
+        return {
+            "started_at": self.started_at,
+            "elapsed": round(time.perf_counter() - self.origin, 6),
+            "spans": [span.to_dict(self.origin) for span in spans],
+            "dropped_spans": dropped,
+            "totals": totals,
+        }
+
+
+_current_tracer: contextvars.ContextVar[Optional[Tracer]] = contextvars.ContextVar(
+    "ollama_deep_researcher_tracer", default=None
+)
+
+
+def current_tracer() -> Optional[Tracer]:
+    """Return the tracer spans are currently recorded to, if any."""
+    return _current_tracer.get()
+
+
+@contextmanager
+def use_tracer(tracer: Optional[Tracer]) -> Iterator[Optional[Tracer]]:
+    """Record spans opened in this context (and threads started from it) to tracer."""
+    token = _current_tracer.set(tracer)
+    try:
+        yield tracer
+    finally:
+        _current_tracer.reset(token)
+
+
+@contextmanager
+def span(kind: str, name: str, **attributes: Any) -> Iterator[Span]:
+    """Time the enclosed block as a span.
+
+    The span is recorded to the current tracer, or straight to METRICS when no
+    tracer is active. An exception escaping the block marks the span as failed.
+    Add attributes discovered inside the block with Span.set.
+
+    Args:
+        kind: Kind of operation, e.g. "search" or "fetch"
+        name: Operation name within its kind, e.g. the search API
+        **attributes: Initial span attributes
+    """
+    current = Span(kind, name, attributes=attributes)
+    try:
+        yield current
+    except BaseException as e:
+        current.fail(e)
+        raise
+    finally:
+        tracer = _current_tracer.get()
+        if tracer is not None:
+            tracer.record(current)
+        else:
+            METRICS.observe(current.finish())
+
+
+def _llm_usage(response: LLMResult) -> Dict[str, Any]:
+    """Extract token counts and generation time from a chat model response."""
+    usage: Dict[str, Any] = {}
+    generations = [generation for batch in response.generations for generation in batch]
+    message = getattr(generations[0], "message", None) if generations else None
+    metadata = dict(getattr(message, "response_metadata", None) or {})
+    usage_metadata = getattr(message, "usage_metadata", None) or {}
+    token_usage = (response.llm_output or {}).get("token_usage") or {}
+
+    # Ollama reports counts and durations (in nanoseconds) in the response metadata
+    prompt_tokens = metadata.get("prompt_eval_count", usage_metadata.get("input_tokens", token_usage.get("prompt_tokens")))
+    completion_tokens = metadata.get("eval_count", usage_metadata.get("output_tokens", token_usage.get("completion_tokens")))
+    if prompt_tokens is not None:
+        usage["prompt_tokens"] = prompt_tokens
+    if completion_tokens is not None:
+        usage["completion_tokens"] = completion_tokens
+    if metadata.get("eval_duration"):
+        usage["generation_seconds"] = metadata["eval_duration"] / 1e9
+    if metadata.get("prompt_eval_duration"):
+        usage["prompt_seconds"] = metadata["prompt_eval_duration"] / 1e9
+    if message is not None:
+        usage["completion_chars"] = len(message.content) if isinstance(message.content, str) else 0
+    return usage
+
+
+class TelemetryCallbackHandler(BaseCallbackHandler):
+    """Record graph node and LLM call spans from LangChain callbacks.
+
+    Pass an instance in the runnable config's callbacks; LangGraph hands it down to
+    every node and every chat model the nodes invoke.
+    """
+
+    def __init__(self, tracer: Tracer):
+        """Record spans into the given task tracer."""
+        self.tracer = tracer
+        self._open: Dict[UUID, Span] = {}
+        self._lock = threading.Lock()
+
+    def _start(self, run_id: UUID, span: Span) -> None:
+        with self._lock:
+            self._open[run_id] = span
+
+    def _pop(self, run_id: UUID) -> Optional[Span]:
+        with self._lock:
+            return self._open.pop(run_id, None)
+
+    def on_chain_start(self, serialized, inputs, *, run_id, metadata=None, **kwargs) -> None:
+        """Open a node span when a graph node starts."""
+        node = (metadata or {}).get("langgraph_node")
+        # Only the node's own run, not the runnables nested inside it
+        if node and kwargs.get("name") == node:
+            self._start(run_id, Span("node", node, attributes={"step": metadata.get("langgraph_step")}))
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs) -> None:
+        """Record the node span when the node finishes."""
+        span = self._pop(run_id)
+        if span is not None:
+            self.tracer.record(span)
+
+    def on_chain_error(self, error, *, run_id, **kwargs) -> None:
+        """Record the node span as failed when the node raises."""
+        span = self._pop(run_id)
+        if span is not None:
+            # GraphInterrupt and friends are control flow, not failures
+            if not type(error).__module__.startswith("langgraph"):
+                span.fail(error)
+            self.tracer.record(span)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, metadata=None, **kwargs) -> None:
+        """Open an LLM span when a chat model is called."""
+        metadata = metadata or {}
+        model = metadata.get("ls_model_name") or (kwargs.get("invocation_params") or {}).get("model") or "unknown"
+        prompt_chars = sum(
+            len(message.content) if isinstance(message.content, str) else 0
+            for batch in messages
+            for message in batch
+        )
+        self._start(
+            run_id,
+            Span(
+                "llm",
+                model,
+                attributes={
+                    "provider": metadata.get("ls_provider"),
+                    "node": metadata.get("langgraph_node"),
+                    "prompt_chars": prompt_chars,
+                },
+            ),
+        )
+
+    def on_llm_new_token(self, token, *, run_id, **kwargs) -> None:
+        """Note the time to first token."""
+        with self._lock:
+            span = self._open.get(run_id)
+        if span is not None and "ttft" not in span.attributes:
+            span.attributes["ttft"] = round(time.perf_counter() - span.start, 6)
+
+    def on_llm_end(self, response: LLMResult, *, run_id, **kwargs) -> None:
+        """Record the LLM span with token usage and generation speed."""
+        span = self._pop(run_id)
+        if span is None:
+            return
+        span.finish()
+        usage = _llm_usage(response)
+        span.set(**usage)
+        completion_tokens = usage.get("completion_tokens")
+        if completion_tokens:
+            # Ollama measures generation time itself; otherwise time from the first token
+            seconds = usage.get("generation_seconds") or span.duration - span.attributes.get("ttft", 0.0)
+            if seconds > 0:
+                span.set(tokens_per_second=round(completion_tokens / seconds, 2))
+        self.tracer.record(span)
+
+    def on_llm_error(self, error, *, run_id, **kwargs) -> None:
+        """Record the LLM span as failed."""
+        span = self._pop(run_id)
+        if span is not None:
+            span.fail(error)
+            self.tracer.record(span)
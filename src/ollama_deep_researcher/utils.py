@@ -1,18 +1,43 @@
+import asyncio
+import contextvars
 import os
+import threading
+import time
+import weakref
 import httpx
 import requests
 import arxiv
-from typing import Dict, Any, List, Union, Optional
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import AsyncIterator, Dict, Any, Iterable, Iterator, List, Mapping, Tuple, Union, Optional
+from urllib.parse import urlsplit
 
-from markdownify import markdownify
 from langsmith import traceable
-from tavily import TavilyClient
+from tavily import AsyncTavilyClient, TavilyClient
 from duckduckgo_search import DDGS
 
 from langchain_community.utilities import SearxSearchWrapper
 
+from ollama_deep_researcher.cache import PageStore, SearchCache
+from ollama_deep_researcher.extraction import CONVERTER_VERSION, html_to_markdown
+from ollama_deep_researcher.sources import SourceBundle
+from ollama_deep_researcher.telemetry import span
+
 # Constants
-CHARS_PER_TOKEN = 4
+SUPPORTED_SEARCH_APIS = ("tavily", "perplexity", "duckduckgo", "searxng", "arxiv")
+PAGE_FETCH_TIMEOUT = 10.0
+SEARCH_REQUEST_TIMEOUT = 20.0
+MAX_CONCURRENT_PAGE_FETCHES = 8
+MAX_PAGE_FETCHES_PER_HOST = 2
+PERPLEXITY_API_URL = "https://api.perplexity.ai/chat/completions"
+
+# Shared, pooled HTTP client for full-page fetches (created lazily)
+_http_client: Optional[httpx.Client] = None
+_http_client_lock = threading.Lock()
+
+# Async clients are bound to the event loop that opened their connections
+_async_http_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+    weakref.WeakKeyDictionary()
+)
 
 
 def get_config_value(value: Any) -> str:
@@ -34,11 +59,84 @@ def get_config_value(value: Any) -> str:
     return value if isinstance(value, str) else value.value
 
 
+THINK_OPEN_TAG = "<think>"
+THINK_CLOSE_TAG = "</think>"
+
+
+class ThinkingTokenFilter:
+    """
+    Incrementally remove <think> blocks from a stream of text chunks.
+
+    Text is scanned once as it arrives. Visible text is returned as soon as it is
+    known to be outside a think block; think block contents are discarded without
+    being buffered. Only a trailing fragment that could be the start of a tag
+    (at most len("</think>") - 1 characters) is held back until the next chunk.
+
+    Nested blocks are supported: text stays hidden until every open tag is closed.
+    A block that is never closed hides the rest of the stream, and a closing tag
+    without a matching opening tag is dropped.
+    """
+
+    def __init__(self):
+        self.depth = 0
+        self._pending = ""
+
+    def feed(self, chunk: str) -> str:
+        """
+        Process the next chunk of text.
+
+        Args:
+            chunk (str): The next piece of the stream
+
+        Returns:
+            str: Newly visible text (possibly empty)
+        """
+        text = self._pending + chunk
+        self._pending = ""
+        visible = []
+        pos = 0
+        while True:
+            start = text.find("<", pos)
+            if start == -1:
+                if self.depth == 0:
+                    visible.append(text[pos:])
+                break
+            if self.depth == 0:
+                visible.append(text[pos:start])
+            if text.startswith(THINK_OPEN_TAG, start):
+                self.depth += 1
+                pos = start + len(THINK_OPEN_TAG)
+            elif text.startswith(THINK_CLOSE_TAG, start):
+                self.depth = max(self.depth - 1, 0)
+                pos = start + len(THINK_CLOSE_TAG)
+            elif THINK_OPEN_TAG.startswith(text[start:]) or THINK_CLOSE_TAG.startswith(text[start:]):
+                # Possibly a tag split across chunks; decide once more text arrives
+                self._pending = text[start:]
+                break
+            else:
+                if self.depth == 0:
+                    visible.append("<")
+                pos = start + 1
+        return "".join(visible)
+
+    def flush(self) -> str:
+        """
+        Finish the stream.
+
+        Returns:
+            str: Any held-back text that turned out not to be a tag
+        """
+        pending, self._pending = self._pending, ""
+        return pending if self.depth == 0 else ""
+
+
 def strip_thinking_tokens(text: str) -> str:
     """
     Remove <think> and </think> tags and their content from the text.
 
-    Iteratively removes all occurrences of content enclosed in thinking tokens.
+    Scans the text once, so cost stays linear however many think blocks there are.
+    Nested blocks are removed as a whole, an unclosed <think> removes the rest of
+    the text, and a stray </think> is dropped.
 
     Args:
         text (str): The text to process
@@ -46,11 +144,8 @@ def strip_thinking_tokens(text: str) -> str:
     Returns:
         str: The text with thinking tokens and their content removed
     """
-    while "<think>" in text and "</think>" in text:
-        start = text.find("<think>")
-        end = text.find("</think>") + len("</think>")
-        text = text[:start] + text[end:]
-    return text
+    thinking_filter = ThinkingTokenFilter()
+    return thinking_filter.feed(text) + thinking_filter.flush()
 
 
 def deduplicate_and_format_sources(
@@ -63,7 +158,8 @@ def deduplicate_and_format_sources(
     Format and deduplicate search responses from various search APIs.
 
     Takes either a single search response or list of responses from search APIs,
-    deduplicates them by URL, and formats them into a structured string.
+    deduplicates them by URL, and formats them into a structured string. Nodes that
+    need to filter sources afterwards should keep the SourceBundle instead.
 
     Args:
         search_response (Union[Dict[str, Any], List[Dict[str, Any]]]): Either:
@@ -71,6 +167,7 @@ def deduplicate_and_format_sources(
             - A list of dicts, each containing search results
         max_tokens_per_source (int): Maximum number of tokens to include for each source's content
         fetch_full_page (bool, optional): Whether to include the full page content. Defaults to False.
+        seen_urls (set, optional): URLs from earlier research loops to leave out. Defaults to None.
 
     Returns:
         str: Formatted string with deduplicated sources
@@ -78,52 +175,8 @@ def deduplicate_and_format_sources(
     Raises:
         ValueError: If input is neither a dict with 'results' key nor a list of search results
     """
-    # Convert input to list of results
-    if isinstance(search_response, dict):
-        sources_list = search_response["results"]
-    elif isinstance(search_response, list):
-        sources_list = []
-        for response in search_response:
-            if isinstance(response, dict) and "results" in response:
-                sources_list.extend(response["results"])
-            else:
-                sources_list.extend(response)
-    else:
-        raise ValueError(
-            "Input must be either a dict with 'results' or a list of search results"
-        )
-
-    # Deduplicate by URL and filter out previously seen URLs
-    unique_sources = {}
-    if seen_urls is None:
-        seen_urls = set()
-    
-    for source in sources_list:
-        url = source["url"]
-        if url not in unique_sources and url not in seen_urls:
-            unique_sources[url] = source
-
-    # Format output
-    formatted_text = "Sources:\n\n"
-    for i, source in enumerate(unique_sources.values(), 1):
-        formatted_text += f"Source: {source['title']}\n===\n"
-        formatted_text += f"URL: {source['url']}\n===\n"
-        formatted_text += (
-            f"Most relevant content from source: {source['content']}\n===\n"
-        )
-        if fetch_full_page:
-            # Using rough estimate of characters per token
-            char_limit = max_tokens_per_source * CHARS_PER_TOKEN
-            # Handle None raw_content
-            raw_content = source.get("raw_content", "")
-            if raw_content is None:
-                raw_content = ""
-                print(f"Warning: No raw_content found for source {source['url']}")
-            if len(raw_content) > char_limit:
-                raw_content = raw_content[:char_limit] + "... [truncated]"
-            formatted_text += f"Full source content limited to {max_tokens_per_source} tokens: {raw_content}\n\n"
-
-    return formatted_text.strip()
+    bundle = SourceBundle.from_search_responses(search_response, seen_urls=seen_urls)
+    return bundle.render(max_tokens_per_source, fetch_full_page)
 
 
 def format_sources(search_results: Dict[str, Any]) -> str:
@@ -144,33 +197,334 @@ def format_sources(search_results: Dict[str, Any]) -> str:
     )
 
 
-def fetch_raw_content(url: str) -> Optional[str]:
+def get_http_client() -> httpx.Client:
     """
-    Fetch HTML content from a URL and convert it to markdown format.
+    Return the process-wide HTTP client used for full-page fetches.
+
+    The client keeps connections alive between requests, so pages fetched from the
+    same host across results, loops and research tasks reuse pooled connections.
 
-    Uses a 10-second timeout to avoid hanging on slow sites or large pages.
+    Returns:
+        httpx.Client: The shared client
+    """
+    global _http_client
+    with _http_client_lock:
+        if _http_client is None:
+            _http_client = httpx.Client(**_http_client_options())
+        return _http_client
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """
+    Return the pooled async HTTP client of the running event loop.
+
+    Used for full-page fetches and search API calls from async code. Connections
+    belong to the event loop that opened them, so each loop gets its own client.
+
+    Returns:
+        httpx.AsyncClient: The running loop's shared client
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_http_clients.get(loop)
+    if client is None:
+        client = _async_http_clients[loop] = httpx.AsyncClient(**_http_client_options())
+    return client
+
+
+def _http_client_options() -> Dict[str, Any]:
+    return dict(
+        timeout=PAGE_FETCH_TIMEOUT,
+        follow_redirects=True,
+        limits=httpx.Limits(
+            max_connections=MAX_CONCURRENT_PAGE_FETCHES * 2,
+            max_keepalive_connections=MAX_CONCURRENT_PAGE_FETCHES,
+        ),
+    )
+
+
+def read_body(response: httpx.Response, max_bytes: Optional[int] = None) -> Tuple[bytes, bool]:
+    """
+    Read a streamed response body, stopping after max_bytes.
+
+    The rest of the body is never downloaded, so a huge page costs at most max_bytes
+    of memory.
+
+    Args:
+        response (httpx.Response): A response opened with client.stream()
+        max_bytes (int, optional): Maximum number of bytes to read. Defaults to no limit.
+
+    Returns:
+        Tuple[bytes, bool]: The body and whether it was cut short
+    """
+    if max_bytes is None:
+        return response.read(), False
+    body = bytearray()
+    for chunk in response.iter_bytes():
+        body += chunk
+        if len(body) >= max_bytes:
+            return bytes(body[:max_bytes]), True
+    return bytes(body), False
+
+
+async def aread_body(response: httpx.Response, max_bytes: Optional[int] = None) -> Tuple[bytes, bool]:
+    """Async version of read_body, for responses opened with AsyncClient.stream()."""
+    if max_bytes is None:
+        return await response.aread(), False
+    body = bytearray()
+    async for chunk in response.aiter_bytes():
+        body += chunk
+        if len(body) >= max_bytes:
+            return bytes(body[:max_bytes]), True
+    return bytes(body), False
+
+
+def fetch_raw_content(
+    url: str,
+    client: Optional[httpx.Client] = None,
+    page_store: Optional[PageStore] = None,
+    max_bytes: Optional[int] = None,
+) -> Optional[str]:
+    """
+    Fetch HTML content from a URL and convert its main content to markdown format.
+
+    Boilerplate (navigation, footers, cookie banners, scripts, ...) is stripped
+    before conversion; see extraction.html_to_markdown. Uses a 10-second timeout to
+    avoid hanging on slow sites or large pages. With a page store, previously fetched
+    pages are revalidated with If-None-Match / If-Modified-Since; a 304 response or
+    an unchanged body reuses the stored markdown instead of converting the page
+    again, unless it was converted by an older version of the pipeline. The body is
+    streamed, and with max_bytes only its first max_bytes are read and converted; a
+    page cut short that way is not added to the page store.
 
     Args:
         url (str): The URL to fetch content from
+        client (httpx.Client, optional): Client to fetch with. Defaults to the shared
+                                         pooled client.
+        page_store (PageStore, optional): Store of previously fetched pages. Defaults to None.
+        max_bytes (int, optional): Maximum number of bytes of the page to read.
+                                   Defaults to no limit.
 
     Returns:
         Optional[str]: The fetched content converted to markdown if successful,
                       None if any error occurs during fetching or conversion
     """
-    try:
-        # Create a client with reasonable timeout
-        with httpx.Client(timeout=10.0) as client:
-            response = client.get(url)
-            response.raise_for_status()
-            return markdownify(response.text)
-    except Exception as e:
-        print(f"Warning: Failed to fetch full page content for {url}: {str(e)}")
-        return None
+    with span("fetch", "page", url=url, host=urlsplit(url).netloc.lower()) as fetch_span:
+        try:
+            stored = page_store.lookup(url) if page_store is not None else None
+            headers = _revalidation_headers(stored)
+            with (client or get_http_client()).stream("GET", url, headers=headers) as response:
+                body, truncated = read_body(response, max_bytes)
+            return _page_markdown(url, response, body, truncated, stored, page_store, fetch_span)
+        except Exception as e:
+            return _fetch_failed(url, e, fetch_span)
+
+
+async def afetch_raw_content(
+    url: str,
+    client: Optional[httpx.AsyncClient] = None,
+    page_store: Optional[PageStore] = None,
+    max_bytes: Optional[int] = None,
+) -> Optional[str]:
+    """
+    Async version of fetch_raw_content.
+
+    The page is downloaded with an async client, so waiting on the network holds no
+    thread. Converting it to markdown is CPU-bound and runs in a worker thread to
+    keep the event loop responsive.
+
+    Args:
+        url (str): The URL to fetch content from
+        client (httpx.AsyncClient, optional): Client to fetch with. Defaults to the
+                                              running loop's pooled client.
+        page_store (PageStore, optional): Store of previously fetched pages. Defaults to None.
+        max_bytes (int, optional): Maximum number of bytes of the page to read.
+                                   Defaults to no limit.
+
+    Returns:
+        Optional[str]: The fetched content converted to markdown if successful,
+                      None if any error occurs during fetching or conversion
+    """
+    with span("fetch", "page", url=url, host=urlsplit(url).netloc.lower()) as fetch_span:
+        try:
+            stored = page_store.lookup(url) if page_store is not None else None
+            headers = _revalidation_headers(stored)
+            async with (client or get_async_http_client()).stream("GET", url, headers=headers) as response:
+                body, truncated = await aread_body(response, max_bytes)
+            return await asyncio.to_thread(
+                _page_markdown, url, response, body, truncated, stored, page_store, fetch_span
+            )
+        except Exception as e:
+            return _fetch_failed(url, e, fetch_span)
+
+
+def _fetch_failed(url: str, error: Exception, fetch_span) -> None:
+    fetch_span.fail(error)
+    print(f"Warning: Failed to fetch full page content for {url}: {str(error)}")
+    return None
+
+
+def _revalidation_headers(stored) -> Dict[str, str]:
+    headers = {}
+    if stored is not None:
+        if stored.etag:
+            headers["If-None-Match"] = stored.etag
+        if stored.last_modified:
+            headers["If-Modified-Since"] = stored.last_modified
+    return headers
+
+
+def _page_markdown(url, response, body, truncated, stored, page_store, fetch_span) -> str:
+    # Shared tail of fetch_raw_content and afetch_raw_content: convert a downloaded
+    # body, or reuse the stored markdown, and update the page store
+    text = body.decode(response.encoding or "utf-8", errors="replace")
+    fetch_span.set(status=response.status_code, bytes=len(body), truncated=truncated)
+    if response.status_code == 304 and stored is not None:
+        page_store.touch(url)
+        if stored.converter == CONVERTER_VERSION:
+            page_store.record("not_modified")
+            fetch_span.set(outcome="not_modified")
+            return stored.markdown
+        # Converted by an older pipeline; redo it from the stored HTML
+        html = page_store.html_for_hash(stored.content_hash)
+        markdown = html_to_markdown(html)
+        page_store.put(
+            url,
+            stored.content_hash,
+            html,
+            markdown,
+            etag=stored.etag,
+            last_modified=stored.last_modified,
+            converter=CONVERTER_VERSION,
+        )
+        page_store.record("reconverted")
+        fetch_span.set(outcome="reconverted")
+        return markdown
+    response.raise_for_status()
+
+    if page_store is None or truncated:
+        # A cut-off body is not stored: revalidating it with the response's ETag
+        # would later return the partial page to a fetch without a byte cap
+        fetch_span.set(outcome="converted")
+        return html_to_markdown(text)
+
+    content_hash = PageStore.hash_content(body)
+    if (
+        stored is not None
+        and stored.content_hash == content_hash
+        and stored.converter == CONVERTER_VERSION
+    ):
+        markdown = stored.markdown
+        outcome = "unchanged"
+    else:
+        markdown = page_store.markdown_for_hash(content_hash, CONVERTER_VERSION)
+        if markdown is None:
+            markdown = html_to_markdown(text)
+            outcome = "converted"
+        else:
+            outcome = "reused"
+    page_store.record(outcome)
+    fetch_span.set(outcome=outcome)
+    page_store.put(
+        url,
+        content_hash,
+        text,
+        markdown,
+        etag=response.headers.get("ETag"),
+        last_modified=response.headers.get("Last-Modified"),
+        converter=CONVERTER_VERSION,
+    )
+    return markdown
+
+
+def fetch_raw_contents(
+    urls: Iterable[str],
+    max_concurrency: int = MAX_CONCURRENT_PAGE_FETCHES,
+    max_per_host: int = MAX_PAGE_FETCHES_PER_HOST,
+    page_store: Optional[PageStore] = None,
+    max_bytes: Optional[int] = None,
+) -> Dict[str, Optional[str]]:
+    """
+    Fetch several pages in parallel and convert them to markdown.
+
+    At most max_concurrency pages are in flight at once, and at most max_per_host
+    of them target the same host, so a result list dominated by one site does not
+    hammer it. All fetches share the pooled client from get_http_client().
+
+    Args:
+        urls (Iterable[str]): URLs to fetch; duplicates are fetched once
+        max_concurrency (int, optional): Maximum number of concurrent fetches. Defaults to 8.
+        max_per_host (int, optional): Maximum concurrent fetches per host. Defaults to 2.
+        page_store (PageStore, optional): Store used to revalidate pages. Defaults to None.
+        max_bytes (int, optional): Maximum bytes read per page. Defaults to no limit.
+
+    Returns:
+        Dict[str, Optional[str]]: Markdown content per URL, None where fetching failed
+    """
+    unique_urls = list(dict.fromkeys(urls))
+    if not unique_urls:
+        return {}
+
+    host_limits: Dict[str, threading.Semaphore] = {}
+    host_limits_lock = threading.Lock()
+
+    def fetch(url: str) -> Optional[str]:
+        host = urlsplit(url).netloc.lower()
+        with host_limits_lock:
+            limit = host_limits.setdefault(host, threading.Semaphore(max_per_host))
+        with limit:
+            return fetch_raw_content(url, page_store=page_store, max_bytes=max_bytes)
+
+    workers = max(1, min(max_concurrency, len(unique_urls)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fetch") as executor:
+        # Each fetch runs in a copy of this context so its span reaches the task's tracer
+        futures = [
+            executor.submit(contextvars.copy_context().run, fetch, url)
+            for url in unique_urls
+        ]
+        return {url: future.result() for url, future in zip(unique_urls, futures)}
+
+
+async def afetch_raw_contents(
+    urls: Iterable[str],
+    max_concurrency: int = MAX_CONCURRENT_PAGE_FETCHES,
+    max_per_host: int = MAX_PAGE_FETCHES_PER_HOST,
+    page_store: Optional[PageStore] = None,
+    max_bytes: Optional[int] = None,
+) -> Dict[str, Optional[str]]:
+    """
+    Async version of fetch_raw_contents, with the same concurrency limits.
+
+    Args:
+        Same as fetch_raw_contents.
+
+    Returns:
+        Dict[str, Optional[str]]: Markdown content per URL, None where fetching failed
+    """
+    unique_urls = list(dict.fromkeys(urls))
+    if not unique_urls:
+        return {}
+
+    limit = asyncio.Semaphore(max(1, max_concurrency))
+    host_limits: Dict[str, asyncio.Semaphore] = {}
+
+    async def fetch(url: str) -> Optional[str]:
+        host = urlsplit(url).netloc.lower()
+        host_limit = host_limits.setdefault(host, asyncio.Semaphore(max_per_host))
+        # Wait for the host first, so a busy host doesn't tie up a global slot
+        async with host_limit, limit:
+            return await afetch_raw_content(url, page_store=page_store, max_bytes=max_bytes)
+
+    pages = await asyncio.gather(*(fetch(url) for url in unique_urls))
+    return dict(zip(unique_urls, pages))
 
 
 @traceable
 def duckduckgo_search(
-    query: str, max_results: int = 3, fetch_full_page: bool = False
+    query: str,
+    max_results: int = 3,
+    fetch_full_page: bool = False,
+    page_store: Optional[PageStore] = None,
+    max_page_bytes: Optional[int] = None,
 ) -> Dict[str, List[Dict[str, Any]]]:
     """
     Search the web using DuckDuckGo and return formatted results.
@@ -182,6 +536,10 @@ def duckduckgo_search(
         max_results (int, optional): Maximum number of results to return. Defaults to 3.
         fetch_full_page (bool, optional): Whether to fetch full page content from result URLs.
                                          Defaults to False.
+        page_store (PageStore, optional): Store used to revalidate fetched pages.
+                                          Defaults to None.
+        max_page_bytes (int, optional): Maximum bytes read per fetched page.
+                                        Defaults to no limit.
     Returns:
         Dict[str, List[Dict[str, Any]]]: Search response containing:
             - results (list): List of search result dictionaries, each containing:
@@ -192,42 +550,93 @@ def duckduckgo_search(
                                             otherwise same as content
     """
     try:
-        with DDGS() as ddgs:
-            results = []
-            search_results = list(ddgs.text(query, max_results=max_results))
-
-            for r in search_results:
-                url = r.get("href")
-                title = r.get("title")
-                content = r.get("body")
-
-                if not all([url, title, content]):
-                    print(f"Warning: Incomplete result from DuckDuckGo: {r}")
-                    continue
-
-                raw_content = content
-                if fetch_full_page:
-                    raw_content = fetch_raw_content(url)
-
-                # Add result to list
-                result = {
-                    "title": title,
-                    "url": url,
-                    "content": content,
-                    "raw_content": raw_content,
-                }
-                results.append(result)
-
-            return {"results": results}
+        results = _format_results(_duckduckgo_text(query, max_results), "href", "body", "DuckDuckGo")
+        if fetch_full_page:
+            pages = fetch_raw_contents(
+                (result["url"] for result in results),
+                page_store=page_store,
+                max_bytes=max_page_bytes,
+            )
+            for result in results:
+                result["raw_content"] = pages[result["url"]]
+
+        return {"results": results}
     except Exception as e:
-        print(f"Error in DuckDuckGo search: {str(e)}")
-        print(f"Full error details: {type(e).__name__}")
-        return {"results": []}
+        return _duckduckgo_failed(e)
+
+
+@traceable
+async def aduckduckgo_search(
+    query: str,
+    max_results: int = 3,
+    fetch_full_page: bool = False,
+    page_store: Optional[PageStore] = None,
+    max_page_bytes: Optional[int] = None,
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Async version of duckduckgo_search.
+
+    DDGS has no async API, so the search call itself runs in a worker thread; full
+    pages are fetched with the async client.
+    """
+    try:
+        search_results = await asyncio.to_thread(_duckduckgo_text, query, max_results)
+        results = _format_results(search_results, "href", "body", "DuckDuckGo")
+        if fetch_full_page:
+            pages = await afetch_raw_contents(
+                (result["url"] for result in results),
+                page_store=page_store,
+                max_bytes=max_page_bytes,
+            )
+            for result in results:
+                result["raw_content"] = pages[result["url"]]
+
+        return {"results": results}
+    except Exception as e:
+        return _duckduckgo_failed(e)
+
+
+def _duckduckgo_failed(error: Exception) -> Dict[str, List[Dict[str, Any]]]:
+    print(f"Error in DuckDuckGo search: {str(error)}")
+    print(f"Full error details: {type(error).__name__}")
+    return {"results": []}
+
+
+def _duckduckgo_text(query: str, max_results: int) -> List[Dict[str, Any]]:
+    with DDGS() as ddgs:
+        return list(ddgs.text(query, max_results=max_results))
+
+
+def _format_results(
+    search_results: Iterable[Dict[str, Any]], url_key: str, content_key: str, provider: str
+) -> List[Dict[str, Any]]:
+    # Map a provider's raw results to title/url/content/raw_content, skipping incomplete ones
+    results = []
+    for r in search_results:
+        url = r.get(url_key)
+        title = r.get("title")
+        content = r.get(content_key)
+
+        if not all([url, title, content]):
+            print(f"Warning: Incomplete result from {provider}: {r}")
+            continue
+
+        results.append({
+            "title": title,
+            "url": url,
+            "content": content,
+            "raw_content": content,
+        })
+    return results
 
 
 @traceable
 def searxng_search(
-    query: str, max_results: int = 3, fetch_full_page: bool = False
+    query: str,
+    max_results: int = 3,
+    fetch_full_page: bool = False,
+    page_store: Optional[PageStore] = None,
+    max_page_bytes: Optional[int] = None,
 ) -> Dict[str, List[Dict[str, Any]]]:
     """
     Search the web using SearXNG and return formatted results.
@@ -241,6 +650,10 @@ def searxng_search(
         max_results (int, optional): Maximum number of results to return. Defaults to 3.
         fetch_full_page (bool, optional): Whether to fetch full page content from result URLs.
                                          Defaults to False.
+        page_store (PageStore, optional): Store used to revalidate fetched pages.
+                                          Defaults to None.
+        max_page_bytes (int, optional): Maximum bytes read per fetched page.
+                                        Defaults to no limit.
 
     Returns:
         Dict[str, List[Dict[str, Any]]]: Search response containing:
@@ -254,29 +667,51 @@ def searxng_search(
     host = os.environ.get("SEARXNG_URL", "http://localhost:8888")
     s = SearxSearchWrapper(searx_host=host)
 
-    results = []
     search_results = s.results(query, num_results=max_results)
-    for r in search_results:
-        url = r.get("link")
-        title = r.get("title")
-        content = r.get("snippet")
+    results = _format_results(search_results, "link", "snippet", "SearXNG")
 
-        if not all([url, title, content]):
-            print(f"Warning: Incomplete result from SearXNG: {r}")
-            continue
+    if fetch_full_page:
+        pages = fetch_raw_contents(
+            (result["url"] for result in results),
+            page_store=page_store,
+            max_bytes=max_page_bytes,
+        )
+        for result in results:
+            result["raw_content"] = pages[result["url"]]
+    return {"results": results}
 
-        raw_content = content
-        if fetch_full_page:
-            raw_content = fetch_raw_content(url)
 
-        # Add result to list
-        result = {
-            "title": title,
-            "url": url,
-            "content": content,
-            "raw_content": raw_content,
-        }
-        results.append(result)
+@traceable
+async def asearxng_search(
+    query: str,
+    max_results: int = 3,
+    fetch_full_page: bool = False,
+    page_store: Optional[PageStore] = None,
+    max_page_bytes: Optional[int] = None,
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Async version of searxng_search.
+
+    SearxSearchWrapper's async path needs aiohttp, so this queries the instance's
+    JSON API (/search?format=json) directly with the async client.
+    """
+    host = os.environ.get("SEARXNG_URL", "http://localhost:8888")
+    response = await get_async_http_client().get(
+        f"{host.rstrip('/')}/search", params={"q": query, "format": "json"}, timeout=SEARCH_REQUEST_TIMEOUT
+    )
+    response.raise_for_status()
+
+    search_results = response.json().get("results", [])[:max_results]
+    results = _format_results(search_results, "url", "content", "SearXNG")
+
+    if fetch_full_page:
+        pages = await afetch_raw_contents(
+            (result["url"] for result in results),
+            page_store=page_store,
+            max_bytes=max_page_bytes,
+        )
+        for result in results:
+            result["raw_content"] = pages[result["url"]]
     return {"results": results}
 
 
@@ -317,6 +752,21 @@ def tavily_search(
     )
 
 
+@traceable
+async def atavily_search(
+    query: str, fetch_full_page: bool = True, max_results: int = 3
+) -> Dict[str, List[Dict[str, Any]]]:
+    """Async version of tavily_search, using AsyncTavilyClient."""
+    api_key = os.getenv('TAVILY_API_KEY')
+    if not api_key:
+        raise ValueError("TAVILY_API_KEY environment variable not set")
+
+    tavily_client = AsyncTavilyClient(api_key=api_key)
+    return await tavily_client.search(
+        query, max_results=max_results, include_raw_content=fetch_full_page
+    )
+
+
 @traceable
 def perplexity_search(
     query: str, perplexity_search_loop_count: int = 0
@@ -345,6 +795,33 @@ def perplexity_search(
         requests.exceptions.HTTPError: If the API request fails
     """
 
+    headers, payload = _perplexity_request(query)
+    response = requests.post(
+        PERPLEXITY_API_URL, headers=headers, json=payload, timeout=SEARCH_REQUEST_TIMEOUT
+    )
+    response.raise_for_status()  # Raise exception for bad status codes
+    return _perplexity_results(response.json(), perplexity_search_loop_count)
+
+
+@traceable
+async def aperplexity_search(
+    query: str, perplexity_search_loop_count: int = 0
+) -> Dict[str, Any]:
+    """
+    Async version of perplexity_search.
+
+    Raises:
+        httpx.HTTPStatusError: If the API request fails
+    """
+    headers, payload = _perplexity_request(query)
+    response = await get_async_http_client().post(
+        PERPLEXITY_API_URL, headers=headers, json=payload, timeout=SEARCH_REQUEST_TIMEOUT
+    )
+    response.raise_for_status()
+    return _perplexity_results(response.json(), perplexity_search_loop_count)
+
+
+def _perplexity_request(query: str) -> Tuple[Dict[str, str], Dict[str, Any]]:
     headers = {
         "accept": "application/json",
         "content-type": "application/json",
@@ -361,14 +838,11 @@ def perplexity_search(
             {"role": "user", "content": query},
         ],
     }
+    return headers, payload
 
-    response = requests.post(
-        "https://api.perplexity.ai/chat/completions", headers=headers, json=payload
-    )
-    response.raise_for_status()  # Raise exception for bad status codes
 
+def _perplexity_results(data: Dict[str, Any], perplexity_search_loop_count: int) -> Dict[str, Any]:
     # Parse the response
-    data = response.json()
     content = data["choices"][0]["message"]["content"]
 
     # Perplexity returns a list of citations for a single search result
@@ -443,3 +917,330 @@ def arxiv_search(
     except Exception as e:
         print(f"Error in arXiv search: {str(e)}")
         return {"results": []}
+
+
+def response_size(results: Optional[Dict[str, Any]]) -> int:
+    """
+    Return the size in bytes of the text content of a search response.
+
+    Args:
+        results (Dict[str, Any], optional): Search response with a 'results' key
+
+    Returns:
+        int: UTF-8 size of every result's title, content and raw_content
+    """
+    return sum(
+        len((result.get(key) or "").encode("utf-8"))
+        for result in (results or {}).get("results", [])
+        for key in ("title", "content", "raw_content")
+        if isinstance(result.get(key) or "", str)
+    )
+
+
+def run_search(
+    api: str,
+    query: str,
+    max_results: int = 3,
+    fetch_full_page: bool = False,
+    loop_count: int = 0,
+    cache: Optional[SearchCache] = None,
+    page_store: Optional[PageStore] = None,
+    max_page_bytes: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Dispatch a query to one of the supported search APIs.
+
+    When a cache is given, a fresh cached response is returned without touching the
+    network, and non-empty responses are stored for later calls.
+
+    Args:
+        api (str): Name of the search API (see SUPPORTED_SEARCH_APIS)
+        query (str): The search query to execute
+        max_results (int, optional): Maximum number of results to return. Ignored by
+                                     perplexity, which returns its own citations. Defaults to 3.
+        fetch_full_page (bool, optional): Whether to include full page content. Defaults to False.
+        loop_count (int, optional): Current research loop, used by perplexity for source
+                                    labeling. Defaults to 0.
+        cache (SearchCache, optional): Cache to consult before searching. Defaults to None.
+        page_store (PageStore, optional): Store used to revalidate full pages fetched by
+                                          duckduckgo and searxng. Defaults to None.
+        max_page_bytes (int, optional): Maximum bytes read per page fetched by duckduckgo
+                                        and searxng. Defaults to no limit.
+
+    Returns:
+        Dict[str, Any]: Search response with a 'results' key
+
+    Raises:
+        ValueError: If the search API is not supported
+    """
+    if api not in SUPPORTED_SEARCH_APIS:
+        raise ValueError(f"Unsupported search API: {api}")
+
+    with span("search", api, query=query, max_results=max_results, fetch_full_page=fetch_full_page) as search_span:
+        key_params = _cache_key_params(api, fetch_full_page, loop_count, max_page_bytes)
+        if cache is not None:
+            cached = cache.get(api, query, max_results, fetch_full_page, **key_params)
+            if cached is not None:
+                search_span.set(cached=True, results=len(cached.get("results", [])))
+                return cached
+
+        if api == "tavily":
+            results = tavily_search(
+                query, fetch_full_page=fetch_full_page, max_results=max_results
+            )
+        elif api == "perplexity":
+            results = perplexity_search(query, loop_count)
+        elif api == "duckduckgo":
+            results = duckduckgo_search(
+                query,
+                max_results=max_results,
+                fetch_full_page=fetch_full_page,
+                page_store=page_store,
+                max_page_bytes=max_page_bytes,
+            )
+        elif api == "searxng":
+            results = searxng_search(
+                query,
+                max_results=max_results,
+                fetch_full_page=fetch_full_page,
+                page_store=page_store,
+                max_page_bytes=max_page_bytes,
+            )
+        else:
+            results = arxiv_search(
+                query, max_results=max_results, fetch_full_page=fetch_full_page
+            )
+        search_span.set(
+            cached=False,
+            results=len((results or {}).get("results", [])),
+            bytes=response_size(results),
+        )
+
+        # Empty responses are usually transient failures, so don't pin them in the cache
+        if cache is not None and results and results.get("results"):
+            cache.set(api, query, max_results, fetch_full_page, results, **key_params)
+        return results
+
+
+def _cache_key_params(
+    api: str, fetch_full_page: bool, loop_count: int, max_page_bytes: Optional[int]
+) -> Dict[str, Any]:
+    # Besides the common arguments, key on those this provider's results depend on
+    if api == "perplexity":
+        return {"loop_count": loop_count}
+    if api in ("duckduckgo", "searxng") and fetch_full_page:
+        return {"max_page_bytes": max_page_bytes}
+    return {}
+
+
+def fan_out_search(
+    apis: List[str],
+    query: str,
+    max_results: int = 2,
+    fetch_full_page: bool = False,
+    loop_count: int = 0,
+    timeout: float = 20.0,
+    timeouts: Optional[Mapping[str, float]] = None,
+    cache: Optional[SearchCache] = None,
+    page_store: Optional[PageStore] = None,
+    max_page_bytes: Optional[int] = None,
+) -> Iterator[Tuple[str, Optional[Dict[str, Any]], Optional[Exception]]]:
+    """
+    Query several search APIs concurrently and yield each response as it arrives.
+
+    Every provider is dispatched at once on its own worker thread, so the wall-clock
+    cost is bounded by the slowest provider (or its deadline) rather than the sum of
+    all providers. Providers that miss their deadline are reported with a TimeoutError
+    and their late results are discarded.
+
+    Args:
+        apis (List[str]): Search APIs to query
+        query (str): The search query to execute
+        max_results (int, optional): Maximum results per provider. Defaults to 2.
+        fetch_full_page (bool, optional): Whether to include full page content. Defaults to False.
+        loop_count (int, optional): Current research loop (perplexity labeling). Defaults to 0.
+        timeout (float, optional): Default per-provider deadline in seconds. Defaults to 20.0.
+        timeouts (Mapping[str, float], optional): Per-provider deadline overrides in seconds.
+        cache (SearchCache, optional): Cache shared by all providers. Defaults to None.
+        page_store (PageStore, optional): Page store shared by all providers. Defaults to None.
+        max_page_bytes (int, optional): Maximum bytes read per fetched page. Defaults to no limit.
+
+    Yields:
+        Tuple[str, Optional[Dict[str, Any]], Optional[Exception]]: (api, results, error) in
+        completion order; exactly one of results and error is set.
+    """
+    timeouts = timeouts or {}
+    executor = ThreadPoolExecutor(
+        max_workers=max(len(apis), 1), thread_name_prefix="search"
+    )
+    try:
+        start = time.monotonic()
+        futures = {}
+        deadlines = {}
+        for api in apis:
+            future = executor.submit(
+                contextvars.copy_context().run,
+                run_search,
+                api,
+                query,
+                max_results,
+                fetch_full_page,
+                loop_count,
+                cache,
+                page_store,
+                max_page_bytes,
+            )
+            futures[future] = api
+            deadlines[future] = start + timeouts.get(api, timeout)
+
+        pending = set(futures)
+        while pending:
+            next_deadline = min(deadlines[f] for f in pending)
+            done, pending = wait(
+                pending,
+                timeout=max(next_deadline - time.monotonic(), 0),
+                return_when=FIRST_COMPLETED,
+            )
+            for future in done:
+                try:
+                    yield futures[future], future.result(), None
+                except Exception as e:
+                    yield futures[future], None, e
+
+            now = time.monotonic()
+            expired = {f for f in pending if deadlines[f] <= now}
+            for future in expired:
+                future.cancel()
+                api = futures[future]
+                yield api, None, TimeoutError(
+                    f"{api} did not respond within {timeouts.get(api, timeout):g}s"
+                )
+            pending -= expired
+    finally:
+        # Don't block on providers that blew their deadline
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def arun_search(
+    api: str,
+    query: str,
+    max_results: int = 3,
+    fetch_full_page: bool = False,
+    loop_count: int = 0,
+    cache: Optional[SearchCache] = None,
+    page_store: Optional[PageStore] = None,
+    max_page_bytes: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Async version of run_search.
+
+    Tavily, perplexity, searxng and full-page fetches use async clients, so waiting
+    on the network holds no thread. DDGS and the arxiv client only offer blocking
+    APIs; those searches run in a worker thread.
+
+    Args:
+        Same as run_search.
+
+    Returns:
+        Dict[str, Any]: Search response with a 'results' key
+
+    Raises:
+        ValueError: If the search API is not supported
+    """
+    if api not in SUPPORTED_SEARCH_APIS:
+        raise ValueError(f"Unsupported search API: {api}")
+
+    with span("search", api, query=query, max_results=max_results, fetch_full_page=fetch_full_page) as search_span:
+        key_params = _cache_key_params(api, fetch_full_page, loop_count, max_page_bytes)
+        if cache is not None:
+            cached = cache.get(api, query, max_results, fetch_full_page, **key_params)
+            if cached is not None:
+                search_span.set(cached=True, results=len(cached.get("results", [])))
+                return cached
+
+        if api == "tavily":
+            results = await atavily_search(
+                query, fetch_full_page=fetch_full_page, max_results=max_results
+            )
+        elif api == "perplexity":
+            results = await aperplexity_search(query, loop_count)
+        elif api == "duckduckgo":
+            results = await aduckduckgo_search(
+                query,
+                max_results=max_results,
+                fetch_full_page=fetch_full_page,
+                page_store=page_store,
+                max_page_bytes=max_page_bytes,
+            )
+        elif api == "searxng":
+            results = await asearxng_search(
+                query,
+                max_results=max_results,
+                fetch_full_page=fetch_full_page,
+                page_store=page_store,
+                max_page_bytes=max_page_bytes,
+            )
+        else:
+            results = await asyncio.to_thread(arxiv_search, query, max_results, fetch_full_page)
+        search_span.set(
+            cached=False,
+            results=len((results or {}).get("results", [])),
+            bytes=response_size(results),
+        )
+
+        # Empty responses are usually transient failures, so don't pin them in the cache
+        if cache is not None and results and results.get("results"):
+            cache.set(api, query, max_results, fetch_full_page, results, **key_params)
+        return results
+
+
+async def afan_out_search(
+    apis: List[str],
+    query: str,
+    max_results: int = 2,
+    fetch_full_page: bool = False,
+    loop_count: int = 0,
+    timeout: float = 20.0,
+    timeouts: Optional[Mapping[str, float]] = None,
+    cache: Optional[SearchCache] = None,
+    page_store: Optional[PageStore] = None,
+    max_page_bytes: Optional[int] = None,
+) -> AsyncIterator[Tuple[str, Optional[Dict[str, Any]], Optional[Exception]]]:
+    """
+    Async version of fan_out_search.
+
+    Every provider is searched concurrently with arun_search and results are yielded
+    in completion order. Providers that miss their deadline are reported with a
+    TimeoutError; their late results are discarded.
+
+    Args:
+        Same as fan_out_search.
+
+    Yields:
+        Tuple[str, Optional[Dict[str, Any]], Optional[Exception]]: (api, results, error) in
+        completion order; exactly one of results and error is set.
+    """
+    timeouts = timeouts or {}
+
+    async def search(api: str):
+        deadline = timeouts.get(api, timeout)
+        try:
+            results = await asyncio.wait_for(
+                arun_search(
+                    api, query, max_results, fetch_full_page, loop_count, cache, page_store, max_page_bytes
+                ),
+                deadline,
+            )
+            return api, results, None
+        except asyncio.TimeoutError:
+            return api, None, TimeoutError(f"{api} did not respond within {deadline:g}s")
+        except Exception as e:
+            return api, None, e
+
+    tasks = [asyncio.ensure_future(search(api)) for api in apis]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
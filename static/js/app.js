@@ -86,8 +86,40 @@ async function handleSubmit(event) {
     }
 }
 
-// Start polling for research status
+// Follow research status, preferring server-pushed events over polling
 function startPolling() {
+    if (!window.EventSource) {
+        pollStatus();
+        return;
+    }
+    
+    let progressPercent = 10;
+    const taskId = currentTaskId;
+    const source = new EventSource(`/api/research/${taskId}/events`);
+    
+    source.addEventListener('status', (event) => {
+        const status = JSON.parse(event.data);
+        if (status.status === 'running') {
+            progressPercent = Math.min(progressPercent + 10, 90);
+            updateProgress(progressPercent, status.progress || 'Processing...');
+        }
+    });
+    
+    source.addEventListener('done', async () => {
+        source.close();
+        const response = await fetch(`/api/research/${taskId}`);
+        handleFinalStatus(await response.json());
+    });
+    
+    source.onerror = () => {
+        // Fall back to polling if the stream can't be (re)established
+        source.close();
+        pollStatus();
+    };
+}
+
+// Poll for research status (fallback when event streams are unavailable)
+function pollStatus() {
     let progressPercent = 10;
     
     pollingInterval = setInterval(async () => {
@@ -100,26 +132,8 @@ function startPolling() {
                 progressPercent = Math.min(progressPercent + 10, 90);
                 updateProgress(progressPercent, data.progress || 'Processing...');
                 
-            } else if (data.status === 'completed') {
-                // Stop polling
-                clearInterval(pollingInterval);
-                pollingInterval = null;
-                
-                // Update progress to 100%
-                updateProgress(100, 'Research completed!');
-                
-                // Show results after a short delay
-                setTimeout(() => {
-                    showResults(data.topic, data.result);
-                }, 1000);
-                
-            } else if (data.status === 'failed') {
-                // Stop polling
-                clearInterval(pollingInterval);
-                pollingInterval = null;
-                
-                // Show error
-                showError(data.error || 'Research failed');
+            } else {
+                handleFinalStatus(data);
             }
         } catch (error) {
             console.error('Polling error:', error);
@@ -127,6 +141,31 @@ function startPolling() {
     }, 2000); // Poll every 2 seconds
 }
 
+// Show results or the error of a finished research task
+function handleFinalStatus(data) {
+    if (data.status === 'completed') {
+        // Stop polling
+        clearInterval(pollingInterval);
+        pollingInterval = null;
+        
+        // Update progress to 100%
+        updateProgress(100, 'Research completed!');
+        
+        // Show results after a short delay
+        setTimeout(() => {
+            showResults(data.topic, data.result);
+        }, 1000);
+        
+    } else if (data.status === 'failed') {
+        // Stop polling
+        clearInterval(pollingInterval);
+        pollingInterval = null;
+        
+        // Show error
+        showError(data.error || 'Research failed');
+    }
+}
+
 // Update progress bar
 function updateProgress(percent, text) {
     document.getElementById('progressFill').style.width = percent + '%';
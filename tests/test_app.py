@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""Offline tests for the Flask API using the test client."""
+
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import app as webapp
+from ollama_deep_researcher import graph as graph_module
+from ollama_deep_researcher.checkpoints import create_sqlite_checkpointer
+from ollama_deep_researcher.scheduler import ResearchScheduler
+from ollama_deep_researcher.task_store import SQLiteTaskStore
+from ollama_deep_researcher.telemetry import Tracer, span, use_tracer
+
+
+def parse_sse(body):
+    """Split an event-stream body into (event, id, data) tuples."""
+    events = []
+    for block in body.strip().split("\n\n"):
+        fields = {}
+        for line in block.splitlines():
+            if line.startswith(":"):
+                continue
+            key, _, value = line.partition(": ")
+            fields[key] = value
+        if "event" in fields:
+            events.append((fields["event"], fields.get("id"), json.loads(fields["data"])))
+    return events
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(webapp, "task_store", SQLiteTaskStore(":memory:"))
+    webapp.app.config["TESTING"] = True
+    with webapp.app.test_client() as client:
+        yield client
+
+
+def make_task(task_id, status="running", entries=0):
+    webapp.task_store.create({
+        "id": task_id,
+        "topic": "topic",
+        "status": status,
+        "created_at": "2025-01-01T00:00:00",
+        "progress": "working",
+    })
+    for i in range(entries):
+        webapp.task_store.append_activity(task_id, {"time": "t", "message": f"step {i}"})
+    if status == "completed":
+        webapp.task_store.update(task_id, result="summary")
+
+
+class TestEventStream:
+    """Server-Sent Events push only new activity entries."""
+
+    def test_unknown_task(self, client):
+        assert client.get("/api/research/missing/events").status_code == 404
+
+    def test_resumes_after_cursor(self, client):
+        make_task("t1", status="completed", entries=3)
+
+        response = client.get("/api/research/t1/events?since=1")
+        assert response.mimetype == "text/event-stream"
+        events = parse_sse(response.get_data(as_text=True))
+
+        activity = [(event_id, data["message"]) for event, event_id, data in events if event == "activity"]
+        assert activity == [("2", "step 1"), ("3", "step 2")]
+        assert events[-1] == ("done", None, {"status": "completed"})
+
+    def test_pushes_updates_as_they_happen(self, client):
+        make_task("t2", entries=1)
+
+        def run():
+            time.sleep(0.2)
+            webapp.task_store.append_activity("t2", {"time": "t", "message": "step 1"})
+            webapp.notify_task_update("t2")
+            time.sleep(0.2)
+            webapp.update_task("t2", status="completed", result="summary")
+
+        threading.Thread(target=run).start()
+        start = time.monotonic()
+        events = parse_sse(client.get("/api/research/t2/events").get_data(as_text=True))
+
+        assert time.monotonic() - start < webapp.EVENT_STREAM_HEARTBEAT
+        messages = [data["message"] for event, _, data in events if event == "activity"]
+        assert messages == ["step 0", "step 1"]
+        statuses = [data["status"] for event, _, data in events if event == "status"]
+        assert statuses == ["running", "completed"]
+
+
+class TestIncrementalStatus:
+    """Status polling with a cursor and ETags."""
+
+    def test_full_log_without_cursor(self, client):
+        make_task("t1", entries=3)
+        data = client.get("/api/research/t1").get_json()
+        assert len(data["activity_log"]) == 3
+        assert data["activity_cursor"] == 3
+
+    def test_since_returns_only_new_entries(self, client):
+        make_task("t1", entries=2)
+        webapp.task_store.append_activity(
+            "t1", {"time": "t", "message": "step 2", "verbose": {"results": ["x" * 1000]}}
+        )
+
+        data = client.get("/api/research/t1?since=2&verbose=false").get_json()
+        assert data["activity_log"] == [{"time": "t", "message": "step 2"}]
+        assert data["activity_since"] == 2
+        assert data["activity_cursor"] == 3
+
+    def test_etag_not_modified_until_task_changes(self, client):
+        make_task("t1", entries=1)
+
+        first = client.get("/api/research/t1?since=1")
+        etag = first.headers["ETag"]
+        second = client.get("/api/research/t1?since=1", headers={"If-None-Match": etag})
+        assert second.status_code == 304
+        assert second.get_data() == b""
+
+        webapp.task_store.append_activity("t1", {"time": "t", "message": "step 1"})
+        third = client.get("/api/research/t1?since=1", headers={"If-None-Match": etag})
+        assert third.status_code == 200
+        assert [e["message"] for e in third.get_json()["activity_log"]] == ["step 1"]
+
+
+class TestAdmissionQueue:
+    """Research submissions wait in the scheduler's queue."""
+
+    def test_queue_position_reported(self, client, monkeypatch):
+        gate = threading.Event()
+        scheduler = ResearchScheduler(max_workers=1)
+        scheduler.submit("busy", gate.wait)
+        time.sleep(0.05)
+        monkeypatch.setattr(webapp, "scheduler", scheduler)
+
+        first = client.post("/api/research", json={"topic": "a", "config": {}}).get_json()
+        second = client.post("/api/research", json={"topic": "b", "config": {}}).get_json()
+        assert (first["queue_position"], second["queue_position"]) == (1, 2)
+
+        polled = client.get(f"/api/research/{second['task_id']}")
+        status = polled.get_json()
+        assert status["status"] == "pending"
+        assert status["queue_position"] == 2
+        assert client.get("/api/queue").get_json()["queued"] == 2
+
+        # Moving up the queue changes the ETag even though the task itself didn't change
+        scheduler.cancel(first["task_id"])
+        moved = client.get(f"/api/research/{second['task_id']}", headers={"If-None-Match": polled.headers["ETag"]})
+        assert moved.status_code == 200
+        assert moved.get_json()["queue_position"] == 1
+
+        for task_id in scheduler.queued_task_ids():
+            scheduler.cancel(task_id)
+        gate.set()
+        scheduler.shutdown()
+
+    def test_backend_is_the_provider_the_run_uses(self, client, monkeypatch):
+        submitted = {}
+        used = {}
+
+        class FakeScheduler:
+            def submit(self, task_id, fn, *args, backend=None, **kwargs):
+                submitted[task_id] = backend
+                return 0
+
+        class FakeGraph:
+            def invoke(self, input_data, config):
+                used["llm_provider"] = config["configurable"]["llm_provider"]
+                raise RuntimeError("stop")
+
+        monkeypatch.setattr(webapp, "scheduler", FakeScheduler())
+        monkeypatch.setattr(webapp, "graph", FakeGraph())
+        monkeypatch.setenv("TAVILY_API_KEY", "test-key")
+        monkeypatch.setenv("LLM_PROVIDER", "ollama")
+        config = {"llm_provider": "lmstudio"}
+
+        task_id = client.post("/api/research", json={"topic": "a", "config": config}).get_json()["task_id"]
+        webapp.run_research_task(task_id, "a", config)
+
+        assert submitted[task_id] == webapp.task_store.get(task_id)["backend"] == "lmstudio"
+        assert used["llm_provider"] == "lmstudio"
+
+
+class TestResume:
+    """Failed tasks resume from their last checkpoint."""
+
+    @pytest.fixture
+    def checkpointed(self, client, monkeypatch):
+        checkpointer = create_sqlite_checkpointer(":memory:")
+        monkeypatch.setattr(webapp, "checkpointer", checkpointer)
+        monkeypatch.setattr(webapp, "graph", graph_module.build_graph(checkpointer))
+        monkeypatch.setenv("TAVILY_API_KEY", "test-key")
+        monkeypatch.setattr(
+            graph_module,
+            "generate_search_query_with_structured_output",
+            lambda **kwargs: {"search_query": "fox facts"},
+        )
+
+        def failing_search(*args, **kwargs):
+            raise ConnectionError("search backend down")
+
+        monkeypatch.setattr(graph_module, "run_search", failing_search)
+        return client
+
+    def test_only_failed_tasks_resume(self, client):
+        assert client.post("/api/research/missing/resume").status_code == 404
+        make_task("t1", status="running")
+        assert client.post("/api/research/t1/resume").status_code == 409
+
+    def test_failed_task_is_resumable(self, checkpointed, monkeypatch):
+        config = {"search_api": "duckduckgo", "enable_search_cache": False}
+        webapp.task_store.create(
+            {"id": "t1", "topic": "foxes", "status": "pending", "created_at": "now", "config": config}
+        )
+        webapp.run_research_task("t1", "foxes", config)
+
+        status = checkpointed.get("/api/research/t1").get_json()
+        assert status["status"] == "failed"
+        assert "search backend down" in status["error"]
+        assert status["resumable"] is True
+
+        # The timeline is kept with the task and shows which node failed
+        assert "t1" not in webapp.task_tracers
+        nodes = [
+            (s["name"], s["status"])
+            for s in checkpointed.get("/api/research/t1/timeline").get_json()["spans"]
+            if s["kind"] == "node"
+        ]
+        assert nodes == [("generate_query", "ok"), ("web_research", "error")]
+
+        calls = []
+        done = threading.Event()
+
+        def fake_run(*args, **kwargs):
+            calls.append((args, kwargs))
+            done.set()
+
+        monkeypatch.setattr(webapp, "run_research_task", fake_run)
+        response = checkpointed.post("/api/research/t1/resume")
+        assert response.status_code == 200
+        assert done.wait(timeout=5)
+        assert calls == [(("t1", "foxes", config, webapp.research_env_vars()), {"resume": True})]
+
+    def test_reaped_task_drops_checkpoint(self, checkpointed, monkeypatch):
+        config = {"search_api": "duckduckgo", "enable_search_cache": False}
+        for task_id in ("t1", "t2"):
+            webapp.task_store.create(
+                {"id": task_id, "topic": "foxes", "status": "pending", "created_at": "now", "config": config}
+            )
+            webapp.run_research_task(task_id, "foxes", config)
+        assert webapp.has_checkpoint("t1") and webapp.has_checkpoint("t2")
+
+        monkeypatch.setattr(webapp.task_store, "ttl", 0)
+        webapp.task_store.update("t2", status="running")
+        time.sleep(0.01)
+        webapp.sweep_expired_tasks()
+
+        assert webapp.task_store.get("t1") is None
+        assert not webapp.has_checkpoint("t1")
+        assert webapp.has_checkpoint("t2")
+
+
+class TestTelemetry:
+    """Task timelines and Prometheus metrics are exported."""
+
+    def test_timeline(self, client, monkeypatch):
+        assert client.get("/api/research/missing/timeline").status_code == 404
+        make_task("t1", status="running")
+        assert client.get("/api/research/t1/timeline").get_json()["spans"] == []
+
+        tracer = Tracer(metrics=None)
+        with use_tracer(tracer), span("search", "duckduckgo"):
+            pass
+        monkeypatch.setitem(webapp.task_tracers, "t1", tracer)
+        live = client.get("/api/research/t1/timeline").get_json()
+        assert live["status"] == "running"
+        assert [(s["kind"], s["name"]) for s in live["spans"]] == [("search", "duckduckgo")]
+
+    def test_metrics(self, client):
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        assert response.content_type.startswith("text/plain; version=0.0.4")
+        assert "# TYPE deep_researcher_spans_total counter" in response.get_data(as_text=True)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""Offline unit tests for the batch research runner."""
+
+import asyncio
+import io
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+# Add src directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from ollama_deep_researcher.batch import arun_batch, load_topics, run_batch
+
+
+class FakeGraph:
+    """Stands in for the compiled graph and records peak concurrency."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+        self.configs = []
+
+    def invoke(self, state, config):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            self.configs.append(config)
+        time.sleep(0.05)
+        with self.lock:
+            self.active -= 1
+        if "fail" in state["research_topic"]:
+            raise RuntimeError("model unavailable")
+        return {"running_summary": f"Summary of {state['research_topic']}"}
+
+
+class TestLoadTopics:
+    """Topic files may be plain text or JSONL."""
+
+    def test_plain_and_jsonl(self):
+        lines = ["# nightly\n", "first topic\n", "\n", '{"topic": "second topic"}\n']
+        assert load_topics(lines) == ["first topic", "second topic"]
+
+
+class TestRunBatch:
+    """Topics run with bounded concurrency and stream JSONL results."""
+
+    def test_bounded_concurrency_and_jsonl(self):
+        graph = FakeGraph()
+        output = io.StringIO()
+        topics = [f"topic {i}" for i in range(6)] + ["fail me"]
+
+        report = run_batch(topics, concurrency=2, configurable={"local_llm": "m"}, output=output, graph=graph)
+
+        assert graph.peak == 2
+        assert all(config["configurable"] == {"local_llm": "m"} for config in graph.configs)
+        lines = [json.loads(line) for line in output.getvalue().splitlines()]
+        assert sorted(line["topic"] for line in lines) == sorted(topics)
+        failed = next(line for line in lines if line["topic"] == "fail me")
+        assert failed["status"] == "failed" and failed["error"] == "model unavailable"
+        assert (report.completed, report.failed) == (6, 1)
+        assert report.topics_per_hour == pytest.approx(6 * 3600 / report.elapsed)
+
+
+class FakeAsyncGraph:
+    """Async stand-in for the compiled graph."""
+
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+
+    async def ainvoke(self, state, config):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.05)
+        self.active -= 1
+        return {"running_summary": f"Summary of {state['research_topic']}"}
+
+
+class TestArunBatch:
+    """The async runner bounds concurrency on a single event loop."""
+
+    def test_bounded_concurrency(self):
+        graph = FakeAsyncGraph()
+        output = io.StringIO()
+        topics = [f"topic {i}" for i in range(5)]
+
+        report = asyncio.run(arun_batch(topics, concurrency=3, output=output, graph=graph))
+
+        assert graph.peak == 3
+        assert report.completed == 5
+        assert len(output.getvalue().splitlines()) == 5
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
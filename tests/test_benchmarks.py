@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""Offline smoke tests for the benchmark harness."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add src and benchmarks directories to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent.parent / "benchmarks"))
+
+from mock_llm_server import MockLLMServer
+from run_benchmark import run_benchmark
+from search_fixtures import SearchReplayer
+
+from ollama_deep_researcher import utils
+from ollama_deep_researcher.llm_pool import clear_chat_models
+
+
+class TestSearchReplayer:
+    """Recorded responses stand in for every search provider."""
+
+    def test_replays_distinct_results_per_query(self):
+        replayer = SearchReplayer()
+        original = utils.tavily_search
+        with replayer.install():
+            first = utils.run_search("tavily", "heat pumps", max_results=2)
+            second = utils.run_search("tavily", "wind power", max_results=2)
+            assert set(utils.SUPPORTED_SEARCH_APIS) <= set(replayer.fixtures)
+        assert len(first["results"]) == 2
+        assert first["results"][0]["url"] != second["results"][0]["url"]
+        assert "heat pumps" in first["results"][0]["content"]
+        assert replayer.calls["tavily"] == 2
+        assert utils.tavily_search is original
+
+
+class TestRunBenchmark:
+    """The graph runs end to end against the mock model server."""
+
+    @pytest.mark.parametrize("provider", ["ollama", "lmstudio"])
+    def test_reports_every_node(self, provider):
+        with MockLLMServer(token_rate=0, ttft=0, summary_tokens=20) as server:
+            configurable = {
+                "llm_provider": provider,
+                "local_llm": "mock-model",
+                "ollama_base_url": server.url,
+                "lmstudio_base_url": f"{server.url}/v1",
+                "search_api": "duckduckgo",
+                "max_web_research_loops": 1,
+                "fetch_full_page": True,
+                "enable_search_cache": False,
+                "enable_page_store": False,
+            }
+            clear_chat_models()
+            try:
+                report = run_benchmark(["heat pumps"], configurable, server, SearchReplayer())
+            finally:
+                clear_chat_models()
+
+        assert set(report["nodes"]) == {
+            "generate_query", "web_research", "validate_sources",
+            "summarize_sources", "reflect_on_summary", "finalize_summary",
+        }
+        assert report["llm"]["requests"] >= 3
+        assert report["searches"]["duckduckgo"] == report["nodes"]["web_research"]["calls"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
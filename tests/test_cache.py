@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""Offline unit tests for the persistent search cache."""
+
+import sys
+import time
+from pathlib import Path
+
+import httpx
+import pytest
+
+# Add src directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from ollama_deep_researcher import utils
+from ollama_deep_researcher.cache import PageStore, SearchCache
+
+RESPONSE = {"results": [{"title": "t", "url": "https://example.com", "content": "c"}]}
+
+
+class TestSearchCache:
+    """TTL, LRU eviction and counters."""
+
+    def test_hit_and_miss(self, tmp_path):
+        cache = SearchCache(str(tmp_path / "search.sqlite"))
+
+        assert cache.get("tavily", "q", 3, False) is None
+        cache.set("tavily", "q", 3, False, RESPONSE)
+        assert cache.get("tavily", "q", 3, False) == RESPONSE
+        # Every part of the key matters
+        assert cache.get("tavily", "q", 3, True) is None
+        assert cache.get("arxiv", "q", 3, False) is None
+
+        stats = cache.stats()
+        assert stats["entries"] == 1
+        assert stats["hits"] == 1 and stats["misses"] == 3
+        assert stats["by_provider"]["tavily"] == {"hits": 1, "misses": 2}
+
+    def test_persists_across_instances(self, tmp_path):
+        path = str(tmp_path / "search.sqlite")
+        SearchCache(path).set("arxiv", "q", 3, False, RESPONSE)
+        assert SearchCache(path).get("arxiv", "q", 3, False) == RESPONSE
+
+    def test_ttl_per_provider(self, tmp_path):
+        cache = SearchCache(":memory:", ttls={"duckduckgo": 0.05})
+        cache.set("duckduckgo", "q", 3, False, RESPONSE)
+        cache.set("tavily", "q", 3, False, RESPONSE)
+        time.sleep(0.1)
+
+        assert cache.get("duckduckgo", "q", 3, False) is None
+        assert cache.get("tavily", "q", 3, False) == RESPONSE
+
+    def test_lru_eviction(self):
+        cache = SearchCache(":memory:", max_entries=2)
+        cache.set("tavily", "a", 3, False, RESPONSE)
+        time.sleep(0.01)
+        cache.set("tavily", "b", 3, False, RESPONSE)
+        time.sleep(0.01)
+        cache.get("tavily", "a", 3, False)  # "b" is now least recently used
+        time.sleep(0.01)
+        cache.set("tavily", "c", 3, False, RESPONSE)
+
+        assert cache.get("tavily", "a", 3, False) == RESPONSE
+        assert cache.get("tavily", "b", 3, False) is None
+        assert cache.get("tavily", "c", 3, False) == RESPONSE
+
+
+class TestCachedRunSearch:
+    """run_search consults the cache before the network."""
+
+    def test_repeat_query_skips_network(self, monkeypatch):
+        calls = []
+
+        def fake_arxiv(query, max_results=3, fetch_full_page=False):
+            calls.append(query)
+            return RESPONSE
+
+        monkeypatch.setattr(utils, "arxiv_search", fake_arxiv)
+        cache = SearchCache(":memory:")
+
+        assert utils.run_search("arxiv", "q", cache=cache) == RESPONSE
+        assert utils.run_search("arxiv", "q", cache=cache) == RESPONSE
+        assert calls == ["q"]
+
+    def test_key_includes_loop_for_perplexity(self, monkeypatch):
+        def fake_perplexity(query, perplexity_search_loop_count=0):
+            return {"results": [{"title": f"Perplexity Search {perplexity_search_loop_count + 1}", "url": "u", "content": "c"}]}
+
+        monkeypatch.setattr(utils, "perplexity_search", fake_perplexity)
+        cache = SearchCache(":memory:")
+
+        utils.run_search("perplexity", "q", loop_count=0, cache=cache)
+        second = utils.run_search("perplexity", "q", loop_count=1, cache=cache)
+        assert second["results"][0]["title"] == "Perplexity Search 2"
+        assert utils.run_search("perplexity", "q", loop_count=1, cache=cache) == second
+        assert cache.stats()["hits"] == 1
+
+    def test_empty_results_not_cached(self, monkeypatch):
+        monkeypatch.setattr(
+            utils, "arxiv_search", lambda query, max_results=3, fetch_full_page=False: {"results": []}
+        )
+        cache = SearchCache(":memory:")
+
+        utils.run_search("arxiv", "q", cache=cache)
+        assert cache.stats()["entries"] == 0
+
+
+class TestPageStore:
+    """Conditional revalidation of fetched pages."""
+
+    HTML = "<html><body><h1>Title</h1><p>Body text</p></body></html>"
+
+    def make_client(self, requests_seen, etag='"v1"', body=HTML):
+        def handler(request):
+            requests_seen.append(dict(request.headers))
+            if etag and request.headers.get("if-none-match") == etag:
+                return httpx.Response(304)
+            return httpx.Response(200, text=body, headers={"ETag": etag} if etag else {})
+
+        return httpx.Client(transport=httpx.MockTransport(handler))
+
+    def test_not_modified_skips_conversion(self, monkeypatch):
+        store = PageStore(":memory:")
+        seen = []
+        client = self.make_client(seen)
+
+        first = utils.fetch_raw_content("https://example.com/a", client=client, page_store=store)
+        assert "Body text" in first
+        assert "if-none-match" not in seen[0]
+
+        def fail(*args, **kwargs):
+            raise AssertionError("page converted again")
+
+        monkeypatch.setattr(utils, "html_to_markdown", fail)
+        second = utils.fetch_raw_content("https://example.com/a", client=client, page_store=store)
+
+        assert second == first
+        assert seen[1]["if-none-match"] == '"v1"'
+        assert store.stats()["not_modified"] == 1
+
+    def test_identical_body_reuses_conversion(self, monkeypatch):
+        store = PageStore(":memory:")
+        client = self.make_client([], etag=None)
+
+        utils.fetch_raw_content("https://example.com/a", client=client, page_store=store)
+        monkeypatch.setattr(utils, "html_to_markdown", lambda html: pytest.fail("converted twice"))
+        utils.fetch_raw_content("https://mirror.example.com/a", client=client, page_store=store)
+
+        stats = store.stats()
+        assert stats["pages"] == 2 and stats["blobs"] == 1
+        assert stats["reused"] == 1
+
+    def test_older_conversions_are_redone(self):
+        store = PageStore(":memory:")
+        seen = []
+        client = self.make_client(seen)
+        # A page stored before conversions were versioned
+        store.put("https://example.com/a", PageStore.hash_content(self.HTML.encode()), self.HTML, "stale", etag='"v1"')
+
+        markdown = utils.fetch_raw_content("https://example.com/a", client=client, page_store=store)
+
+        assert seen[0]["if-none-match"] == '"v1"'
+        assert markdown != "stale" and "Body text" in markdown
+        assert store.lookup("https://example.com/a").converter == utils.CONVERTER_VERSION
+        assert store.stats()["reconverted"] == 1
+
+    def test_truncated_page_not_stored(self):
+        store = PageStore(":memory:")
+        seen = []
+        client = self.make_client(seen)
+
+        partial = utils.fetch_raw_content("https://example.com/a", client=client, page_store=store, max_bytes=20)
+        full = utils.fetch_raw_content("https://example.com/a", client=client, page_store=store)
+
+        assert "Body text" not in partial
+        assert "if-none-match" not in seen[1]
+        assert "Body text" in full
+        assert store.lookup("https://example.com/a").markdown == full
+
+    def test_eviction_drops_orphaned_bodies(self):
+        store = PageStore(":memory:", max_pages=1)
+        store.put("https://a", "h1", "<p>a</p>", "a")
+        time.sleep(0.01)
+        store.put("https://b", "h2", "<p>b</p>", "b")
+
+        assert store.lookup("https://a") is None
+        assert store.lookup("https://b").markdown == "b"
+        assert store.stats()["blobs"] == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
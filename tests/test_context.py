@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""Offline unit tests for token counting and context packing."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add src directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from ollama_deep_researcher.context import (
+    MIN_PARTIAL_TOKENS,
+    approximate_token_count,
+    count_tokens,
+    pack_sources,
+    pack_text,
+    truncate_to_tokens,
+)
+from ollama_deep_researcher.sources import SourceBundle, SourceRecord
+
+
+def record(name, topic_words, filler=0):
+    return SourceRecord(
+        title=f"{name} {topic_words}",
+        url=f"https://example.com/{name}",
+        content=f"{topic_words} " + "filler " * filler,
+    )
+
+
+class TestTokenCounting:
+    """Token counts are conservative and truncation respects them."""
+
+    def test_approximate_count(self):
+        assert approximate_token_count("") == 0
+        assert approximate_token_count("abcdefgh") == 2
+        # Punctuation-heavy text counts at least one token per piece
+        assert approximate_token_count("a,b,c") == 5
+
+    def test_truncate_to_tokens(self):
+        text = "word " * 200
+        truncated = truncate_to_tokens(text, 50)
+        assert truncated.endswith("... [truncated]")
+        assert count_tokens(truncated) <= 50
+        assert truncate_to_tokens("short", 50) == "short"
+
+
+class TestPackSources:
+    """Sources fill the budget in relevance order."""
+
+    def test_everything_fits(self):
+        bundle = SourceBundle([record("a", "solar panels"), record("b", "wind turbines")])
+        packed = pack_sources(bundle, "wind turbines", 1000, 100, fetch_full_page=False)
+        assert packed.included == ["https://example.com/b", "https://example.com/a"]
+        assert packed.dropped_tokens == 0
+        assert packed.text.startswith("Sources:\n\nSource: b wind turbines")
+        assert packed.used_tokens <= packed.budget
+
+    def test_drops_least_relevant_over_budget(self):
+        bundle = SourceBundle([
+            record("off", "gardening tips", filler=300),
+            record("on", "wind turbines blades", filler=20),
+        ])
+        packed = pack_sources(bundle, "wind turbines", 100, 1000, fetch_full_page=False)
+        assert packed.included == ["https://example.com/on"]
+        assert packed.truncated == [] and packed.dropped == ["https://example.com/off"]
+        assert packed.dropped_tokens > 300
+        assert "gardening" not in packed.text
+        assert packed.used_tokens <= 100
+
+    def test_truncates_when_room_is_left(self):
+        bundle = SourceBundle([record("on", "wind turbines", filler=500)])
+        packed = pack_sources(bundle, "wind turbines", 200, 1000, fetch_full_page=False)
+        assert packed.truncated == ["https://example.com/on"]
+        assert packed.used_tokens <= 200
+        assert packed.dropped_tokens > 0
+
+    def test_truncation_fills_the_budget(self):
+        bundle = SourceBundle([
+            record("on", "wind turbines blades", filler=500),
+            record("small", "wind", filler=0),
+        ])
+        packed = pack_sources(bundle, "wind turbines blades", 200, 1000, fetch_full_page=False)
+        assert packed.truncated == ["https://example.com/on"]
+        assert packed.dropped == ["https://example.com/small"]
+
+    def test_smaller_sources_fit_after_a_dropped_one(self):
+        bundle = SourceBundle([
+            record("on", "wind turbines blades", filler=500),
+            record("small", "wind", filler=0),
+        ])
+        # Too little room left to truncate "on", but enough for "small" whole
+        budget = count_tokens("Sources:\n\n") + MIN_PARTIAL_TOKENS - 1
+        packed = pack_sources(bundle, "wind turbines blades", budget, 1000, fetch_full_page=False)
+        assert packed.dropped == ["https://example.com/on"]
+        assert packed.included == ["https://example.com/small"]
+
+    def test_pack_text(self):
+        packed = pack_text("word " * 500, 100)
+        assert packed.used_tokens <= 100
+        assert packed.dropped_tokens >= 400
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
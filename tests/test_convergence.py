@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""Offline unit tests for early termination of the research loop."""
+
+import sys
+from pathlib import Path
+
+import pytest
+from langchain_core.messages import AIMessageChunk
+
+# Add src directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from ollama_deep_researcher import graph
+from ollama_deep_researcher.configuration import Configuration
+from ollama_deep_researcher.convergence import (
+    check_convergence,
+    query_similarity,
+    source_novelty,
+    summary_change,
+)
+from ollama_deep_researcher.state import SummaryState
+
+
+class TestSignals:
+    """Each convergence signal is measured on a 0-1 scale."""
+
+    def test_source_novelty(self):
+        seen = {"https://a.org/x", "https://b.org/y"}
+        assert source_novelty(["https://a.org/x/", "https://c.org/z"], seen) == 0.5
+        assert source_novelty(["https://a.org/x?utm_source=feed"], seen) == 0.0
+        assert source_novelty([], seen) == 0.0
+
+    def test_summary_change(self):
+        summary = "Red foxes live across the northern hemisphere and eat small mammals."
+        assert summary_change(None, summary) == 1.0
+        assert summary_change(summary, summary) == 0.0
+        assert summary_change(summary, summary + " They also eat berries.") < 0.3
+        assert summary_change(summary, "Completely different text about sharks.") > 0.8
+
+    def test_query_similarity(self):
+        history = ["red fox diet", "Arctic fox habitat"]
+        assert query_similarity("arctic fox habitat", history) == 1.0
+        assert query_similarity("habitat of the arctic fox", history) == 1.0  # Stopwords ignored
+        assert query_similarity("fennec fox ears", history) < 0.5
+        assert query_similarity("fennec fox ears", []) == 0.0
+
+
+class TestCheckConvergence:
+    """Research stops on a repeated query, or when a loop added little of anything."""
+
+    def state(self, **values):
+        defaults = dict(research_loop_count=2, search_query="fennec fox ears", query_history=["red fox diet", "fennec fox ears"])
+        return SummaryState(**{**defaults, **values})
+
+    def test_new_sources_keep_going(self):
+        result = check_convergence(self.state(source_novelty=0.6, summary_change=0.02), Configuration())
+        assert not result.converged
+
+    def test_stale_loop_stops(self):
+        result = check_convergence(self.state(source_novelty=0.1, summary_change=0.02), Configuration())
+        assert result.converged and "few new sources" in result.reason
+        assert result.to_dict()["source_novelty"] == 0.1
+
+    def test_repeated_query_stops(self):
+        state = self.state(search_query="red fox diet", query_history=["red fox diet", "red fox diet"])
+        result = check_convergence(state, Configuration())
+        assert result.converged and "repeats" in result.reason
+
+    def test_min_research_loops(self):
+        state = self.state(source_novelty=0.0, summary_change=0.0)
+        assert not check_convergence(state, Configuration(min_research_loops=3)).converged
+
+
+class FakeLLM:
+    def __init__(self):
+        self.calls = 0
+
+    def invoke(self, messages):
+        self.calls += 1
+        return AIMessageChunk(content="Foxes are small omnivores.")
+
+
+class TestRouteResearch:
+    """A converged run goes straight to finalize_summary."""
+
+    def run(self, monkeypatch, **settings):
+        queries = iter(["fox facts", "fox diet", "fox habitat", "fox lifespan", "fox dens"])
+        searches = []
+
+        def fake_search(api, query, **kwargs):
+            searches.append(query)
+            return {"results": [{"title": "Fox", "url": "https://example.com/fox", "content": "Foxes.", "raw_content": None}]}
+
+        monkeypatch.setattr(graph, "generate_search_query_with_structured_output", lambda **kwargs: {"search_query": next(queries)})
+        monkeypatch.setattr(graph, "run_search", fake_search)
+        monkeypatch.setattr(graph, "get_chat_model", lambda *args, **kwargs: FakeLLM())
+        updates = []
+        config = {"configurable": {
+            "search_api": "duckduckgo",
+            "max_web_research_loops": 3,
+            "require_valid_sources": False,
+            "stream_summary": False,
+            "enable_search_cache": False,
+            "enable_memory_monitoring": False,
+            "progress_callback": lambda step, detail=None, data=None: updates.append(data),
+            **settings,
+        }}
+        result = graph.graph.invoke({"research_topic": "foxes"}, config)
+        return result, searches, [data for data in updates if data and data.get("stage") == "convergence"]
+
+    def test_stops_when_nothing_new(self, monkeypatch):
+        result, searches, converged = self.run(monkeypatch, stop_on_convergence=True)
+        # Loop 1 is all new; loop 2 finds the same page and the same summary
+        assert searches == ["fox facts", "fox diet"]
+        assert converged[0]["loop"] == 2 and converged[0]["source_novelty"] == 0.0
+        assert result["running_summary"].startswith("## Summary\nFoxes are small omnivores.")
+
+    def test_disabled_by_default(self, monkeypatch):
+        _, searches, converged = self.run(monkeypatch)
+        assert len(searches) == 4
+        assert converged == []
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""Offline unit tests for main-content extraction from HTML pages."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add src directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from ollama_deep_researcher.extraction import html_to_markdown
+
+ARTICLE = " ".join([
+    "Heat pumps move heat instead of generating it, which is why they can deliver",
+    "three or four units of heat for every unit of electricity, even in cold climates.",
+])
+
+PAGE = f"""
+<html><head><title>Heat pumps</title><script>var tracking = "analytics";</script>
+<style>.x {{ color: red }}</style></head>
+<body>
+<div id="cookie-banner"><p>We use cookies to improve your experience, personalise ads, and analyse traffic.</p></div>
+<header><nav><a href="/">Home</a> <a href="/news">News</a> <a href="/about">About</a></nav></header>
+<div class="layout has-sidebar">
+  <div class="post-content">
+    <h1>How heat pumps work</h1>
+    <p>{ARTICLE}</p>
+    <p>Modern units use variable-speed compressors, so they run efficiently at part load, and many models keep working well below minus twenty degrees.</p>
+    <p>Installation costs vary widely, but running costs are usually lower than gas boilers, especially when paired with rooftop solar or time-of-use tariffs.</p>
+  </div>
+  <div class="sidebar"><p>Sign up to our newsletter for weekly deals, tips, and competitions for readers.</p></div>
+</div>
+<div style="display: none"><p>Hidden text that nobody can see on the rendered page, at all, ever.</p></div>
+<footer><p>Copyright 2024 Example Media. All rights reserved. Privacy policy and terms.</p></footer>
+</body></html>
+"""
+
+
+class TestHtmlToMarkdown:
+    """Boilerplate is stripped and the main content converted."""
+
+    def test_keeps_article_and_drops_boilerplate(self):
+        markdown = html_to_markdown(PAGE)
+        assert "How heat pumps work" in markdown
+        assert ARTICLE in markdown and "variable-speed compressors" in markdown
+        for boilerplate in ("tracking", "color: red", "cookies", "Home", "newsletter", "Hidden text", "Copyright"):
+            assert boilerplate not in markdown
+
+    def test_short_pages_fall_back_to_body(self):
+        markdown = html_to_markdown("<html><body><h1>Status</h1><p>All systems operational.</p></body></html>")
+        assert markdown == "Status\n======\n\nAll systems operational."
+
+    def test_handles_non_html(self):
+        assert html_to_markdown("plain text response") == "plain text response"
+        assert html_to_markdown("") == ""
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""Offline unit tests for graph node helpers."""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+import pytest
+from langchain_core.messages import AIMessageChunk
+
+# Add src directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from ollama_deep_researcher import async_graph, graph
+from ollama_deep_researcher.checkpoints import create_sqlite_checkpointer
+from ollama_deep_researcher.sources import SourceBundle, SourceRecord
+from ollama_deep_researcher.state import SummaryState
+
+
+class FakeStreamingLLM:
+    def __init__(self, tokens):
+        self.tokens = tokens
+
+    def stream(self, messages):
+        for token in self.tokens:
+            yield AIMessageChunk(content=token)
+
+
+def replay(updates):
+    """Rebuild the visible text the way the web UI does."""
+    text = ""
+    for update in updates:
+        text = update["text"] if update.get("reset") else text + update["delta"]
+    return text
+
+
+class TestStreamSummary:
+    """Partial summary tokens are forwarded through the progress callback."""
+
+    def test_forwards_partial_text(self, monkeypatch):
+        monkeypatch.setattr(graph, "SUMMARY_STREAM_INTERVAL", 0)
+        updates = []
+        llm = FakeStreamingLLM(["The ", "quick ", "fox."])
+
+        result = graph.stream_summary_text(
+            llm, [], lambda step, detail, data: updates.append(data), strip_thinking=True
+        )
+
+        assert result == "The quick fox."
+        assert all(update["stage"] == "summary_stream" for update in updates)
+        assert updates[0]["reset"] and updates[0]["text"] == "The "
+        assert updates[-1]["final"]
+        assert replay(updates) == "The quick fox."
+
+    def test_batches_tokens_between_updates(self):
+        updates = []
+        llm = FakeStreamingLLM(["a"] * 100)
+
+        graph.stream_summary_text(
+            llm, [], lambda step, detail, data: updates.append(data), strip_thinking=False
+        )
+
+        # First token immediately, the rest in the final flush
+        assert len(updates) == 2
+        assert replay(updates) == "a" * 100
+
+    def test_hides_thinking_tokens(self, monkeypatch):
+        monkeypatch.setattr(graph, "SUMMARY_STREAM_INTERVAL", 0)
+        updates = []
+        llm = FakeStreamingLLM(["<think>", "plan", "</think>", "Answer"])
+
+        result = graph.stream_summary_text(
+            llm, [], lambda step, detail, data: updates.append(data), strip_thinking=True
+        )
+
+        assert result == "<think>plan</think>Answer"
+        assert replay(updates) == "Answer"
+
+
+class TestCheckpointedResume:
+    """A failed run resumes from its last completed node."""
+
+    def test_resume_skips_completed_nodes(self, monkeypatch, tmp_path):
+        query_calls = []
+        search_calls = []
+
+        def fake_query(**kwargs):
+            query_calls.append(kwargs)
+            return {"search_query": "fox facts"}
+
+        def fake_search(api, query, **kwargs):
+            search_calls.append(query)
+            if len(search_calls) == 1:
+                raise ConnectionError("search backend down")
+            return {"results": [{"title": "Fox", "url": "https://example.com/fox", "content": "Foxes.", "raw_content": None}]}
+
+        monkeypatch.setattr(graph, "generate_search_query_with_structured_output", fake_query)
+        monkeypatch.setattr(graph, "run_search", fake_search)
+        research = graph.build_graph(create_sqlite_checkpointer(str(tmp_path / "checkpoints.sqlite")))
+        config = {"configurable": {"thread_id": "task-1", "search_api": "duckduckgo", "enable_search_cache": False}}
+
+        with pytest.raises(ConnectionError):
+            research.invoke({"research_topic": "foxes"}, config)
+        state = research.get_state(config)
+        assert state.next == ("web_research",)
+        assert state.values["search_query"] == "fox facts"
+
+        # Resume with no input; stop after the node that failed last time
+        first_update = next(iter(research.stream(None, config, stream_mode="updates")))
+        assert list(first_update) == ["web_research"]
+        assert len(query_calls) == 1
+        assert search_calls == ["fox facts", "fox facts"]
+
+
+class FakeJSONLLM:
+    def __init__(self, payload):
+        self.payload = payload
+        self.prompts = []
+
+    def invoke(self, messages):
+        self.prompts.append(messages[-1].content)
+        return AIMessageChunk(content=json.dumps(self.payload))
+
+
+class TestValidateSourcesPrefilter:
+    """Clear-cut sources are settled without asking the LLM."""
+
+    def make_state(self, records):
+        bundle = SourceBundle(records)
+        return SummaryState(
+            research_topic="quantum error correction",
+            search_query="quantum error correction",
+            web_research_results=[bundle.render(1000)],
+            source_records=bundle.to_dicts(),
+        )
+
+    def test_clear_cases_skip_llm(self, monkeypatch):
+        def no_llm(*args, **kwargs):
+            raise AssertionError("LLM should not be called")
+
+        monkeypatch.setattr(graph, "get_chat_model", no_llm)
+        state = self.make_state([
+            SourceRecord("Quantum error correction", "https://a.org/qec", "Quantum error correction codes"),
+            SourceRecord("Error", "https://www.dictionary.com/browse/error", "error noun"),
+        ])
+
+        update = graph.validate_sources(state, {"configurable": {}})
+
+        assert update["validated_sources"] is True
+        assert [record["url"] for record in update["source_records"]] == ["https://a.org/qec"]
+        assert "dictionary.com" not in update["web_research_results"][0]
+
+    def test_only_ambiguous_sources_reach_llm(self, monkeypatch):
+        llm = FakeJSONLLM({"sources": [{"url": "c.org/sre/", "relevance_score": 0.2}]})
+        monkeypatch.setattr(graph, "get_chat_model", lambda *args, **kwargs: llm)
+        state = self.make_state([
+            SourceRecord("Quantum error correction", "https://a.org/qec", "Quantum error correction codes"),
+            SourceRecord("Error budgets", "https://c.org/sre", "Error budgets in site reliability engineering"),
+        ])
+
+        update = graph.validate_sources(state, {"configurable": {}})
+
+        assert len(llm.prompts) == 1
+        assert "https://c.org/sre" in llm.prompts[0] and "https://a.org/qec" not in llm.prompts[0]
+        assert [record["url"] for record in update["source_records"]] == ["https://a.org/qec"]
+
+
+class TestCompactState:
+    """Compaction mode keeps graph state the same size however many loops run."""
+
+    def run(self, monkeypatch, compact_state, loops=3):
+        searches = []
+
+        def fake_search(api, query, **kwargs):
+            searches.append(query)
+            return {"results": [
+                {"title": f"Fox {len(searches)}", "url": f"https://example.com/{len(searches)}", "content": "Foxes.", "raw_content": "Foxes. " * 2000},
+                {"title": "Fox home", "url": "https://example.com/", "content": "Foxes.", "raw_content": "Foxes. " * 2000},
+            ]}
+
+        monkeypatch.setattr(graph, "generate_search_query_with_structured_output", lambda **kwargs: {"search_query": "fox facts"})
+        monkeypatch.setattr(graph, "run_search", fake_search)
+        monkeypatch.setattr(graph, "get_chat_model", lambda *args, **kwargs: FakeJSONLLM({"sources": []}))
+        config = {"configurable": {
+            "search_api": "duckduckgo",
+            "fetch_full_page": True,
+            "max_web_research_loops": loops,
+            "compact_state": compact_state,
+            "stop_on_convergence": False,
+            "require_valid_sources": False,
+            "relevance_prefilter": False,
+            "stream_summary": False,
+            "enable_search_cache": False,
+            "enable_memory_monitoring": False,
+        }}
+        research = graph.build_graph(create_sqlite_checkpointer(":memory:"))
+        config["configurable"]["thread_id"] = "t"
+        research.invoke({"research_topic": "foxes"}, config)
+        return research.get_state(config).values
+
+    def test_reducer(self):
+        from ollama_deep_researcher.state import add_or_replace, replace
+
+        assert add_or_replace(["a"], ["b"]) == ["a", "b"]
+        assert add_or_replace(["a", "b"], replace(["c"])) == ["c"]
+
+    def test_only_latest_research_is_kept(self, monkeypatch):
+        full = self.run(monkeypatch, compact_state=False)
+        compact = self.run(monkeypatch, compact_state=True)
+
+        assert len(full["web_research_results"]) == 4
+        assert compact["web_research_results"] == full["web_research_results"][-1:]
+        assert all(record["raw_content"] is None for record in compact["source_records"])
+        assert compact["seen_urls"] == full["seen_urls"] == {f"https://example.com/{i}" for i in range(1, 5)} | {"https://example.com/"}
+
+        # One deduplicated entry with every source ever gathered
+        assert len(compact["sources_gathered"]) == 1
+        lines = compact["sources_gathered"][0].split("\n")
+        assert len(lines) == len(set(lines)) == 5
+        assert compact["running_summary"] == full["running_summary"]
+
+
+class TestSummaryContextPacking:
+    """The summary prompt is fitted into the model's context window."""
+
+    def test_prompt_fits_num_ctx(self):
+        bundle = SourceBundle([
+            SourceRecord("Fox habitats", "https://a.org/fox", "Fox habitats " + "forest " * 400),
+            SourceRecord("Cooking", "https://b.org/pasta", "Pasta recipes " + "sauce " * 400),
+        ])
+        state = SummaryState(
+            research_topic="fox habitats",
+            search_query="fox habitats",
+            web_research_results=[bundle.render(1000)],
+            source_records=bundle.to_dicts(),
+        )
+        updates = []
+        config = {"configurable": {
+            "num_ctx": 2048,
+            "context_reserve_tokens": 1024,
+            "llm_provider": "ollama",
+            "progress_callback": lambda step, detail=None, data=None: updates.append(data),
+        }}
+
+        request = graph.prepare_summary(state, config)
+
+        prompt = "".join(message.content for message in request.messages)
+        assert graph.count_tokens(prompt) <= 2048 - 1024
+        assert "https://a.org/fox" in prompt and "https://b.org/pasta" not in prompt
+        [packing] = [data for data in updates if data and data.get("stage") == "context_packing"]
+        assert packing["dropped"] == ["https://b.org/pasta"] and packing["dropped_tokens"] > 0
+        assert request.llm.num_ctx == 2048
+
+
+class FakeAsyncLLM:
+    async def ainvoke(self, messages):
+        await asyncio.sleep(0.01)
+        return AIMessageChunk(content="{}")
+
+    async def astream(self, messages):
+        for token in ["Foxes ", "are ", "canids."]:
+            await asyncio.sleep(0.01)
+            yield AIMessageChunk(content=token)
+
+
+class TestAsyncGraph:
+    """One event loop drives several research runs through the async nodes."""
+
+    def test_concurrent_runs_on_one_loop(self, monkeypatch):
+        active = 0
+        peak = 0
+
+        async def fake_query(**kwargs):
+            return {"search_query": f"{kwargs['fallback_query']} facts"}
+
+        async def fake_search(api, query, **kwargs):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.05)
+            active -= 1
+            slug = query.split()[-2]
+            return {"results": [{"title": f"About {slug}", "url": f"https://example.com/{slug}", "content": f"All about {slug}.", "raw_content": None}]}
+
+        monkeypatch.setattr(async_graph, "agenerate_search_query_with_structured_output", fake_query)
+        monkeypatch.setattr(async_graph, "arun_search", fake_search)
+        monkeypatch.setattr(graph, "get_chat_model", lambda *args, **kwargs: FakeAsyncLLM())
+        config = {"configurable": {"search_api": "duckduckgo", "enable_search_cache": False, "max_web_research_loops": 1}}
+
+        async def research(topics):
+            return await asyncio.gather(
+                *(async_graph.async_graph.ainvoke({"research_topic": topic}, config) for topic in topics)
+            )
+
+        results = asyncio.run(research(["foxes", "wolves", "jackals"]))
+
+        assert peak == 3
+        for topic, result in zip(["foxes", "wolves", "jackals"], results):
+            assert result["running_summary"].startswith("## Summary\nFoxes are canids.")
+            assert f"(https://example.com/{topic})" in result["running_summary"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
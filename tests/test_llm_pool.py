@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""Offline unit tests for the shared chat model pool."""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add src directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from ollama_deep_researcher.configuration import Configuration
+from ollama_deep_researcher.graph import get_llm
+from ollama_deep_researcher.llm_pool import clear_chat_models, get_chat_model
+from ollama_deep_researcher.lmstudio import ChatLMStudio
+
+
+@pytest.fixture(autouse=True)
+def empty_pool():
+    clear_chat_models()
+    yield
+    clear_chat_models()
+
+
+class TestChatModelPool:
+    """Clients are shared per (provider, base_url, model, format, temperature)."""
+
+    def test_same_settings_share_client(self):
+        a = get_chat_model("ollama", "http://localhost:11434/", "llama3.2")
+        b = get_chat_model("ollama", "http://localhost:11434/", "llama3.2")
+        assert a is b
+
+    def test_distinct_settings_get_distinct_clients(self):
+        base = get_chat_model("ollama", "http://localhost:11434/", "llama3.2")
+        assert get_chat_model("ollama", "http://localhost:11434/", "llama3.2", format="json") is not base
+        assert get_chat_model("ollama", "http://localhost:11434/", "qwen3") is not base
+        assert get_chat_model("ollama", "http://other:11434/", "llama3.2") is not base
+        assert get_chat_model("ollama", "http://localhost:11434/", "llama3.2", temperature=0.5) is not base
+
+    def test_lmstudio_client(self):
+        llm = get_chat_model("lmstudio", "http://localhost:1234/v1", "qwen", format="json")
+        assert isinstance(llm, ChatLMStudio)
+        assert llm.format == "json"
+
+    def test_get_llm_reuses_pool(self):
+        config = Configuration(local_llm="llama3.2")
+        assert get_llm(config) is get_llm(config)
+        assert get_llm(config, "qwen3").model == "qwen3"
+        assert clear_chat_models() == 2
+
+    def test_async_clients_are_per_event_loop(self):
+        async def pooled():
+            return get_chat_model("ollama", "http://localhost:11434/", "llama3.2")
+
+        async def twice():
+            return await pooled(), await pooled()
+
+        first, again = asyncio.run(twice())
+        second = asyncio.run(pooled())
+
+        assert first is again
+        assert second is not first
+        assert get_chat_model("ollama", "http://localhost:11434/", "llama3.2") not in (first, second)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
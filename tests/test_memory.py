@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""Offline unit tests for memory monitoring, the memory limit and the low-memory profile."""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import httpx
+import pytest
+
+# Add src directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from ollama_deep_researcher import memory, utils
+from ollama_deep_researcher.memory import MemoryLimitExceeded, MemorySampler, guard_node
+from ollama_deep_researcher.sources import SourceRecord
+from ollama_deep_researcher.state import SummaryState
+from ollama_deep_researcher.telemetry import Metrics, Tracer, use_tracer
+
+
+@pytest.fixture
+def fake_rss(monkeypatch):
+    """Make rss_mb() return the values in the list, repeating the last one."""
+    values = []
+
+    def rss_mb():
+        return values.pop(0) if len(values) > 1 else values[0]
+
+    monkeypatch.setattr(memory, "rss_mb", rss_mb)
+    monkeypatch.setattr(memory, "release_memory", lambda: None)
+    return values
+
+
+class TestMemorySampler:
+    """RSS is attributed to the nodes running while it is sampled."""
+
+    def test_track_records_peak(self, fake_rss):
+        fake_rss.extend([100.0, 100.0, 180.0, 120.0])
+        sampler = MemorySampler(interval=3600)  # Samples once at start
+        with sampler.track("web_research") as record:
+            sampler.sample()
+        assert record.to_dict() == {"node": "web_research", "start_mb": 100.0, "end_mb": 120.0, "peak_mb": 180.0}
+        assert sampler.stats()["node_peak_mb"] == {"web_research": 180.0}
+        assert sampler.peak_mb == 180.0
+
+
+class TestGuardNode:
+    """Nodes shrink their context once over the memory limit, then fail cleanly."""
+
+    @staticmethod
+    def config(**settings):
+        return {"configurable": {"enable_memory_monitoring": False, **settings}}
+
+    def test_under_limit_runs_unchanged(self, fake_rss):
+        fake_rss.append(100.0)
+        seen = []
+
+        def node(state, config):
+            seen.append(config["configurable"])
+            return {"running_summary": "ok"}
+
+        update = guard_node("summarize_sources", node)(SummaryState(), self.config(memory_limit_mb=500))
+        assert update == {"running_summary": "ok"}
+        assert "fetch_full_page" not in seen[0]
+
+    def test_shrinks_then_fails(self, fake_rss):
+        fake_rss.append(800.0)
+        seen = []
+
+        def node(state, config):
+            seen.append(config["configurable"])
+            return {"running_summary": "ok"}
+
+        guarded = guard_node("web_research", node)
+        update = guarded(SummaryState(), self.config(memory_limit_mb=500, fetch_full_page=True))
+        assert update == {"running_summary": "ok", "memory_pressure": True}
+        assert seen[0]["fetch_full_page"] is False
+        assert seen[0]["optimize_for_low_memory"] is True
+
+        with pytest.raises(MemoryLimitExceeded):
+            guarded(SummaryState(memory_pressure=True), self.config(memory_limit_mb=500))
+        assert len(seen) == 1
+
+    def test_pressure_cleared_when_memory_drops(self, fake_rss):
+        fake_rss.append(100.0)
+        update = guard_node("reflect_on_summary", lambda state, config: {"search_query": "q"})(
+            SummaryState(memory_pressure=True), self.config(memory_limit_mb=500)
+        )
+        assert update == {"search_query": "q", "memory_pressure": False}
+
+    def test_records_memory_per_node(self, fake_rss):
+        fake_rss.append(100.0)
+        calls = []
+        progress = lambda message, detail=None, verbose=None: calls.append(verbose)
+        guarded = guard_node("finalize_summary", lambda state: {"running_summary": "done"})
+        tracer = Tracer(metrics=Metrics())
+        with use_tracer(tracer):
+            guarded(SummaryState(), {"configurable": {"progress_callback": progress}})
+
+        # Samples go to telemetry, not to the activity log
+        assert calls == []
+        [memory_span] = tracer.timeline()["spans"]
+        assert (memory_span["kind"], memory_span["name"]) == ("memory", "finalize_summary")
+        assert memory_span["attributes"] == {"start_mb": 100.0, "end_mb": 100.0, "peak_mb": 100.0}
+        assert 'deep_researcher_node_peak_rss_megabytes{node="finalize_summary"} 100.0' in tracer.metrics.render()
+
+    def test_async_nodes(self, fake_rss):
+        fake_rss.append(800.0)
+
+        async def node(state, config):
+            return {"fetch_full_page": config["configurable"]["fetch_full_page"]}
+
+        update = asyncio.run(guard_node("web_research", node)(SummaryState(), self.config(memory_limit_mb=500)))
+        assert update == {"fetch_full_page": False, "memory_pressure": True}
+
+
+class TestLowMemoryProfile:
+    """Page bodies are read up to a cap and unused page text is dropped."""
+
+    def test_fetch_reads_at_most_max_bytes(self):
+        page = "<html><body>" + "<p>Foxes are small omnivores that live almost everywhere.</p>" * 5000 + "</body></html>"
+        client = httpx.Client(transport=httpx.MockTransport(lambda request: httpx.Response(200, text=page)))
+
+        markdown = utils.fetch_raw_content("https://example.com/foxes", client=client, max_bytes=4096)
+        assert "Foxes are small omnivores" in markdown
+        assert len(markdown) < 4096
+        assert len(utils.fetch_raw_content("https://example.com/foxes", client=client)) > 100_000
+
+    def test_condensed_record_keeps_matching_passages(self):
+        filler = "\n\n".join(f"Paragraph {i} about an unrelated subject entirely." for i in range(200))
+        record = SourceRecord("Foxes", "https://example.com", "snippet", filler + "\n\nRed foxes hunt voles in winter.")
+
+        condensed = record.condensed(50, query="foxes winter voles")
+        assert "Red foxes hunt voles in winter." in condensed.raw_content
+        assert len(condensed.raw_content) <= 50 * 4
+        assert record.condensed(50).raw_content == record.raw_content[:200]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
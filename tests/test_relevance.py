@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""Offline unit tests for the lexical relevance pre-filter."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add src directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from ollama_deep_researcher.lexical import (
+    extract_passages,
+    normalize_token,
+    score_texts,
+    split_passages,
+    tokenize,
+)
+from ollama_deep_researcher.relevance import is_denied_domain, prefilter_sources
+from ollama_deep_researcher.sources import SourceBundle, SourceRecord
+
+TOPIC = "quantum error correction"
+
+
+class TestScoring:
+    """Scores reflect how well title and snippet cover the topic."""
+
+    def test_scores_are_normalized_and_ordered(self):
+        scores = score_texts(TOPIC, [
+            "Quantum error correction protects quantum information from noise",
+            "Error messages and how to read them",
+            "Donate today to help children in need",
+        ])
+        assert all(0.0 <= score <= 1.0 for score in scores)
+        assert scores[0] > scores[1] > scores[2] == 0.0
+        assert scores[0] == pytest.approx(1.0, abs=0.1)
+
+    def test_word_forms_match(self):
+        assert tokenize("Foxes, studies and boxes") == ["fox", "study", "box"]
+        assert normalize_token("corrections") == normalize_token("correction")
+        assert normalize_token("computing") == normalize_token("computed") == normalize_token("compute")
+        assert normalize_token("glass") == "glass" and normalize_token("analysis") == "analysis"
+
+    def test_distinct_words_stay_distinct(self):
+        for word, other in [("news", "new"), ("series", "sery"), ("means", "mean"), ("bias", "bia"),
+                            ("united", "unit"), ("evening", "even"), ("plane", "plan"), ("spine", "spin")]:
+            assert normalize_token(word) != normalize_token(other), word
+        assert normalize_token("series") == "series"
+
+    def test_stopword_only_query(self):
+        assert score_texts("what is the", ["anything"]) == [0.0]
+
+    def test_denylist_matches_subdomains(self):
+        assert is_denied_domain("https://www.merriam-webster.com/dictionary/error")
+        assert is_denied_domain("https://en.wiktionary.org/wiki/error")
+        assert not is_denied_domain("https://arxiv.org/abs/quant-ph/9512032")
+
+
+class TestPrefilter:
+    """Only the ambiguous middle band is left for the LLM."""
+
+    def test_triage(self):
+        bundle = SourceBundle([
+            SourceRecord("Quantum error correction", "https://a.org/qec", "Quantum error correction codes explained"),
+            SourceRecord("Error definition", "https://www.merriam-webster.com/dictionary/error", "Quantum error correction"),
+            SourceRecord("Charity", "https://b.org/give", "Give to our annual fund"),
+            SourceRecord("Error budgets", "https://c.org/sre", "Error budgets in site reliability engineering"),
+        ])
+        result = prefilter_sources(TOPIC, bundle, reject_below=0.15, accept_above=0.75)
+        assert result.accepted.urls == ["https://a.org/qec"]
+        assert result.rejected.urls == ["https://www.merriam-webster.com/dictionary/error", "https://b.org/give"]
+        assert result.ambiguous.urls == ["https://c.org/sre"]
+        assert result.scores["https://www.merriam-webster.com/dictionary/error"] == 0.0
+
+    def test_singular_title_matches_plural_topic(self):
+        bundle = SourceBundle([SourceRecord("Fox", "https://a.org/fox", "The red fox is a small omnivore")])
+        result = prefilter_sources("foxes", bundle, reject_below=0.15, accept_above=0.75)
+        assert result.rejected.urls == []
+        assert result.accepted.urls == ["https://a.org/fox"]
+
+
+PAGE = "\n\n".join([
+    "Home | About | Contact | Subscribe to our newsletter",
+    "Cookie settings and privacy preferences for this website.",
+    "Quantum error correction encodes logical qubits across many physical qubits.",
+    "Our team enjoyed the conference dinner and the city tour.",
+    "Surface codes are the leading quantum error correction scheme for superconducting qubits.",
+    "Copyright 2024. All rights reserved.",
+])
+
+
+class TestPassageExtraction:
+    """Long pages keep their best-matching passages instead of their head."""
+
+    def test_split_passages(self):
+        passages = split_passages("a" * 50 + "\n\n" + "b" * 50 + "\n\n" + "c" * 250, max_chars=120)
+        assert passages == ["a" * 50 + "\n\n" + "b" * 50, "c" * 120, "c" * 120, "c" * 10]
+
+    def test_keeps_relevant_passages_in_page_order(self):
+        extracted = extract_passages(PAGE, TOPIC, char_limit=220, max_chars=100)
+        assert len(extracted) <= 220
+        assert "logical qubits" in extracted and "Surface codes" in extracted
+        assert extracted.index("logical qubits") < extracted.index("Surface codes")
+        assert "Cookie" not in extracted and "conference dinner" not in extracted
+        assert extracted.startswith("[...]") and extracted.endswith("[...]")
+
+    def test_short_or_unmatched_pages(self):
+        assert extract_passages("short", TOPIC, char_limit=100) == "short"
+        assert extract_passages(PAGE, "volcano eruptions", char_limit=100, max_chars=50) is None
+
+    def test_source_render_uses_passages(self):
+        page = "\n\n".join(["Unrelated filler text. " * 40] * 3 + [PAGE])
+        record = SourceRecord("Page", "https://a.org/qec", "snippet", raw_content=page)
+        rendered = "".join(record.render(120, fetch_full_page=True, query=TOPIC))
+        assert "Relevant passages from full source" in rendered and "Surface codes" in rendered
+        assert "Unrelated filler" not in rendered
+        # Without a query the page is truncated from the start, as before
+        legacy = "".join(record.render(20, fetch_full_page=True))
+        assert "Unrelated filler" in legacy and "... [truncated]" in legacy
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
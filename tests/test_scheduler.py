@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""Offline unit tests for the research task scheduler."""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+# Add src directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from ollama_deep_researcher.scheduler import ResearchScheduler
+
+
+class Recorder:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active = {}
+        self.peak = {}
+        self.order = []
+
+    def task(self, name, backend="ollama", duration=0.05):
+        with self.lock:
+            self.order.append(name)
+            self.active[backend] = self.active.get(backend, 0) + 1
+            self.peak[backend] = max(self.peak.get(backend, 0), self.active[backend])
+        time.sleep(duration)
+        with self.lock:
+            self.active[backend] -= 1
+
+
+class TestResearchScheduler:
+    """Bounded concurrency with a priority admission queue."""
+
+    def test_bounds_concurrency(self):
+        recorder = Recorder()
+        scheduler = ResearchScheduler(max_workers=2)
+        for i in range(6):
+            scheduler.submit(f"t{i}", recorder.task, f"t{i}")
+        scheduler.shutdown()
+
+        assert len(recorder.order) == 6
+        assert recorder.peak["ollama"] == 2
+
+    def test_backend_limit(self):
+        recorder = Recorder()
+        scheduler = ResearchScheduler(max_workers=4, backend_limits={"ollama": 1})
+        for i in range(3):
+            scheduler.submit(f"o{i}", recorder.task, f"o{i}", "ollama", backend="ollama")
+            scheduler.submit(f"l{i}", recorder.task, f"l{i}", "lmstudio", backend="lmstudio")
+        scheduler.shutdown()
+
+        assert recorder.peak["ollama"] == 1
+        assert recorder.peak["lmstudio"] > 1
+
+    def test_priority_and_positions(self):
+        recorder = Recorder()
+        gate = threading.Event()
+        scheduler = ResearchScheduler(max_workers=1)
+        scheduler.submit("blocker", gate.wait)
+        time.sleep(0.05)  # let the worker pick up the blocker
+
+        assert scheduler.submit("low", recorder.task, "low") == 1
+        assert scheduler.submit("normal", recorder.task, "normal", priority=1) == 1
+        assert scheduler.submit("high", recorder.task, "high", priority=5) == 1
+        assert scheduler.queued_task_ids() == ["high", "normal", "low"]
+        assert scheduler.position("low") == 3
+        assert scheduler.position("blocker") is None
+
+        assert scheduler.cancel("normal")
+        gate.set()
+        scheduler.shutdown()
+        assert recorder.order == ["high", "low"]
+
+    def test_from_env(self, monkeypatch):
+        monkeypatch.setenv("RESEARCH_MAX_CONCURRENCY", "3")
+        monkeypatch.setenv("RESEARCH_BACKEND_CONCURRENCY", "ollama=1, lmstudio=2")
+        scheduler = ResearchScheduler.from_env()
+        try:
+            assert scheduler.stats()["max_workers"] == 3
+            assert scheduler.backend_limits == {"ollama": 1, "lmstudio": 2}
+        finally:
+            scheduler.shutdown()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
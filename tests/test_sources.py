@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""Offline unit tests for structured search sources."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add src directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from ollama_deep_researcher.sources import SourceBundle, canonicalize_url
+from ollama_deep_researcher.utils import deduplicate_and_format_sources
+
+
+def result(n, raw_content=None):
+    return {
+        "title": f"Title {n}",
+        "url": f"https://example.com/{n}",
+        "content": f"Snippet {n}",
+        "raw_content": raw_content,
+    }
+
+
+class TestSourceBundle:
+    """Sources are deduplicated, filtered and rendered as records."""
+
+    def test_dedupes_across_responses_and_seen_urls(self):
+        responses = [{"results": [result(1), result(2)]}, {"results": [result(2), result(3)]}]
+        bundle = SourceBundle.from_search_responses(responses, seen_urls={"https://example.com/3"})
+        assert bundle.urls == ["https://example.com/1", "https://example.com/2"]
+
+    def test_rejects_unknown_input(self):
+        with pytest.raises(ValueError):
+            SourceBundle.from_search_responses("not results")
+
+    def test_render_matches_legacy_format(self):
+        bundle = SourceBundle.from_search_responses({"results": [result(1, "x" * 50)]})
+        assert bundle.render(10, fetch_full_page=True) == (
+            "Sources:\n\n"
+            "Source: Title 1\n===\n"
+            "URL: https://example.com/1\n===\n"
+            "Most relevant content from source: Snippet 1\n===\n"
+            f"Full source content limited to 10 tokens: {'x' * 40}... [truncated]"
+        )
+
+    def test_wrapper_renders_bundle(self):
+        response = {"results": [result(1), result(1), result(2)]}
+        assert deduplicate_and_format_sources(response, 100) == (
+            SourceBundle.from_search_responses(response).render(100)
+        )
+
+    def test_filter_and_round_trip(self):
+        bundle = SourceBundle.from_search_responses({"results": [result(1), result(2), result(3)]})
+        restored = SourceBundle.from_dicts(bundle.to_dicts())
+        assert restored == bundle
+        filtered = restored.filter(["https://example.com/3", "https://example.com/1"])
+        assert filtered.urls == ["https://example.com/1", "https://example.com/3"]
+        assert filtered.render_list() == (
+            "* Title 1 : https://example.com/1\n* Title 3 : https://example.com/3"
+        )
+
+
+class TestCanonicalUrls:
+    """Sources are found by URL however the URL is spelled."""
+
+    @pytest.mark.parametrize(
+        "variant",
+        [
+            "https://example.com/a?a=1&b=2",
+            "http://www.Example.com/a/?b=2&a=1#section",
+            "example.com/a?a=1&b=2&utm_source=newsletter",
+            "<https://example.com:443/a?a=1&b=2>",
+        ],
+    )
+    def test_variants_share_canonical_form(self, variant):
+        assert canonicalize_url(variant) == "example.com/a?a=1&b=2"
+
+    def test_distinct_pages_stay_distinct(self):
+        assert canonicalize_url("https://example.com/a") != canonicalize_url("https://example.com/b")
+        assert canonicalize_url("https://example.com/a?id=1") != canonicalize_url("https://example.com/a?id=2")
+        assert canonicalize_url("http://[bad") == "http://[bad"
+
+    def test_filter_accepts_reformatted_urls(self):
+        bundle = SourceBundle.from_search_responses({"results": [result(1), result(2), result(3)]})
+        filtered = bundle.filter(["example.com/3/", "HTTP://www.example.com/1", "https://other.org/", ""])
+        assert filtered.urls == ["https://example.com/1", "https://example.com/3"]
+        assert bundle.get("www.example.com/2").title == "Title 2"
+        assert bundle.get("https://example.com/4") is None
+
+    def test_dedupes_canonical_duplicates(self):
+        duplicate = dict(result(1), url="http://www.example.com/1/")
+        bundle = SourceBundle.from_search_responses(
+            {"results": [result(1), duplicate, result(2)]}, seen_urls={"example.com/2"}
+        )
+        assert bundle.urls == ["https://example.com/1"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
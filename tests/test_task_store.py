@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""Offline unit tests for the durable research task store."""
+
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# Add src directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from ollama_deep_researcher.task_store import SQLiteTaskStore, create_task_store
+
+
+def new_task(task_id="t1"):
+    return {"id": task_id, "topic": "topic", "status": "pending", "created_at": "now"}
+
+
+class TestSQLiteTaskStore:
+    """Tasks, activity and versions survive in SQLite."""
+
+    def test_create_update_get(self, tmp_path):
+        store = SQLiteTaskStore(str(tmp_path / "tasks.sqlite"))
+        store.create(new_task())
+        assert store.get("t1")["version"] == 0
+        assert store.update("t1", status="running", progress="working") == 1
+        task = store.get("t1")
+        assert task["status"] == "running"
+        assert task["progress"] == "working"
+        assert store.get("missing") is None
+        with pytest.raises(KeyError):
+            store.update("missing", status="running")
+
+    def test_activity_cursor(self):
+        store = SQLiteTaskStore(":memory:")
+        store.create(new_task())
+        for i in range(3):
+            store.append_activity("t1", {"message": f"step {i}"}, progress=f"step {i}")
+        assert store.activity_count("t1") == 3
+        assert store.version("t1") == 3
+        assert store.get("t1")["progress"] == "step 2"
+        assert [e["message"] for e in store.activity("t1", since=1)] == ["step 1", "step 2"]
+        assert store.activity("t1", since=3) == []
+
+    def test_survives_reopen(self, tmp_path):
+        path = str(tmp_path / "tasks.sqlite")
+        store = SQLiteTaskStore(path)
+        store.create(new_task())
+        store.append_activity("t1", {"message": "hello"}, status="completed")
+        reopened = SQLiteTaskStore(path)
+        assert reopened.get("t1")["status"] == "completed"
+        assert reopened.activity("t1") == [{"message": "hello"}]
+
+    def test_reap_expired(self):
+        store = SQLiteTaskStore(":memory:", ttl=0)
+        store.create(new_task())
+        store.append_activity("t1", {"message": "hello"}, status="completed")
+        time.sleep(0.01)
+        assert store.reap() == 1
+        assert store.get("t1") is None
+        assert store.activity("t1") == []
+
+    def test_reap_keeps_unfinished_tasks(self):
+        store = SQLiteTaskStore(":memory:", ttl=0)
+        for task_id, status in [("pending", "pending"), ("running", "running"), ("failed", "failed")]:
+            store.create(new_task(task_id))
+            store.update(task_id, status=status)
+        time.sleep(0.01)
+        assert store.reap() == 1
+        assert store.get("failed") is None
+        assert store.get("pending") is not None and store.get("running") is not None
+
+    def test_create_task_store_urls(self, tmp_path):
+        assert isinstance(create_task_store(":memory:"), SQLiteTaskStore)
+        store = create_task_store(f"sqlite:///{tmp_path / 'tasks.sqlite'}")
+        assert store.path == str(tmp_path / "tasks.sqlite")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""Offline unit tests for spans, task timelines and Prometheus metrics."""
+
+import sys
+from pathlib import Path
+from typing import TypedDict
+
+import httpx
+import pytest
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from langgraph.graph import END, START, StateGraph
+
+# Add src directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from ollama_deep_researcher import utils
+from ollama_deep_researcher.telemetry import (
+    Metrics,
+    TelemetryCallbackHandler,
+    Tracer,
+    span,
+    use_tracer,
+)
+
+
+class TestSpans:
+    """Spans are timed, recorded to the current tracer and aggregated."""
+
+    def test_records_to_current_tracer(self):
+        metrics = Metrics()
+        tracer = Tracer(metrics)
+        with use_tracer(tracer):
+            with span("search", "duckduckgo", query="foxes") as search_span:
+                search_span.set(results=3, bytes=1200)
+        with pytest.raises(ValueError), use_tracer(tracer):
+            with span("fetch", "page"):
+                raise ValueError("boom")
+
+        timeline = tracer.timeline()
+        assert [(s["kind"], s["status"]) for s in timeline["spans"]] == [("search", "ok"), ("fetch", "error")]
+        assert timeline["spans"][0]["attributes"] == {"query": "foxes", "results": 3, "bytes": 1200}
+        assert timeline["spans"][1]["attributes"]["error"] == "ValueError: boom"
+        assert timeline["totals"]["search"]["bytes"] == 1200
+        assert timeline["totals"]["fetch"]["errors"] == 1
+        assert metrics.snapshot()["bytes"] == {"search": 1200}
+
+    def test_timeline_is_bounded(self):
+        tracer = Tracer(metrics=None, max_spans=2)
+        with use_tracer(tracer):
+            for _ in range(5):
+                with span("fetch", "page"):
+                    pass
+        timeline = tracer.timeline()
+        assert len(timeline["spans"]) == 2
+        assert timeline["dropped_spans"] == 3
+
+    def test_fetch_spans_from_worker_threads(self):
+        def handler(request):
+            return httpx.Response(200, text="<html><body><p>Foxes are small omnivores.</p></body></html>")
+
+        client = httpx.Client(transport=httpx.MockTransport(handler))
+        tracer = Tracer(metrics=None)
+        original = utils.get_http_client
+        utils.get_http_client = lambda: client
+        try:
+            with use_tracer(tracer):
+                pages = utils.fetch_raw_contents(["https://a.example/1", "https://b.example/2"])
+        finally:
+            utils.get_http_client = original
+
+        assert all(pages.values())
+        spans = tracer.timeline()["spans"]
+        assert sorted(s["attributes"]["host"] for s in spans) == ["a.example", "b.example"]
+        assert all(s["attributes"]["status"] == 200 and s["attributes"]["bytes"] > 0 for s in spans)
+
+
+class TestMetricsRender:
+    """Aggregates are rendered in the Prometheus text format."""
+
+    def test_render(self):
+        metrics = Metrics()
+        tracer = Tracer(metrics)
+        with use_tracer(tracer):
+            with span("node", 'odd "name"'):
+                pass
+        with span("llm", "llama3.2") as llm_span:
+            llm_span.set(prompt_tokens=100, completion_tokens=20)
+        metrics.observe(llm_span)
+
+        text = metrics.render()
+        assert 'deep_researcher_spans_total{kind="node",name="odd \\"name\\"",status="ok"} 1' in text
+        assert 'deep_researcher_span_duration_seconds_bucket{kind="node",name="odd \\"name\\"",le="+Inf"} 1' in text
+        assert 'deep_researcher_llm_prompt_tokens_total{model="llama3.2"} 100' in text
+        assert 'deep_researcher_llm_completion_tokens_total{model="llama3.2"} 20' in text
+        assert text.endswith("\n")
+
+
+class State(TypedDict):
+    topic: str
+    answer: str
+
+
+class TestCallbackHandler:
+    """Graph nodes and LLM calls become spans, with tokens from the response metadata."""
+
+    def test_node_and_llm_spans(self):
+        llm = GenericFakeChatModel(messages=iter([AIMessage(
+            content="Foxes are omnivores.",
+            response_metadata={"prompt_eval_count": 42, "eval_count": 8, "eval_duration": 400_000_000},
+        )]))
+
+        def answer(state: State):
+            return {"answer": llm.invoke(state["topic"]).content}
+
+        builder = StateGraph(State)
+        builder.add_node("answer", answer)
+        builder.add_edge(START, "answer")
+        builder.add_edge("answer", END)
+
+        tracer = Tracer(metrics=None)
+        result = builder.compile().invoke(
+            {"topic": "foxes"}, {"callbacks": [TelemetryCallbackHandler(tracer)]}
+        )
+
+        assert result["answer"] == "Foxes are omnivores."
+        spans = tracer.timeline()["spans"]
+        assert [s["kind"] for s in spans] == ["node", "llm"]
+        assert spans[0]["name"] == "answer"
+        llm_span = spans[1]
+        assert llm_span["attributes"]["node"] == "answer"
+        assert llm_span["attributes"]["prompt_tokens"] == 42
+        assert llm_span["attributes"]["completion_tokens"] == 8
+        assert llm_span["attributes"]["tokens_per_second"] == 20.0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""Offline unit tests for search and formatting helpers in utils."""
+
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+
+import httpx
+import pytest
+
+# Add src directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from ollama_deep_researcher import utils
+
+
+def fake_results(api, n=2):
+    return {
+        "results": [
+            {
+                "title": f"{api} result {i}",
+                "url": f"https://{api}.example.com/{i}",
+                "content": f"snippet {i} from {api}",
+                "raw_content": None,
+            }
+            for i in range(n)
+        ]
+    }
+
+
+class TestFanOutSearch:
+    """Concurrent multi-provider search dispatch."""
+
+    def test_runs_providers_concurrently(self, monkeypatch):
+        def slow_search(api, query, max_results, fetch_full_page, loop_count, cache, page_store, max_page_bytes):
+            time.sleep(0.3)
+            return fake_results(api)
+
+        monkeypatch.setattr(utils, "run_search", slow_search)
+
+        start = time.monotonic()
+        responses = list(utils.fan_out_search(["tavily", "duckduckgo", "arxiv"], "q"))
+        elapsed = time.monotonic() - start
+
+        assert sorted(api for api, _, _ in responses) == ["arxiv", "duckduckgo", "tavily"]
+        assert all(error is None for _, _, error in responses)
+        assert elapsed < 0.8, f"Providers ran sequentially: {elapsed:.2f}s"
+
+    def test_yields_in_completion_order(self, monkeypatch):
+        delays = {"tavily": 0.3, "arxiv": 0.0}
+
+        def search(api, query, max_results, fetch_full_page, loop_count, cache, page_store, max_page_bytes):
+            time.sleep(delays[api])
+            return fake_results(api)
+
+        monkeypatch.setattr(utils, "run_search", search)
+
+        order = [api for api, _, _ in utils.fan_out_search(["tavily", "arxiv"], "q")]
+        assert order == ["arxiv", "tavily"]
+
+    def test_provider_deadline(self, monkeypatch):
+        def search(api, query, max_results, fetch_full_page, loop_count, cache, page_store, max_page_bytes):
+            if api == "searxng":
+                time.sleep(2)
+            return fake_results(api)
+
+        monkeypatch.setattr(utils, "run_search", search)
+
+        start = time.monotonic()
+        responses = {
+            api: (results, error)
+            for api, results, error in utils.fan_out_search(
+                ["searxng", "arxiv"], "q", timeouts={"searxng": 0.2}
+            )
+        }
+        assert time.monotonic() - start < 1.0
+        assert responses["arxiv"][1] is None
+        assert responses["searxng"][0] is None
+        assert isinstance(responses["searxng"][1], TimeoutError)
+
+    def test_provider_errors_are_reported(self, monkeypatch):
+        def search(api, query, max_results, fetch_full_page, loop_count, cache, page_store, max_page_bytes):
+            raise RuntimeError("boom")
+
+        monkeypatch.setattr(utils, "run_search", search)
+
+        [(api, results, error)] = list(utils.fan_out_search(["tavily"], "q"))
+        assert api == "tavily" and results is None
+        assert str(error) == "boom"
+
+    def test_async_fan_out(self, monkeypatch):
+        async def search(api, query, max_results, fetch_full_page, loop_count, cache, page_store, max_page_bytes):
+            await asyncio.sleep(0.6 if api == "searxng" else 0.2)
+            return fake_results(api)
+
+        monkeypatch.setattr(utils, "arun_search", search)
+
+        async def collect():
+            start = time.monotonic()
+            responses = [
+                response
+                async for response in utils.afan_out_search(
+                    ["searxng", "arxiv", "tavily"], "q", timeouts={"searxng": 0.3}
+                )
+            ]
+            return responses, time.monotonic() - start
+
+        responses, elapsed = asyncio.run(collect())
+        assert elapsed < 0.5, f"Providers ran sequentially: {elapsed:.2f}s"
+        assert sorted(api for api, _, _ in responses[:2]) == ["arxiv", "tavily"]
+        api, results, error = responses[2]
+        assert api == "searxng" and results is None
+        assert isinstance(error, TimeoutError)
+
+    def test_run_search_rejects_unknown_api(self):
+        with pytest.raises(ValueError):
+            utils.run_search("bing", "q")
+
+
+class TestFetchRawContents:
+    """Bounded-concurrency full-page fetching."""
+
+    def test_fetches_in_parallel(self, monkeypatch):
+        def fetch(url, **kwargs):
+            time.sleep(0.3)
+            return f"page {url}"
+
+        monkeypatch.setattr(utils, "fetch_raw_content", fetch)
+        urls = [f"https://site{i}.example.com/" for i in range(4)]
+
+        start = time.monotonic()
+        pages = utils.fetch_raw_contents(urls + urls[:1])
+        elapsed = time.monotonic() - start
+
+        assert pages == {url: f"page {url}" for url in urls}
+        assert elapsed < 0.8, f"Pages fetched sequentially: {elapsed:.2f}s"
+
+    def test_per_host_limit(self, monkeypatch):
+        active = {}
+        peak = {}
+        lock = threading.Lock()
+
+        def fetch(url, **kwargs):
+            host = url.split("/")[2]
+            with lock:
+                active[host] = active.get(host, 0) + 1
+                peak[host] = max(peak.get(host, 0), active[host])
+            time.sleep(0.05)
+            with lock:
+                active[host] -= 1
+            return None
+
+        monkeypatch.setattr(utils, "fetch_raw_content", fetch)
+        urls = [f"https://same.example.com/{i}" for i in range(6)]
+        urls += [f"https://other.example.com/{i}" for i in range(6)]
+
+        pages = utils.fetch_raw_contents(urls, max_concurrency=8, max_per_host=2)
+
+        assert set(pages) == set(urls)
+        assert peak == {"same.example.com": 2, "other.example.com": 2}
+
+
+class TestAsyncSearch:
+    """Async searches and page fetches wait on the event loop, not on threads."""
+
+    PAGE = "<html><body><p>Foxes are small omnivores.</p></body></html>"
+
+    def use_transport(self, monkeypatch, handler):
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        monkeypatch.setattr(utils, "get_async_http_client", lambda: client)
+
+    def test_searxng_with_full_pages(self, monkeypatch):
+        requested = []
+
+        async def handler(request):
+            requested.append(request.url.path)
+            if request.url.path == "/search":
+                assert request.url.params["format"] == "json"
+                return httpx.Response(200, json={"results": [
+                    {"url": f"https://site{i}.example.com/fox", "title": f"Fox {i}", "content": "Foxes."}
+                    for i in range(5)
+                ]})
+            await asyncio.sleep(0.2)
+            return httpx.Response(200, text=self.PAGE)
+
+        self.use_transport(monkeypatch, handler)
+        monkeypatch.setenv("SEARXNG_URL", "http://searx.local")
+
+        start = time.monotonic()
+        results = asyncio.run(utils.arun_search("searxng", "foxes", max_results=3, fetch_full_page=True))
+        elapsed = time.monotonic() - start
+
+        assert [r["title"] for r in results["results"]] == ["Fox 0", "Fox 1", "Fox 2"]
+        assert all("Foxes are small omnivores." in r["raw_content"] for r in results["results"])
+        assert requested.count("/fox") == 3
+        assert elapsed < 0.5, f"Pages fetched sequentially: {elapsed:.2f}s"
+
+    def test_perplexity_labels_loop(self, monkeypatch):
+        def handler(request):
+            return httpx.Response(200, json={
+                "choices": [{"message": {"content": "Foxes are canids."}}],
+                "citations": ["https://a.example.com", "https://b.example.com"],
+            })
+
+        self.use_transport(monkeypatch, handler)
+        results = asyncio.run(utils.arun_search("perplexity", "foxes", loop_count=1))
+
+        assert [r["title"] for r in results["results"]] == [
+            "Perplexity Search 2, Source 1",
+            "Perplexity Search 2, Source 2",
+        ]
+        assert results["results"][0]["raw_content"] == "Foxes are canids."
+
+    def test_search_requests_have_deadline(self, monkeypatch):
+        timeouts = []
+
+        def handler(request):
+            timeouts.append(request.extensions["timeout"]["read"])
+            if request.url.path == "/search":
+                return httpx.Response(200, json={"results": []})
+            return httpx.Response(200, json={"choices": [{"message": {"content": "Foxes."}}], "citations": ["https://a.example.com"]})
+
+        self.use_transport(monkeypatch, handler)
+        monkeypatch.setenv("SEARXNG_URL", "http://searx.local")
+        asyncio.run(utils.arun_search("searxng", "foxes"))
+        asyncio.run(utils.arun_search("perplexity", "foxes"))
+
+        assert timeouts == [utils.SEARCH_REQUEST_TIMEOUT] * 2
+
+    def test_afetch_per_host_limit(self, monkeypatch):
+        active = {}
+        peak = {}
+
+        async def fetch(url, **kwargs):
+            host = url.split("/")[2]
+            active[host] = active.get(host, 0) + 1
+            peak[host] = max(peak.get(host, 0), active[host])
+            await asyncio.sleep(0.05)
+            active[host] -= 1
+            return None
+
+        monkeypatch.setattr(utils, "afetch_raw_content", fetch)
+        urls = [f"https://same.example.com/{i}" for i in range(6)]
+        urls += [f"https://other.example.com/{i}" for i in range(6)]
+
+        pages = asyncio.run(utils.afetch_raw_contents(urls, max_concurrency=8, max_per_host=2))
+
+        assert set(pages) == set(urls)
+        assert peak == {"same.example.com": 2, "other.example.com": 2}
+
+
+class TestStripThinkingTokens:
+    """Think blocks are removed in a single pass, whole or streamed."""
+
+    @pytest.mark.parametrize(
+        "text, expected",
+        [
+            ("no tags", "no tags"),
+            ("<think>plan</think>Answer", "Answer"),
+            ("a<think>x</think>b<think>y</think>c", "abc"),
+            ("<think>outer<think>inner</think>still hidden</think>shown", "shown"),
+            ("Answer<think>never closed", "Answer"),
+            ("stray</think> close", "stray close"),
+            ("a < b and <b>bold</b>", "a < b and <b>bold</b>"),
+        ],
+    )
+    def test_strip(self, text, expected):
+        assert utils.strip_thinking_tokens(text) == expected
+
+    def test_linear_on_many_blocks(self):
+        text = "<think>" + "x" * 100 + "</think>ok "
+        start = time.perf_counter()
+        assert utils.strip_thinking_tokens(text * 20000) == "ok " * 20000
+        assert time.perf_counter() - start < 2
+
+    def test_stream_with_tags_split_across_chunks(self):
+        thinking_filter = utils.ThinkingTokenFilter()
+        chunks = ["Hi <th", "ink>sec", "ret</thi", "nk> there <", "3"]
+        visible = [thinking_filter.feed(chunk) for chunk in chunks]
+        assert visible == ["Hi ", "", "", " there ", "<3"]
+        assert thinking_filter.flush() == ""
+
+    def test_stream_flushes_partial_tag_text(self):
+        thinking_filter = utils.ThinkingTokenFilter()
+        assert thinking_filter.feed("less than <") == "less than "
+        assert thinking_filter.flush() == "<"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])